@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the Belbin Test application.
+Measures the performance of the data layer without requiring GUI interaction.
+
+Usage:
+    python benchmark.py              # run all benchmarks
+    python benchmark.py cache        # run selected benchmarks
+"""
+
+import sys
+import os
+import multiprocessing
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.data_processing import BelbinTest, DatabaseManager
+
+
+def random_scores(rng: random.Random) -> dict:
+    """Generate a random score dictionary."""
+    return {role: rng.randint(0, 20) for role in BelbinTest.ROLES}
+
+
+def timed(func, *args, **kwargs):
+    """Run a function and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_cache(users: int = 200, results_per_user: int = 5, requests: int = 20000):
+    """Compare portal page loads with and without the user results cache."""
+    print("=" * 60)
+    print("USER RESULTS CACHE - Portal Load")
+    print("=" * 60)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(temp_dir, 'bench.db')
+        rng = random.Random(42)
+        seed_db = DatabaseManager(db_path)
+        for i in range(users):
+            for _ in range(results_per_user):
+                seed_db.save_results(f"user{i}", random_scores(rng))
+
+        # Skewed access pattern: a small set of profiles gets most requests
+        names = [f"user{min(int(rng.paretovariate(1.2)) - 1, users - 1)}" for _ in range(requests)]
+
+        for label, db_manager in (("uncached", DatabaseManager(db_path)),
+                                  ("cached (64 users)", DatabaseManager(db_path, cache_size=64))):
+            _, elapsed = timed(lambda: [db_manager.get_user_results(name) for name in names])
+            print(f"  {label:<20} {requests / elapsed:>10.0f} loads/sec ({elapsed:.2f}s)")
+            if db_manager.cache_info():
+                print(f"  {'':<20} {db_manager.cache_info()}")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def bench_ranking(rows: int = 1_000_000, sample: int = 50_000):
+    """Compare bulk top-3 ranking with per-row get_dominant_roles."""
+    print("=" * 60)
+    print(f"DOMINANT ROLE RANKING - {rows:,} rows")
+    print("=" * 60)
+
+    roles = list(BelbinTest.ROLES)
+    matrix = np.random.default_rng(42).integers(0, 30, size=(rows, len(roles)))
+
+    _, elapsed = timed(BelbinTest.rank_dominant_roles, matrix, 3)
+    print(f"  {'rank_dominant_roles':<22} {elapsed:8.3f}s ({rows / elapsed:,.0f} rows/sec)")
+
+    # Per-row Python ranking is timed on a sample and extrapolated
+    dicts = [dict(zip(roles, row)) for row in matrix[:sample].tolist()]
+    _, elapsed = timed(lambda: [BelbinTest.get_dominant_roles(scores) for scores in dicts])
+    estimate = elapsed * rows / sample
+    print(f"  {'get_dominant_roles':<22} {estimate:8.3f}s (estimated from {sample:,} rows)")
+
+
+def _writer_process(db_path, multi_writer, writer_id, count, failures):
+    """Save results from a writer process, counting saves that fail."""
+    try:
+        db_manager = DatabaseManager(db_path, multi_writer=multi_writer, busy_timeout=0.1, max_retries=20)
+    except Exception:
+        with failures.get_lock():
+            failures.value += count
+        return
+    rng = random.Random(writer_id)
+    for _ in range(count):
+        try:
+            db_manager.save_results(f"writer{writer_id}", random_scores(rng))
+        except Exception:
+            with failures.get_lock():
+                failures.value += 1
+
+
+def _reader_process(db_path, multi_writer, stop_event, reads):
+    """Read one user's results in a loop until told to stop."""
+    db_manager = None
+    while not stop_event.is_set():
+        try:
+            db_manager = db_manager or DatabaseManager(db_path, multi_writer=multi_writer,
+                                                       busy_timeout=0.1, max_retries=20)
+            db_manager.get_user_results("writer0")
+            with reads.get_lock():
+                reads.value += 1
+        except Exception:
+            pass
+
+
+def bench_multi_writer(writers: int = 4, readers: int = 2, per_writer: int = 250):
+    """Measure write throughput with concurrent writer and reader processes."""
+    print("=" * 60)
+    print(f"MULTI-PROCESS WRITERS - {writers} writers x {per_writer}, {readers} readers")
+    print("=" * 60)
+
+    for label, multi_writer in (("rollback journal", False), ("WAL + retry", True)):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(temp_dir, 'bench.db')
+            DatabaseManager(db_path, multi_writer=multi_writer)
+            failures = multiprocessing.Value('i', 0)
+            reads = multiprocessing.Value('i', 0)
+            stop_event = multiprocessing.Event()
+
+            reader_procs = [multiprocessing.Process(target=_reader_process,
+                                                    args=(db_path, multi_writer, stop_event, reads))
+                            for _ in range(readers)]
+            writer_procs = [multiprocessing.Process(target=_writer_process,
+                                                    args=(db_path, multi_writer, i, per_writer, failures))
+                            for i in range(writers)]
+            for proc in reader_procs:
+                proc.start()
+            start = time.perf_counter()
+            for proc in writer_procs:
+                proc.start()
+            for proc in writer_procs:
+                proc.join()
+            elapsed = time.perf_counter() - start
+            stop_event.set()
+            for proc in reader_procs:
+                proc.join()
+
+            saved = len(DatabaseManager(db_path).get_all_results())
+            print(f"  {label:<18} {saved / elapsed:8.0f} writes/sec, {reads.value / elapsed:8.0f} reads/sec, "
+                  f"{saved}/{writers * per_writer} saved, {failures.value} failed")
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+def bench_transfer(rows: int = 1_000_000):
+    """Measure streaming export and chunked import of results."""
+    from utils.transfer import export_results, import_results, load_rows
+
+    print("=" * 60)
+    print(f"EXPORT / IMPORT - {rows:,} rows")
+    print("=" * 60)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        source = DatabaseManager(os.path.join(temp_dir, 'source.db'))
+        rng = random.Random(42)
+        generated = ({'username': f"user{i % 50000}", 'timestamp': '2024-01-01 00:00:00',
+                      **{column: rng.randint(0, 20) for column in DatabaseManager.SCORE_COLUMNS}}
+                     for i in range(rows))
+        load_rows(source, generated)
+
+        for fmt in ('csv', 'jsonl'):
+            path = os.path.join(temp_dir, f'results.{fmt}')
+            _, export_time = timed(export_results, source, path)
+            target = DatabaseManager(os.path.join(temp_dir, f'target_{fmt}.db'))
+            _, import_time = timed(import_results, target, path)
+            size = os.path.getsize(path) / 1e6
+            print(f"  {fmt:<6} export {export_time:6.2f}s ({rows / export_time:,.0f} rows/sec), "
+                  f"import {import_time:6.2f}s ({rows / import_time:,.0f} rows/sec), {size:.0f} MB")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def bench_in_memory(saves: int = 5000):
+    """Compare save throughput of file-backed and in-memory databases."""
+    print("=" * 60)
+    print(f"IN-MEMORY DATABASE - {saves:,} saves")
+    print("=" * 60)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        rng = random.Random(42)
+        scores = [random_scores(rng) for _ in range(saves)]
+        modes = (("file", {}), ("file, multi_writer", {'multi_writer': True}), ("in memory", {'in_memory': True}))
+        for index, (label, options) in enumerate(modes):
+            db_manager = DatabaseManager(os.path.join(temp_dir, f'bench{index}.db'), **options)
+            _, elapsed = timed(lambda: [db_manager.save_results(f"user{i % 100}", s)
+                                        for i, s in enumerate(scores)])
+            _, close_time = timed(db_manager.close)
+            print(f"  {label:<20} {saves / elapsed:>10,.0f} saves/sec (close {close_time * 1000:.0f} ms)")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def bench_backup(rows: int = 300_000, write_interval: float = 0.005):
+    """Measure online backups while a writer saves results, reporting writer stalls."""
+    import threading
+    from utils.backup import backup_database
+    from utils.transfer import load_rows
+
+    print("=" * 60)
+    print(f"ONLINE BACKUP - {rows:,} rows, one save every {write_interval * 1000:.0f} ms")
+    print("=" * 60)
+
+    for multi_writer in (False, True):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(temp_dir, 'bench.db')
+            db_manager = DatabaseManager(db_path, multi_writer=multi_writer)
+            rng = random.Random(42)
+            load_rows(db_manager, ({'username': f"user{i % 5000}", 'timestamp': '2024-01-01 00:00:00',
+                                    **{column: rng.randint(0, 20) for column in DatabaseManager.SCORE_COLUMNS}}
+                                   for i in range(rows)))
+
+            for label, options in (("one step", {'pages_per_step': -1}),
+                                   ("256 pages/step", {'pages_per_step': 256, 'sleep': 0.005})):
+                stop = threading.Event()
+                stalls = []
+
+                def write():
+                    while not stop.is_set():
+                        start = time.perf_counter()
+                        db_manager.save_results("writer", random_scores(rng))
+                        stalls.append(time.perf_counter() - start)
+                        time.sleep(write_interval)
+
+                writer = threading.Thread(target=write)
+                writer.start()
+                try:
+                    report = backup_database(db_manager, os.path.join(temp_dir, 'backups'), **options)
+                finally:
+                    stop.set()
+                    writer.join()
+                journal = "WAL" if multi_writer else "rollback"
+                print(f"  {journal:<9} {label:<15} {report.bytes_per_sec / 1e6:7.1f} MB/s, "
+                      f"longest step {report.max_step_seconds * 1000:6.1f} ms, "
+                      f"max writer stall {max(stalls) * 1000:6.1f} ms, {report.restarts} restarts")
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+def bench_trends(users: int = 100_000, results_per_user: int = 4, new_results: int = 1000):
+    """Measure a full trend build and an incremental refresh after new results."""
+    from utils.transfer import load_rows
+    from utils.trends import TrendCache
+
+    print("=" * 60)
+    print(f"ROLE TRENDS - {users:,} users x {results_per_user} results")
+    print("=" * 60)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_manager = DatabaseManager(os.path.join(temp_dir, 'bench.db'))
+        rng = random.Random(42)
+        load_rows(db_manager, ({'username': f"user{i % users}", 'timestamp': '2024-01-01 00:00:00',
+                                **{column: rng.randint(0, 20) for column in DatabaseManager.SCORE_COLUMNS}}
+                               for i in range(users * results_per_user)))
+        cache_path = os.path.join(temp_dir, 'trends.npz')
+
+        cache = TrendCache(cache_path)
+        applied, elapsed = timed(cache.refresh, db_manager)
+        _, report_time = timed(cache.report)
+        cache.save()
+        print(f"  {'full build':<22} {elapsed:8.2f}s ({applied:,} results), report {report_time:.3f}s")
+
+        load_rows(db_manager, ({'username': f"user{rng.randrange(users)}",
+                                **{column: rng.randint(0, 20) for column in DatabaseManager.SCORE_COLUMNS}}
+                               for _ in range(new_results)))
+        cache, load_time = timed(TrendCache, cache_path)
+        applied, elapsed = timed(cache.refresh, db_manager)
+        print(f"  {'incremental refresh':<22} {load_time + elapsed:8.2f}s ({applied:,} new results, "
+              f"cache load {load_time:.3f}s)")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def bench_dashboard(users: int = 50_000, results_per_user: int = 3, new_results: int = 1000):
+    """Measure a full dashboard build and an incremental rebuild after new submissions."""
+    from utils.dashboard import build_dashboard
+    from utils.transfer import load_rows
+
+    print("=" * 60)
+    print(f"STATIC DASHBOARD - {users:,} users")
+    print("=" * 60)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_manager = DatabaseManager(os.path.join(temp_dir, 'bench.db'))
+        site = os.path.join(temp_dir, 'site')
+        rng = random.Random(42)
+        load_rows(db_manager, ({'username': f"user{i % users}", 'timestamp': '2024-01-01 00:00:00',
+                                **{column: rng.randint(0, 20) for column in DatabaseManager.SCORE_COLUMNS}}
+                               for i in range(users * results_per_user)))
+
+        stats, elapsed = timed(build_dashboard, db_manager, site)
+        print(f"  {'full build':<22} {elapsed:8.2f}s ({stats['rendered']:,} user pages)")
+
+        for _ in range(new_results):
+            db_manager.save_results(f"user{rng.randrange(users)}", random_scores(rng))
+        stats, elapsed = timed(build_dashboard, db_manager, site)
+        print(f"  {'incremental rebuild':<22} {elapsed:8.2f}s ({stats['rendered']:,} user pages after "
+              f"{new_results:,} new results)")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def bench_role_stats(rows: int = 1_000_000, shards: int = 4, new_results: int = 1000):
+    """Measure streaming role correlations, shard merging and an incremental refresh."""
+    from utils.role_stats import RoleStatistics
+    from utils.transfer import load_rows
+
+    print("=" * 60)
+    print(f"ROLE STATISTICS - {rows:,} results")
+    print("=" * 60)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_manager = DatabaseManager(os.path.join(temp_dir, 'bench.db'))
+        rng = random.Random(42)
+        load_rows(db_manager, ({'username': f"user{i % 1000}", 'timestamp': '2024-01-01 00:00:00',
+                                **{column: rng.randint(0, 20) for column in DatabaseManager.SCORE_COLUMNS}}
+                               for i in range(rows)))
+
+        stats = RoleStatistics()
+        added, elapsed = timed(stats.refresh, db_manager)
+        print(f"  {'full pass':<22} {elapsed:8.2f}s ({added / elapsed:,.0f} results/s)")
+
+        scores = np.random.default_rng(42).integers(0, 21, size=(rows, len(BelbinTest.ROLES)))
+        parts = [RoleStatistics().update(chunk) for chunk in np.array_split(scores, shards)]
+        merged = RoleStatistics()
+        _, elapsed = timed(lambda: [merged.merge(part) for part in parts])
+        error = np.nanmax(np.abs(merged.correlation() - np.corrcoef(scores, rowvar=False)))
+        print(f"  {f'merge {shards} shards':<22} {elapsed * 1000:8.3f}ms (max error vs np.corrcoef {error:.1e})")
+
+        state = os.path.join(temp_dir, 'role_stats.json')
+        stats.save(state)
+        for _ in range(new_results):
+            db_manager.save_results(f"user{rng.randrange(1000)}", random_scores(rng))
+        stats, load_time = timed(RoleStatistics.load, state)
+        added, elapsed = timed(stats.refresh, db_manager)
+        print(f"  {'incremental refresh':<22} {load_time + elapsed:8.3f}s ({added:,} new results)")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def bench_scoring(respondents: int = 200_000, schemes: int = 8):
+    """Compare stacked scheme evaluation with scoring each scheme separately."""
+    from utils.scoring import ScoringScheme, SchemeSet, encode_answers
+
+    print("=" * 60)
+    print(f"SCORING SCHEMES - {respondents:,} respondents x {schemes} schemes")
+    print("=" * 60)
+
+    rng = random.Random(42)
+    answer_sets = []
+    for _ in range(respondents):
+        answers = {}
+        for question_idx, question in enumerate(BelbinTest.QUESTIONS):
+            first, second = rng.sample(list(question['options']), 2)
+            points = rng.randint(0, 10)
+            answers[question_idx] = {first: points, second: 10 - points}
+        answer_sets.append(answers)
+    scheme_set = SchemeSet([ScoringScheme.raw(f"w{i}", weights=[1 + i / 10, 1, 1], normalize=i % 2 == 1)
+                            for i in range(schemes)])
+
+    _, separate = timed(lambda: [SchemeSet([scheme]).score_answers(answer_sets)
+                                 for scheme in [ScoringScheme.raw(f"w{i}") for i in range(schemes)]])
+    points, encode_time = timed(encode_answers, answer_sets)
+    scores, evaluate_time = timed(scheme_set.evaluate, points)
+    print(f"  {'one scheme per pass':<22} {separate:8.2f}s")
+    print(f"  {'stacked single pass':<22} {encode_time + evaluate_time:8.2f}s "
+          f"(encode {encode_time:.2f}s, evaluate {evaluate_time:.3f}s, shape {scores.shape})")
+
+
+def bench_history(rows: int = 1_000_000, page_size: int = 200):
+    """Measure history browser page queries deep into a large table."""
+    from utils.transfer import load_rows
+
+    print("=" * 60)
+    print(f"HISTORY PAGING - {rows:,} results, {page_size} rows per page")
+    print("=" * 60)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_manager = DatabaseManager(os.path.join(temp_dir, 'bench.db'))
+        rng = random.Random(42)
+        load_rows(db_manager, ({'username': f"user{rng.randrange(100_000):05d}",
+                                'timestamp': f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00",
+                                **{column: rng.randint(0, 20) for column in DatabaseManager.SCORE_COLUMNS}}
+                               for _ in range(rows)))
+        columns = ', '.join(DatabaseManager.RESULT_COLUMNS)
+
+        for order_by in ('timestamp', 'username', 'sp_score'):
+            first, first_time = timed(db_manager.page_results, None, order_by, True, None, page_size)
+            deep_row = db_manager.fetch_all(f'SELECT {columns} FROM test_results ORDER BY {order_by} DESC, id DESC '
+                                            f'LIMIT 1 OFFSET ?', (rows * 9 // 10,))[0]
+            index = DatabaseManager.RESULT_COLUMNS.index(order_by)
+            _, deep_time = timed(db_manager.page_results, None, order_by, True,
+                                 (deep_row[index], deep_row[0]), page_size)
+            _, offset_time = timed(db_manager.fetch_all,
+                                   f'SELECT {columns} FROM test_results ORDER BY {order_by} DESC, id DESC '
+                                   f'LIMIT ? OFFSET ?', (page_size, rows * 9 // 10))
+            print(f"  {'by ' + order_by:<22} first {first_time * 1000:7.1f}ms, keyset at 90% "
+                  f"{deep_time * 1000:7.1f}ms, OFFSET at 90% {offset_time * 1000:7.1f}ms")
+
+        _, elapsed = timed(db_manager.page_results, 'user123', 'username', False, None, page_size)
+        total, count_time = timed(db_manager.count_results, 'user123')
+        print(f"  {'prefix search':<22} page {elapsed * 1000:7.1f}ms, count {count_time * 1000:.1f}ms "
+              f"({total:,} matches)")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def bench_name_search(names: int = 1_000_000, lookups: int = 200):
+    """Measure building the name index and prefix / fuzzy lookup latency."""
+    from utils.name_search import NameIndex
+    from utils.transfer import load_rows
+
+    print("=" * 60)
+    print(f"NAME SEARCH - {names:,} distinct names")
+    print("=" * 60)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_manager = DatabaseManager(os.path.join(temp_dir, 'bench.db'))
+        rng = random.Random(42)
+        letters = 'abcdefghijklmnopqrstuvwxyz'
+        first = [''.join(rng.choice(letters) for _ in range(rng.randint(3, 8))).title() for _ in range(3000)]
+        last = [''.join(rng.choice(letters) for _ in range(rng.randint(4, 10))).title() for _ in range(3000)]
+        usernames = list({f"{rng.choice(first)} {rng.choice(last)}" for _ in range(names)})
+        load_rows(db_manager, ({'username': name, 'timestamp': '2024-01-01 00:00:00'} for name in usernames))
+
+        index, elapsed = timed(NameIndex.install, db_manager)
+        print(f"  {'build index':<22} {elapsed:8.2f}s ({len(index):,} names)")
+
+        sample = rng.sample(usernames, lookups)
+        typos = []
+        for name in sample:
+            i = rng.randrange(len(name) - 1)
+            typos.append(name[:i] + name[i + 1] + name[i] + name[i + 2:])
+        for label, lookup, queries in (('prefix', index.prefix, [name[:-2] for name in sample]),
+                                       ('fuzzy', index.fuzzy, typos)):
+            times, hits = [], 0
+            for query, name in zip(queries, sample):
+                matches, elapsed = timed(lookup, query)
+                times.append(elapsed)
+                hits += name in [match.name for match in matches]
+            times.sort()
+            print(f"  {label + ' lookup':<22} p50 {times[len(times) // 2] * 1000:6.1f}ms, "
+                  f"p99 {times[int(len(times) * 0.99)] * 1000:6.1f}ms, found {hits / lookups:.0%}")
+
+        _, elapsed = timed(lambda: [db_manager.save_results(f"New Person {i}", random_scores(rng))
+                                    for i in range(500)])
+        print(f"  {'save with index':<22} {elapsed / 500 * 1000:8.2f}ms per result")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def bench_telemetry(sessions: int = 1_000_000):
+    """Measure batched timing writes and the per-question latency report."""
+    from utils.telemetry import SessionTiming, TelemetryWriter, question_stats
+
+    print("=" * 60)
+    print(f"QUESTION TIMING - {sessions:,} sessions")
+    print("=" * 60)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(temp_dir, 'bench.db')
+        db_manager = DatabaseManager(db_path)
+        rng = np.random.default_rng(42)
+        questions = len(BelbinTest.QUESTIONS)
+        dwell = rng.lognormal(10, 0.6, size=(sessions, questions)).astype(np.uint32)
+        edits = rng.poisson(3, size=(sessions, questions)).astype(np.uint16)
+        visits = np.ones((sessions, questions), dtype=np.uint8)
+        timings = [SessionTiming(dwell[i], edits[i], visits[i], True) for i in range(sessions)]
+
+        writer = TelemetryWriter(db_manager, batch_size=1000)
+        start = time.perf_counter()
+        for timing in timings:
+            writer.record(timing)
+        enqueue = time.perf_counter() - start
+        writer.close()
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(db_path)
+        print(f"  {'batched writes':<22} {elapsed:8.2f}s ({sessions / elapsed:,.0f} sessions/s, "
+              f"{enqueue / sessions * 1e6:.1f}us to queue one)")
+        print(f"  {'storage':<22} {size / sessions:8.1f} bytes per session")
+
+        stats, elapsed = timed(question_stats, db_manager)
+        print(f"  {'latency report':<22} {elapsed:8.2f}s (question 1 median {stats[0].median_seconds:.1f}s, "
+              f"p99 {stats[0].p99_seconds:.1f}s)")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def _score_pickled(points, matrix):
+    """Score a batch that was pickled to this worker process."""
+    return np.rint(points @ matrix).astype(np.int32)
+
+
+def bench_parallel_scoring(respondents: int = 10_000_000, saved: int = 1_000_000):
+    """Compare shared-memory scoring with pickled batches at increasing worker counts."""
+    from concurrent.futures import ProcessPoolExecutor
+    from utils.parallel_scoring import ParallelScorer
+    from utils.transfer import load_scores
+
+    print("=" * 60)
+    print(f"PARALLEL SCORING - {respondents:,} respondents, {os.cpu_count()} CPUs")
+    print("=" * 60)
+
+    scorer = ParallelScorer(1)
+    rng = np.random.default_rng(42)
+    with scorer.allocate(respondents) as answers:
+        for start in range(0, respondents, 1_000_000):
+            stop = min(start + 1_000_000, respondents)
+            answers.array[start:stop] = rng.integers(0, 11, size=(stop - start, answers.shape[1]))
+
+        baseline = None
+        for workers in (1, 2, 4, 8):
+            scorer.workers = workers
+            scores, elapsed = timed(scorer.score_shared, answers)
+            baseline = baseline or elapsed
+            with scores:
+                print(f"  {f'shared memory x{workers}':<22} {elapsed:8.2f}s ({respondents / elapsed:,.0f}/s, "
+                      f"speedup {baseline / elapsed:.1f}x)")
+
+        batches = np.array_split(answers.array, 64)
+        with ProcessPoolExecutor(max_workers=8) as executor:
+            _, elapsed = timed(lambda: list(executor.map(_score_pickled, batches, [scorer.matrix] * len(batches))))
+        print(f"  {'pickled batches x8':<22} {elapsed:8.2f}s ({respondents / elapsed:,.0f}/s)")
+
+        scorer.workers = os.cpu_count()
+        with scorer.score_shared(answers) as scores:
+            temp_dir = tempfile.mkdtemp()
+            try:
+                db_manager = DatabaseManager(os.path.join(temp_dir, 'bench.db'))
+                usernames = [f"user{i}" for i in range(saved)]
+                count, elapsed = timed(load_scores, db_manager, usernames, scores.array[:saved])
+                print(f"  {'single writer save':<22} {elapsed:8.2f}s ({count / elapsed:,.0f} rows/s)")
+            finally:
+                shutil.rmtree(temp_dir)
+
+
+def bench_question_banks(banks: int = 200, questions: int = 60):
+    """Measure bank discovery, first-load compilation and cached loads."""
+    from utils.question_bank import BankRegistry, export_bank
+
+    print("=" * 60)
+    print(f"QUESTION BANKS - {banks} installed banks x {questions} questions")
+    print("=" * 60)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        large = type('LargeTest', (BelbinTest,),
+                     {'QUESTIONS': (BelbinTest.QUESTIONS * questions)[:questions]})
+        for i in range(banks):
+            export_bank(os.path.join(temp_dir, f'lang{i:03d}-1.json'), large)
+
+        registry, elapsed = timed(lambda: BankRegistry(temp_dir))
+        _, listing = timed(registry.available)
+        print(f"  {'startup and listing':<22} {(elapsed + listing) * 1000:8.2f}ms for {len(registry)} banks")
+
+        languages = registry.languages()
+        _, compile_time = timed(lambda: [registry.get(language) for language in languages])
+        print(f"  {'first load (compile)':<22} {compile_time / banks * 1000:8.2f}ms per bank")
+
+        registry = BankRegistry(temp_dir)
+        _, cached = timed(lambda: [registry.get(language) for language in languages])
+        print(f"  {'cached load':<22} {cached / banks * 1000:8.2f}ms per bank")
+
+        _, switch = timed(lambda: [registry.get(languages[i % 2]) for i in range(10000)])
+        print(f"  {'switch loaded bank':<22} {switch / 10000 * 1e6:8.2f}us")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def bench_service(requests: int = 2000, levels=(1, 8, 32, 128)):
+    """Measure the HTTP scoring service with and without micro-batching."""
+    import asyncio
+    from utils.service import REPORT_HEADER, ScoringService, format_report, run_load
+
+    print("=" * 60)
+    print(f"SCORING SERVICE - {requests} submissions per concurrency level")
+    print("=" * 60)
+
+    async def measure(max_batch):
+        temp_dir = tempfile.mkdtemp()
+        service = ScoringService(DatabaseManager(os.path.join(temp_dir, 'results.db'), multi_writer=True),
+                                 max_batch=max_batch)
+        try:
+            host, port = await service.start('127.0.0.1', 0)
+            for seed, concurrency in enumerate(levels):
+                report = await run_load(f'http://{host}:{port}', concurrency, requests, seed)
+                print(format_report(report))
+            print(f"  {service.scored} submissions saved in {service.batches} transactions")
+        finally:
+            await service.close()
+            shutil.rmtree(temp_dir)
+
+    for max_batch, label in ((1, 'one submission per transaction'), (256, 'micro-batched')):
+        print(f"  {label}:")
+        print(REPORT_HEADER)
+        asyncio.run(measure(max_batch))
+
+
+BENCHMARKS = {
+    'cache': bench_cache,
+    'ranking': bench_ranking,
+    'multi_writer': bench_multi_writer,
+    'transfer': bench_transfer,
+    'in_memory': bench_in_memory,
+    'backup': bench_backup,
+    'trends': bench_trends,
+    'dashboard': bench_dashboard,
+    'role_stats': bench_role_stats,
+    'scoring': bench_scoring,
+    'history': bench_history,
+    'name_search': bench_name_search,
+    'telemetry': bench_telemetry,
+    'parallel_scoring': bench_parallel_scoring,
+    'question_banks': bench_question_banks,
+    'service': bench_service,
+}
+
+
+def main():
+    """Run the selected benchmarks."""
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}")
+        print(f"Available: {', '.join(BENCHMARKS)}")
+        return 1
+
+    for name in selected:
+        BENCHMARKS[name]()
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Screen capture harness for Belbin Test application.
+Drives the GUI with scripted answers and compares screens with baselines.
+
+Each screen is captured as soon as Tk has no pending events or idle tasks,
+so runs are deterministic and need no fixed delays. Without a display the
+harness starts its own Xvfb server, which makes it usable on CI.
+
+Baselines depend on the fonts and theme of the machine that made them,
+so they are generated on CI's Xvfb image. Where the ``CI`` environment
+variable is set, a missing baseline fails the test suite instead of
+skipping.
+
+Usage:
+    python -m gui.capture                 # compare with tests/baselines
+    python -m gui.capture --update        # rewrite the baselines
+"""
+
+import _tkinter
+import contextlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import tkinter as tk
+from dataclasses import dataclass
+from tkinter import ttk
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+from PIL import Image, ImageGrab
+
+# Add utils to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from gui.tkinter_interface import BelbinTestGUI
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), '..', 'tests', 'baselines')
+SCREENS = ('welcome', 'question', 'results', 'results_chart')
+CAPTURE_USERNAME = "Alex Example"
+WINDOW_GEOMETRY = "800x600+0+0"
+
+
+@dataclass
+class ImageDiff:
+    """Result of comparing a captured screen with its baseline."""
+    changed_fraction: float
+    max_delta: int
+    passed: bool
+    diff: Optional[Image.Image] = None
+
+
+def compare_images(actual: Image.Image, baseline: Image.Image, threshold: int = 16,
+                   tolerance: float = 0.001) -> ImageDiff:
+    """Compare two images pixel by pixel.
+    
+    A pixel counts as changed when any channel differs by more than
+    ``threshold``; the comparison passes when at most ``tolerance`` of the
+    pixels changed. Images of different sizes never match. The diff image
+    marks changed pixels in red over a faded copy of the baseline.
+    """
+    if actual.size != baseline.size:
+        return ImageDiff(1.0, 255, False)
+    a = np.asarray(actual.convert('RGB'), dtype=np.int16)
+    b = np.asarray(baseline.convert('RGB'), dtype=np.int16)
+    delta = np.abs(a - b).max(axis=2)
+    changed = delta > threshold
+    fraction = float(changed.mean())
+    
+    diff = (b // 3 + 170).astype(np.uint8)
+    diff[changed] = (255, 0, 0)
+    return ImageDiff(fraction, int(delta.max()), fraction <= tolerance, Image.fromarray(diff))
+
+
+@contextlib.contextmanager
+def virtual_display(size: str = '1024x768x24') -> Iterator[Optional[str]]:
+    """Start an Xvfb server for the block if no display is set.
+    
+    Yields the display name in use, or None when there is no display and
+    Xvfb is not installed.
+    """
+    if os.environ.get('DISPLAY'):
+        yield os.environ['DISPLAY']
+        return
+    if shutil.which('Xvfb') is None:
+        yield None
+        return
+    
+    # Xvfb picks a free display number and reports it on the pipe
+    read_fd, write_fd = os.pipe()
+    server = subprocess.Popen(['Xvfb', '-displayfd', str(write_fd), '-screen', '0', size, '-nolisten', 'tcp'],
+                              pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    try:
+        with os.fdopen(read_fd) as pipe:
+            display = f":{pipe.readline().strip()}"
+        os.environ['DISPLAY'] = display
+        yield display
+    finally:
+        os.environ.pop('DISPLAY', None)
+        server.terminate()
+        server.wait()
+
+
+def settle(root: tk.Tk, max_rounds: int = 100):
+    """Process events until Tk is idle and the X server has caught up.
+    
+    Raises RuntimeError if events keep arriving, for example from a
+    repeating timer.
+    """
+    for _ in range(max_rounds):
+        root.update_idletasks()
+        # A query round trip means the server has handled every earlier request,
+        # so the expose events it generated are now queued
+        root.winfo_pointerxy()
+        if not root.tk.dooneevent(_tkinter.ALL_EVENTS | _tkinter.DONT_WAIT):
+            return
+        while root.tk.dooneevent(_tkinter.ALL_EVENTS | _tkinter.DONT_WAIT):
+            pass
+    raise RuntimeError("GUI did not become idle")
+
+
+def grab_window(root: tk.Tk) -> Image.Image:
+    """Settle the GUI and capture the root window's contents."""
+    # Without focus the entry caret does not blink into the capture
+    root.focus_set()
+    settle(root)
+    x, y = root.winfo_rootx(), root.winfo_rooty()
+    bbox = (x, y, x + root.winfo_width(), y + root.winfo_height())
+    return ImageGrab.grab(bbox=bbox).convert('RGB')
+
+
+def scripted_answer(question_index: int, keys) -> Dict[str, int]:
+    """Deterministic answer for a question: 6 and 4 points on rotating options."""
+    keys = list(keys)
+    first = keys[question_index % len(keys)]
+    second = keys[(question_index + 1) % len(keys)]
+    return {key: 6 if key == first else 4 if key == second else 0 for key in keys}
+
+
+def fill_answer(app: BelbinTestGUI, answer: Dict[str, int]):
+    """Type an answer into the current question's spinboxes."""
+    for key, spinbox in app.option_spinboxes.items():
+        spinbox.delete(0, tk.END)
+        spinbox.insert(0, str(answer[key]))
+    app.update_points_display()
+
+
+def find_widget(widget, widget_class):
+    """Return the first descendant of a widget that is an instance of a class."""
+    for child in widget.winfo_children():
+        if isinstance(child, widget_class):
+            return child
+        found = find_widget(child, widget_class)
+        if found is not None:
+            return found
+    return None
+
+
+def capture_screens(db_path: Optional[str] = None) -> Dict[str, Image.Image]:
+    """Run one scripted test session and capture every screen in SCREENS.
+    
+    Results are saved to ``db_path``, or to a temporary database. The GUI
+    is given the path when it is built, so it never opens the default
+    ``data/results.db``.
+    """
+    temp_dir = tempfile.mkdtemp()
+    root = tk.Tk()
+    try:
+        app = BelbinTestGUI(root, db_path=db_path or os.path.join(temp_dir, 'capture.db'))
+        root.geometry(WINDOW_GEOMETRY)
+        captures = {}
+        
+        app.username_entry.insert(0, CAPTURE_USERNAME)
+        captures['welcome'] = grab_window(root)
+        app.start_test()
+        
+        # The second question also shows the provisional profile
+        questions = app.belbin_test.QUESTIONS
+        for index, question in enumerate(questions):
+            fill_answer(app, scripted_answer(index, question['options']))
+            if index == 1:
+                captures['question'] = grab_window(root)
+            app.next_question()
+        
+        captures['results'] = grab_window(root)
+        notebook = find_widget(root, ttk.Notebook)
+        notebook.select(1)
+        captures['results_chart'] = grab_window(root)
+        app.close()
+        return captures
+    finally:
+        root.destroy()
+        shutil.rmtree(temp_dir)
+
+
+def check_baselines(captures: Dict[str, Image.Image], baseline_dir: str = BASELINE_DIR,
+                    output_dir: Optional[str] = None, **compare_options) -> Dict[str, ImageDiff]:
+    """Compare captures with the baseline PNGs in a directory.
+    
+    Screens without a baseline fail. When ``output_dir`` is given, failing
+    screens are written there as ``<name>.actual.png`` and ``<name>.diff.png``.
+    """
+    results = {}
+    for name, image in captures.items():
+        path = os.path.join(baseline_dir, f'{name}.png')
+        if not os.path.exists(path):
+            results[name] = ImageDiff(1.0, 255, False)
+        else:
+            with Image.open(path) as baseline:
+                results[name] = compare_images(image, baseline, **compare_options)
+        if output_dir and not results[name].passed:
+            os.makedirs(output_dir, exist_ok=True)
+            image.save(os.path.join(output_dir, f'{name}.actual.png'))
+            if results[name].diff is not None:
+                results[name].diff.save(os.path.join(output_dir, f'{name}.diff.png'))
+    return results
+
+
+def save_captures(captures: Dict[str, Image.Image], directory: str):
+    """Save captures as ``<name>.png`` files."""
+    os.makedirs(directory, exist_ok=True)
+    for name, image in captures.items():
+        image.save(os.path.join(directory, f'{name}.png'))
+
+
+def main(argv=None):
+    """Capture the GUI screens and compare them with, or update, the baselines."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Visual regression check of the Belbin GUI")
+    parser.add_argument('--baselines', default=BASELINE_DIR, help="baseline directory")
+    parser.add_argument('--update', action='store_true', help="overwrite the baselines with new captures")
+    parser.add_argument('--output', default='capture_failures', help="where to write failing captures")
+    parser.add_argument('--tolerance', type=float, default=0.001, help="allowed fraction of changed pixels")
+    args = parser.parse_args(argv)
+    
+    with virtual_display() as display:
+        if display is None:
+            print("No display available and Xvfb is not installed")
+            return 2
+        captures = capture_screens()
+    
+    if args.update:
+        save_captures(captures, args.baselines)
+        print(f"Saved {len(captures)} baselines to {args.baselines}")
+        return 0
+    
+    results = check_baselines(captures, args.baselines, args.output, tolerance=args.tolerance)
+    for name, result in results.items():
+        status = "ok" if result.passed else "FAILED"
+        print(f"  {name:<15} {status:<7} {result.changed_fraction:.4%} changed, max delta {result.max_delta}")
+    return 0 if all(result.passed for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+History browser for Belbin Test application.
+Browses stored results in a Treeview that pages rows in lazily as it scrolls.
+
+Every page is a keyset query (``DatabaseManager.page_results``), so a page
+deep into a million results costs the same as the first one. The Treeview
+holds a sliding window of at most ``max_rows`` rows: pages are appended or
+prepended as the view nears either end and trimmed from the other. Queries
+run on a background thread; results are handed back through a queue that
+the Tk main loop polls, so the window stays responsive while they load.
+The search box also offers close matches from the name search index, so a
+misspelled name still finds its results. Without an installed index it
+offers names starting with the search text instead.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+import queue
+import threading
+from typing import List, Optional, Tuple
+import sys
+import os
+
+# Add utils to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.data_processing import BelbinTest, DatabaseManager
+from utils.name_search import NameIndex
+
+HEADINGS = ['#', 'Name', 'Time'] + list(BelbinTest.ROLES)
+
+
+class ResultPager:
+    """Keyset paging over results for one username prefix and sort order."""
+    
+    def __init__(self, db_manager: DatabaseManager, prefix: str = '', order_by: str = 'timestamp',
+                 descending: bool = True, page_size: int = 200):
+        self.db_manager = db_manager
+        self.prefix = prefix
+        self.order_by = order_by
+        self.descending = descending
+        self.page_size = page_size
+        self.sort_index = DatabaseManager.RESULT_COLUMNS.index(order_by)
+    
+    def key(self, row: Tuple) -> Tuple:
+        """Return the (sort value, id) key of a row."""
+        return row[self.sort_index], row[0]
+    
+    def first(self) -> List[Tuple]:
+        """Return the first page."""
+        return self.db_manager.page_results(self.prefix, self.order_by, self.descending, None, self.page_size)
+    
+    def after(self, row: Tuple) -> List[Tuple]:
+        """Return the page following a row."""
+        return self.db_manager.page_results(self.prefix, self.order_by, self.descending,
+                                            self.key(row), self.page_size)
+    
+    def before(self, row: Tuple) -> List[Tuple]:
+        """Return the page preceding a row, in display order."""
+        rows = self.db_manager.page_results(self.prefix, self.order_by, not self.descending,
+                                            self.key(row), self.page_size)
+        return rows[::-1]
+    
+    def count(self) -> int:
+        """Return the number of matching results."""
+        return self.db_manager.count_results(self.prefix)
+
+
+class HistoryBrowser:
+    """Window listing stored results with search, sorting and lazy paging."""
+    
+    # Fraction of the scroll range from either end that triggers a page load
+    EDGE = 0.2
+    
+    def __init__(self, root: tk.Misc, db_manager: DatabaseManager, page_size: int = 200,
+                 max_rows: int = 2000, poll_interval: int = 30):
+        self.db_manager = db_manager
+        self.page_size = page_size
+        self.max_rows = max(max_rows, 2 * page_size)
+        self.poll_interval = poll_interval
+        
+        self.window = tk.Toplevel(root)
+        self.window.title("Results History")
+        self.window.geometry("900x500")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.window.columnconfigure(0, weight=1)
+        self.window.rowconfigure(1, weight=1)
+        
+        search_frame = ttk.Frame(self.window, padding=(10, 10, 10, 5))
+        search_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E))
+        ttk.Label(search_frame, text="Name starts with:").pack(side=tk.LEFT, padx=(0, 5))
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Combobox(search_frame, textvariable=self.search_var, width=30)
+        self.search_entry.pack(side=tk.LEFT)
+        self.status_label = ttk.Label(search_frame, text="Loading...")
+        self.status_label.pack(side=tk.RIGHT)
+        
+        self.tree = ttk.Treeview(self.window, columns=DatabaseManager.RESULT_COLUMNS,
+                                 show='headings', selectmode='browse')
+        for column, heading in zip(DatabaseManager.RESULT_COLUMNS, HEADINGS):
+            self.tree.heading(column, text=heading, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=50, anchor=tk.CENTER, stretch=column == 'username')
+        self.tree.column('username', width=180, anchor=tk.W)
+        self.tree.column('timestamp', width=150)
+        self.tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(10, 0), pady=(0, 10))
+        
+        self.scrollbar = ttk.Scrollbar(self.window, orient=tk.VERTICAL, command=self.tree.yview)
+        self.scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S), padx=(0, 10), pady=(0, 10))
+        self.tree.configure(yscrollcommand=self.on_scroll)
+        
+        # Rows currently in the tree, in display order
+        self.rows: List[Tuple] = []
+        self.at_start = True
+        self.at_end = False
+        self.loading = False
+        self.total: Optional[int] = None
+        self.suggestions: List[str] = []
+        # Opened on the loader thread once an installed index is found
+        self.name_index: Optional[NameIndex] = None
+        self.pager = ResultPager(db_manager, page_size=page_size)
+        # Bumped on every new search or sort; replies for older ones are dropped
+        self.generation = 0
+        self.search_after = None
+        self.closed = False
+        
+        self.requests = queue.Queue()
+        self.replies = queue.Queue()
+        self.worker = threading.Thread(target=self.load_worker, daemon=True)
+        self.worker.start()
+        
+        self.search_var.trace_add('write', self.on_search_changed)
+        self.update_headings()
+        self.reload()
+        self.poll_id = self.window.after(self.poll_interval, self.poll_replies)
+    
+    def load_worker(self):
+        """Run page queries on a background thread until stopped."""
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            generation, kind, pager, argument = request
+            if generation != self.generation:
+                continue
+            try:
+                if kind == 'first':
+                    result = pager.first()
+                elif kind == 'next':
+                    result = pager.after(argument)
+                elif kind == 'previous':
+                    result = pager.before(argument)
+                elif kind == 'suggest':
+                    result = self.suggest(argument)
+                else:
+                    result = pager.count()
+            except Exception as e:
+                result = e
+            self.replies.put((generation, kind, result))
+    
+    def suggest(self, text: str, limit: int = 10) -> List[str]:
+        """Return names for the search box, falling back to a LIKE query without a name index."""
+        if self.name_index is None and NameIndex.installed(self.db_manager):
+            self.name_index = NameIndex(self.db_manager)
+        if self.name_index is not None:
+            return [match.name for match in self.name_index.search(text, limit)]
+        pattern = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        rows = self.db_manager.run_with_retry(
+            self.db_manager.fetch_all,
+            "SELECT DISTINCT username FROM test_results WHERE username LIKE ? ESCAPE '\\' "
+            "ORDER BY username LIMIT ?",
+            (pattern, limit)
+        )
+        return [row[0] for row in rows]
+    
+    def request(self, kind: str, argument=None):
+        """Queue a query for the current search and sort order.
+        
+        ``argument`` is the anchor row for 'next' and 'previous' and the
+        search text for 'suggest'.
+        """
+        if kind in ('first', 'next', 'previous'):
+            self.loading = True
+        self.requests.put((self.generation, kind, self.pager, argument))
+    
+    def reload(self):
+        """Start again from the first page with the current search and sort order."""
+        self.generation += 1
+        self.tree.delete(*self.tree.get_children())
+        self.rows = []
+        self.at_start, self.at_end = True, False
+        self.total = None
+        self.suggestions = []
+        self.status_label.config(text="Loading...")
+        self.request('first')
+        self.request('count')
+    
+    def on_search_changed(self, *args):
+        """Reload shortly after typing pauses."""
+        if self.search_after is not None:
+            self.window.after_cancel(self.search_after)
+        self.search_after = self.window.after(250, self.apply_search)
+    
+    def apply_search(self):
+        """Reload with the username prefix from the search box."""
+        self.search_after = None
+        prefix = self.search_var.get().strip()
+        if prefix != self.pager.prefix:
+            self.pager = ResultPager(self.db_manager, prefix, self.pager.order_by,
+                                     self.pager.descending, self.page_size)
+            self.reload()
+            if prefix:
+                self.request('suggest', prefix)
+    
+    def sort_by(self, column: str):
+        """Sort by a column, toggling the direction when it is already the sort column."""
+        descending = not self.pager.descending if column == self.pager.order_by else column != 'username'
+        self.pager = ResultPager(self.db_manager, self.pager.prefix, column, descending, self.page_size)
+        self.update_headings()
+        self.reload()
+    
+    def update_headings(self):
+        """Mark the sort column and direction in the headings."""
+        for column, heading in zip(DatabaseManager.RESULT_COLUMNS, HEADINGS):
+            if column == self.pager.order_by:
+                heading += ' ▼' if self.pager.descending else ' ▲'
+            self.tree.heading(column, text=heading)
+    
+    def on_scroll(self, first: str, last: str):
+        """Update the scrollbar and load another page near either end."""
+        self.scrollbar.set(first, last)
+        self.load_more(float(first), float(last))
+    
+    def load_more(self, first: float, last: float):
+        """Request the next or previous page if the view is near an edge of the window."""
+        if self.loading or not self.rows:
+            return
+        if last >= 1 - self.EDGE and not self.at_end:
+            self.request('next', self.rows[-1])
+        elif first <= self.EDGE and not self.at_start:
+            self.request('previous', self.rows[0])
+    
+    def poll_replies(self):
+        """Apply finished queries on the main thread."""
+        try:
+            while True:
+                generation, kind, result = self.replies.get_nowait()
+                if generation == self.generation:
+                    self.apply_reply(kind, result)
+        except queue.Empty:
+            pass
+        if not self.closed:
+            self.poll_id = self.window.after(self.poll_interval, self.poll_replies)
+    
+    def apply_reply(self, kind: str, result):
+        """Insert a loaded page, or show a count or error."""
+        if isinstance(result, Exception):
+            self.loading = False
+            self.status_label.config(text=f"Error loading results: {result}")
+            return
+        if kind == 'count':
+            self.total = result
+        elif kind == 'suggest':
+            self.suggestions = result
+            self.search_entry['values'] = result
+        elif kind == 'previous':
+            self.loading = False
+            self.at_start = len(result) < self.page_size
+            for row in reversed(result):
+                self.tree.insert('', 0, values=row)
+            self.rows[:0] = result
+            # Keep the same rows in view after inserting above them
+            self.tree.yview_scroll(len(result), 'units')
+            self.trim(from_start=False)
+        else:
+            self.loading = False
+            self.at_end = len(result) < self.page_size
+            for row in result:
+                self.tree.insert('', tk.END, values=row)
+            self.rows.extend(result)
+            self.trim(from_start=True)
+        self.update_status()
+        # The view may still be near an edge, e.g. after a short page
+        first, last = self.tree.yview()
+        self.load_more(first, last)
+    
+    def trim(self, from_start: bool):
+        """Drop rows beyond ``max_rows`` from one end of the window."""
+        excess = len(self.rows) - self.max_rows
+        if excess <= 0:
+            return
+        children = self.tree.get_children()
+        if from_start:
+            self.tree.delete(*children[:excess])
+            del self.rows[:excess]
+            self.at_start = False
+            self.tree.yview_scroll(-excess, 'units')
+        else:
+            self.tree.delete(*children[-excess:])
+            del self.rows[-excess:]
+            self.at_end = False
+    
+    def update_status(self):
+        """Show how many results are loaded and how many match."""
+        if self.total == 0 and self.suggestions:
+            self.status_label.config(text=f"No names start with '{self.pager.prefix}'. "
+                                          f"Did you mean {self.suggestions[0]}?")
+            return
+        total = "..." if self.total is None else f"{self.total:,}"
+        self.status_label.config(text=f"{len(self.rows):,} loaded of {total} results")
+    
+    def close(self):
+        """Stop the loader thread and close the window."""
+        self.closed = True
+        self.generation += 1
+        self.requests.put(None)
+        self.window.after_cancel(self.poll_id)
+        if self.search_after is not None:
+            self.window.after_cancel(self.search_after)
+        self.window.destroy()
@@ -0,0 +1,207 @@
+"""
+Memory budget harness for Belbin Test application.
+Runs hundreds of scripted test sessions and checks that the GUI stops growing.
+
+Each session goes through the welcome screen, every question and the
+results screen, then presses "Take Test Again". After a warm-up, the
+harness measures the second half of the run against the first: Python heap
+growth per session (via ``tracemalloc``), the number of Tcl commands and
+images, and the matplotlib figures still alive. A long-running station
+repeats this loop indefinitely, so anything retained per session shows up
+as steady growth. On failure the report lists the source lines that
+allocated the retained memory.
+
+Participants' names are drawn from a small pool, so bounded caches keyed
+by text (such as matplotlib's text layout cache) fill during the warm-up
+instead of looking like a leak.
+
+Usage:
+    python -m gui.memory_budget                   # 300 sessions
+    python -m gui.memory_budget --sessions 1000 --kiosk
+"""
+
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import tkinter as tk
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from matplotlib.figure import Figure
+
+# Add utils to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from gui.capture import fill_answer, scripted_answer, virtual_display
+from gui.tkinter_interface import BelbinTestGUI
+
+USERNAMES = ("Alex Example", "Sam Sample", "Jo Tester", "Kim Trial")
+
+
+@dataclass
+class MemoryBudget:
+    """Allowed growth over the measured half of a run."""
+    bytes_per_session: int = 2048
+    tcl_commands: int = 0
+    tcl_images: int = 0
+    figures: int = 1
+
+
+@dataclass
+class MemoryReport:
+    """Growth measured between the middle and the end of a run."""
+    sessions: int
+    heap_growth: int
+    tcl_command_growth: int
+    tcl_image_growth: int
+    live_figures: int
+    top_sites: List[str] = field(default_factory=list)
+    
+    @property
+    def bytes_per_session(self) -> float:
+        """Average heap growth per measured session."""
+        return self.heap_growth / max(self.sessions, 1)
+    
+    def failures(self, budget: MemoryBudget) -> List[str]:
+        """Return a message for every budget that was exceeded."""
+        failures = []
+        if self.bytes_per_session > budget.bytes_per_session:
+            failures.append(f"heap grew {self.bytes_per_session:,.0f} bytes per session "
+                            f"(budget {budget.bytes_per_session:,})")
+        if self.tcl_command_growth > budget.tcl_commands:
+            failures.append(f"{self.tcl_command_growth} Tcl commands added (budget {budget.tcl_commands})")
+        if self.tcl_image_growth > budget.tcl_images:
+            failures.append(f"{self.tcl_image_growth} Tk images added (budget {budget.tcl_images})")
+        if self.live_figures > budget.figures:
+            failures.append(f"{self.live_figures} matplotlib figures alive (budget {budget.figures})")
+        return failures
+    
+    def format(self, budget: Optional[MemoryBudget] = None) -> str:
+        """Describe the measurements, with allocation sites when a budget fails."""
+        lines = [
+            f"Measured sessions:  {self.sessions}",
+            f"Heap growth:        {self.heap_growth:,} bytes ({self.bytes_per_session:,.0f} per session)",
+            f"Tcl commands added: {self.tcl_command_growth}",
+            f"Tk images added:    {self.tcl_image_growth}",
+            f"Live figures:       {self.live_figures}",
+        ]
+        failures = self.failures(budget) if budget is not None else []
+        if failures:
+            lines.append("Over budget:")
+            lines.extend(f"  {failure}" for failure in failures)
+            lines.append("Top allocation sites:")
+            lines.extend(f"  {site}" for site in self.top_sites)
+        return '\n'.join(lines)
+
+
+def pump(root: tk.Tk):
+    """Process pending events and idle tasks without waiting for timers."""
+    root.update()
+    root.update_idletasks()
+
+
+def run_session(app: BelbinTestGUI, username: str):
+    """Take one full test and return to the welcome screen."""
+    app.username_entry.delete(0, tk.END)
+    app.username_entry.insert(0, username)
+    app.start_test()
+    for index, question in enumerate(app.belbin_test.QUESTIONS):
+        fill_answer(app, scripted_answer(index, question['options']))
+        app.next_question()
+    pump(app.root)
+    # The "Take Test Again" button
+    app.create_welcome_screen()
+    pump(app.root)
+
+
+def live_figures() -> int:
+    """Return the number of matplotlib figures that have not been freed."""
+    return sum(isinstance(obj, Figure) for obj in gc.get_objects())
+
+
+class _Probe:
+    """Heap and Tcl state of the GUI at one point of a run."""
+    
+    def __init__(self, app: BelbinTestGUI):
+        # Queued saves and timings would otherwise count as retained memory
+        app.telemetry.flush()
+        if app.kiosk:
+            app.save_queue.join()
+        pump(app.root)
+        gc.collect()
+        self.snapshot = tracemalloc.take_snapshot()
+        self.commands = len(app.root.tk.splitlist(app.root.tk.call('info', 'commands')))
+        self.images = len(app.root.tk.splitlist(app.root.tk.call('image', 'names')))
+
+
+def measure_sessions(sessions: int = 300, warmup: int = 20, kiosk: bool = False,
+                     db_path: Optional[str] = None, frames: int = 10, top: int = 10) -> MemoryReport:
+    """Run scripted sessions and measure growth over the second half.
+    
+    The first half after the warm-up absorbs one-off allocations such as
+    caches being filled; only the second half is reported. Results are
+    saved to ``db_path``, or to a temporary database.
+    """
+    temp_dir = tempfile.mkdtemp()
+    root = tk.Tk()
+    was_tracing = tracemalloc.is_tracing()
+    try:
+        app = BelbinTestGUI(root, kiosk=kiosk, db_path=db_path or os.path.join(temp_dir, 'memory.db'))
+        pump(root)
+        for number in range(warmup):
+            run_session(app, USERNAMES[number % len(USERNAMES)])
+        
+        if not was_tracing:
+            tracemalloc.start(frames)
+        half = sessions // 2
+        for number in range(sessions - half):
+            run_session(app, USERNAMES[number % len(USERNAMES)])
+        middle = _Probe(app)
+        for number in range(half):
+            run_session(app, USERNAMES[number % len(USERNAMES)])
+        end = _Probe(app)
+        
+        stats = end.snapshot.compare_to(middle.snapshot, 'lineno')
+        app.close()
+        return MemoryReport(
+            sessions=half,
+            heap_growth=sum(stat.size_diff for stat in stats),
+            tcl_command_growth=end.commands - middle.commands,
+            tcl_image_growth=end.images - middle.images,
+            live_figures=live_figures(),
+            top_sites=[str(stat) for stat in stats[:top] if stat.size_diff > 0],
+        )
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+        root.destroy()
+        shutil.rmtree(temp_dir)
+
+
+def main(argv=None):
+    """Run the sessions and exit non-zero when a budget is exceeded."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Memory regression check of long-running GUI sessions")
+    parser.add_argument('--sessions', type=int, default=300, help="sessions after the warm-up; the second half is measured")
+    parser.add_argument('--warmup', type=int, default=20, help="sessions run before measuring")
+    parser.add_argument('--kiosk', action='store_true', help="run the GUI in kiosk mode")
+    parser.add_argument('--bytes-per-session', type=int, default=MemoryBudget.bytes_per_session,
+                        help="allowed heap growth per session")
+    args = parser.parse_args(argv)
+    
+    with virtual_display() as display:
+        if display is None:
+            print("No display available and Xvfb is not installed")
+            return 2
+        report = measure_sessions(args.sessions, args.warmup, args.kiosk)
+    
+    budget = MemoryBudget(bytes_per_session=args.bytes_per_session)
+    print(report.format(budget))
+    return 1 if report.failures(budget) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Team comparison view for Belbin Test application.
+Draws a users x roles heatmap and team-aggregate bars in one figure.
+"""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+
+import sys
+import os
+
+# Add utils to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.data_processing import BelbinTest, DatabaseManager
+
+# Above this many users the heatmap has no per-row tick labels
+MAX_LABELLED_USERS = 40
+
+
+class TeamHeatmap:
+    """Heatmap of team members' role scores with a team-average bar chart.
+    
+    The heatmap is a single image artist, so drawing cost does not grow with
+    the number of cells. Hover and selection highlights are animated artists
+    redrawn by blitting over a cached background once the canvas is connected.
+    """
+    
+    def __init__(self, figure: Figure, usernames: Sequence[str], scores, title: str = "Team Role Profile"):
+        self.figure = figure
+        self.usernames = list(usernames)
+        self.scores = np.asarray(scores).reshape(-1, len(BelbinTest.ROLES))
+        self.canvas = None
+        self.background = None
+        self.hover_row = None
+        self.selected_row = None
+        
+        grid = figure.add_gridspec(1, 2, width_ratios=(3, 1), wspace=0.35)
+        self.heat_ax = figure.add_subplot(grid[0, 0])
+        self.bar_ax = figure.add_subplot(grid[0, 1])
+        roles = list(BelbinTest.ROLES)
+        
+        # Heatmap: one image for all users x roles
+        self.image = self.heat_ax.imshow(self.scores, aspect='auto', interpolation='nearest', cmap='viridis')
+        self.heat_ax.set_xticks(range(len(roles)), roles)
+        if len(self.usernames) <= MAX_LABELLED_USERS:
+            self.heat_ax.set_yticks(range(len(self.usernames)), self.usernames, fontsize=8)
+        else:
+            self.heat_ax.set_yticks([])
+            self.heat_ax.set_ylabel(f"{len(self.usernames)} users")
+        self.heat_ax.set_title(title, fontsize=12, fontweight='bold')
+        figure.colorbar(self.image, ax=self.heat_ax, fraction=0.04, pad=0.02)
+        
+        # Team aggregate: mean score per role, with the selected user overlaid
+        means = self.scores.mean(axis=0) if len(self.scores) else np.zeros(len(roles))
+        positions = np.arange(len(roles))
+        self.bar_ax.barh(positions, means, color='lightsteelblue', label='Team average')
+        self.selection_line, = self.bar_ax.plot([], [], 'o', color='crimson', animated=True)
+        self.bar_ax.set_yticks(positions, roles)
+        self.bar_ax.invert_yaxis()
+        self.bar_ax.set_xlim(0, max(1, self.scores.max(initial=0)) * 1.05)
+        self.bar_ax.set_title("Team average", fontsize=10)
+        
+        # Animated highlights, drawn only by blitting
+        self.hover_box = Rectangle((-0.5, -0.5), len(roles), 1, fill=False, edgecolor='white',
+                                   linewidth=1.5, visible=False, animated=True)
+        self.selected_box = Rectangle((-0.5, -0.5), len(roles), 1, fill=False, edgecolor='crimson',
+                                      linewidth=2, visible=False, animated=True)
+        self.heat_ax.add_patch(self.hover_box)
+        self.heat_ax.add_patch(self.selected_box)
+        self.info_text = self.heat_ax.text(0.01, 1.01, "", transform=self.heat_ax.transAxes,
+                                           fontsize=9, va='bottom', animated=True)
+    
+    def connect(self, canvas):
+        """Attach hover and click handling to a canvas showing the figure."""
+        self.canvas = canvas
+        canvas.mpl_connect('draw_event', self.on_draw)
+        canvas.mpl_connect('motion_notify_event', self.on_motion)
+        canvas.mpl_connect('button_press_event', self.on_click)
+    
+    def row_at(self, event) -> Optional[int]:
+        """Return the user row under a mouse event, if any."""
+        if event.inaxes is not self.heat_ax or event.ydata is None:
+            return None
+        row = int(round(event.ydata))
+        return row if 0 <= row < len(self.usernames) else None
+    
+    def on_draw(self, event):
+        """Cache the freshly drawn background and redraw the highlights on it."""
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_highlights()
+    
+    def on_motion(self, event):
+        """Highlight the row under the mouse."""
+        self.hover(self.row_at(event))
+    
+    def on_click(self, event):
+        """Select the clicked row."""
+        row = self.row_at(event)
+        if row is not None:
+            self.select(row)
+    
+    def hover(self, row: Optional[int]):
+        """Move the hover highlight to a row (None hides it)."""
+        if row == self.hover_row:
+            return
+        self.hover_row = row
+        self.hover_box.set_visible(row is not None)
+        if row is not None:
+            self.hover_box.set_y(row - 0.5)
+        self.update_info()
+        self.blit()
+    
+    def select(self, row: Optional[int]):
+        """Select a user row and overlay their scores on the team bars."""
+        self.selected_row = row
+        self.selected_box.set_visible(row is not None)
+        if row is None:
+            self.selection_line.set_data([], [])
+        else:
+            self.selected_box.set_y(row - 0.5)
+            self.selection_line.set_data(self.scores[row], np.arange(len(BelbinTest.ROLES)))
+        self.update_info()
+        self.blit()
+    
+    def update_info(self):
+        """Describe the hovered (or selected) user above the heatmap."""
+        row = self.hover_row if self.hover_row is not None else self.selected_row
+        if row is None:
+            self.info_text.set_text("")
+            return
+        top_roles = BelbinTest.get_dominant_roles(dict(zip(BelbinTest.ROLES, self.scores[row].tolist())))
+        self.info_text.set_text(f"{self.usernames[row]}: " + ", ".join(role for role, _ in top_roles))
+    
+    def animated_artists(self) -> List:
+        """Artists drawn by blitting rather than by a full redraw."""
+        return [self.hover_box, self.selected_box, self.info_text, self.selection_line]
+    
+    def draw_highlights(self):
+        """Draw the animated artists onto the canvas."""
+        for artist in self.animated_artists():
+            artist.axes.draw_artist(artist)
+    
+    def blit(self):
+        """Redraw only the highlights over the cached background."""
+        if self.canvas is None or self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_highlights()
+        self.canvas.blit(self.figure.bbox)
+
+
+def team_figure_size(user_count: int):
+    """Figure size that keeps rows readable for small teams."""
+    return (10, min(12, max(4, 2 + user_count * 0.2)))
+
+
+def render_team_heatmap(usernames: Sequence[str], scores, path: str, dpi: int = 150,
+                        selected: Optional[str] = None) -> Figure:
+    """Render the team view without a display and save it to a file.
+    
+    If ``selected`` names a user, their row and scores are highlighted.
+    """
+    figure = Figure(figsize=team_figure_size(len(usernames)))
+    canvas = FigureCanvasAgg(figure)
+    heatmap = TeamHeatmap(figure, usernames, scores)
+    if selected is not None:
+        heatmap.select(list(usernames).index(selected))
+        # Animated artists are skipped by savefig, so draw the selection statically
+        for artist in heatmap.animated_artists():
+            artist.set_animated(False)
+    canvas.draw()
+    figure.savefig(path, dpi=dpi, bbox_inches='tight')
+    return figure
+
+
+def main(argv=None):
+    """Export the team view of a results database to an image file."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Export the Belbin team comparison view")
+    parser.add_argument('path', help="output image (PNG, PDF or SVG)")
+    parser.add_argument('--db', default='data/results.db', help="database path")
+    parser.add_argument('--select', help="username to highlight")
+    args = parser.parse_args(argv)
+    
+    usernames, scores = DatabaseManager(args.db).get_latest_scores()
+    render_team_heatmap(usernames, scores, args.path, selected=args.select)
+    print(f"Team view of {len(usernames)} users saved as {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,29 +4,47 @@ Tkinter GUI interface for Belbin Test application.
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
+import matplotlib
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
 import matplotlib.patches as patches
-from typing import Dict, Callable, Optional
+from typing import Dict, Callable, List, Optional, Tuple
+import queue
+import re
+import threading
+import time
 import sys
 import os
 
 # Add utils to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from utils.data_processing import BelbinTest, DatabaseManager
+from utils.data_processing import BelbinTest, DatabaseManager, IncrementalScorer
+from utils.question_bank import BankRegistry
+from utils.telemetry import BUILTIN_BANK, SessionTimer, TelemetryWriter
+from gui.history import HistoryBrowser
+from gui.team_view import TeamHeatmap, team_figure_size
+
+# Events matplotlib's Tk canvas binds on its toplevel window
+CANVAS_ROOT_EVENTS = ('<MouseWheel>', '<Destroy>')
 
 
 class BelbinTestGUI:
     """Main GUI class for the Belbin Test application."""
     
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, kiosk: bool = False, idle_timeout: float = 120,
+                 in_memory: bool = False, db_path: str = 'data/results.db',
+                 question_banks: Optional[BankRegistry] = None, language: Optional[str] = None,
+                 multi_writer: bool = False):
         self.root = root
         self.root.title("Belbin Team Roles Test")
         self.root.geometry("800x600")
         
         # Initialize components
         self.belbin_test = BelbinTest()
-        self.db_manager = DatabaseManager()
+        # Stations sharing one database file opt into WAL and lock retries; a
+        # single busy station can keep results in memory and persist them
+        # periodically instead
+        self.db_manager = DatabaseManager(db_path, multi_writer=multi_writer, in_memory=in_memory)
         
         # Test state
         self.username = ""
@@ -34,6 +52,35 @@ class BelbinTestGUI:
         self.answers = {}
         self.test_completed = False
         
+        # Running role totals for the live provisional profile
+        self.scorer = IncrementalScorer(BelbinTest)
+        
+        # Per-question timing for the session in progress, written in batches
+        self.telemetry = TelemetryWriter(self.db_manager)
+        self.session_timer: Optional[SessionTimer] = None
+        self.last_points = None
+        
+        # Register the spinbox validator once instead of per widget
+        self.validate_command = (self.root.register(self.validate_points), '%P')
+        
+        # Handlers that chart canvases bind on the root window, removed with the chart
+        self.chart_bindings: List[Tuple[str, str]] = []
+        
+        # Kiosk mode keeps screens alive between sessions
+        self.kiosk = kiosk
+        self.idle_timeout = idle_timeout
+        
+        # Installed question banks are listed by file name and loaded when chosen;
+        # without a language the built-in questions are asked
+        self.question_banks = question_banks if question_banks is not None else BankRegistry()
+        self.bank_key = BUILTIN_BANK
+        self.language: Optional[str] = None
+        if language is not None:
+            self.use_question_bank(language)
+        
+        if self.kiosk:
+            self.setup_kiosk()
+        
         # Create main interface
         self.setup_styles()
         self.create_welcome_screen()
@@ -53,18 +100,37 @@ class BelbinTestGUI:
         """Clear all widgets from the main frame."""
         for widget in self.root.winfo_children():
             widget.destroy()
+        self.release_chart_bindings()
+    
+    def create_main_frame(self) -> ttk.Frame:
+        """Create an ungridded main frame filling the root window."""
+        main_frame = ttk.Frame(self.root, padding="20")
+        
+        # Configure grid weights
+        self.root.columnconfigure(0, weight=1)
+        self.root.rowconfigure(0, weight=1)
+        return main_frame
     
     def create_welcome_screen(self):
         """Create the welcome screen for username input."""
+        # A session left before finishing is recorded as abandoned
+        self.finish_session_timing(completed=False)
+        if self.kiosk:
+            self.show_kiosk_welcome()
+            return
+        
         self.clear_frame()
         
         # Main frame
-        main_frame = ttk.Frame(self.root, padding="20")
+        main_frame = self.create_main_frame()
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.build_welcome(main_frame)
         
-        # Configure grid weights
-        self.root.columnconfigure(0, weight=1)
-        self.root.rowconfigure(0, weight=1)
+        # Focus on entry
+        self.username_entry.focus()
+    
+    def build_welcome(self, main_frame: ttk.Frame):
+        """Populate a main frame with the welcome screen widgets."""
         main_frame.columnconfigure(1, weight=1)
         
         # Title
@@ -90,10 +156,17 @@ class BelbinTestGUI:
         # Start button
         start_button = ttk.Button(main_frame, text="Start Test", 
                                  command=self.start_test, style='Big.TButton')
-        start_button.grid(row=3, column=0, columnspan=2, pady=20)
-        
-        # Focus on entry
-        self.username_entry.focus()
+        start_button.grid(row=4, column=0, columnspan=2, pady=20)
+        
+        # Language choice, when more than one is installed
+        languages = self.question_banks.languages()
+        if len(languages) > 1:
+            ttk.Label(main_frame, text="Language:").grid(row=3, column=0, sticky=tk.W, padx=(0, 10))
+            self.language_var = tk.StringVar(value=self.language or '')
+            language_box = ttk.Combobox(main_frame, textvariable=self.language_var, values=languages,
+                                        state='readonly', width=10)
+            language_box.grid(row=3, column=1, sticky=tk.W, pady=5)
+            language_box.bind('<<ComboboxSelected>>', self.on_language_selected)
     
     def start_test(self):
         """Start the test after validating username."""
@@ -105,29 +178,69 @@ class BelbinTestGUI:
         self.username = username
         self.current_question = 0
         self.answers = {}
+        self.scorer.reset()
+        self.session_timer = SessionTimer(len(self.belbin_test.QUESTIONS), bank=self.bank_key)
         self.create_question_screen()
     
+    def use_question_bank(self, language: str):
+        """Ask the questions of the latest installed bank for a language.
+        
+        Only call this between sessions, e.g. from the welcome screen.
+        """
+        bank = self.question_banks.get(language)
+        self.belbin_test = bank.test_class()()
+        self.scorer = IncrementalScorer(bank.test_class())
+        self.bank_key = bank.key
+        self.language = bank.language
+    
+    def on_language_selected(self, event=None):
+        """Switch to the language chosen on the welcome screen."""
+        try:
+            self.use_question_bank(self.language_var.get())
+        except (KeyError, ValueError) as e:
+            messagebox.showerror("Error", f"This language could not be loaded: {e}")
+            return
+        if self.kiosk:
+            # Build the new language's screens while the participant types their name
+            self.root.after_idle(self.prewarm_kiosk)
+    
     def create_question_screen(self):
         """Create the question screen."""
+        if self.kiosk:
+            if self.current_question < len(self.belbin_test.QUESTIONS):
+                self.show_kiosk_question()
+            else:
+                self.process_results()
+            return
+        
         self.clear_frame()
         
         if self.current_question >= len(self.belbin_test.QUESTIONS):
             self.process_results()
             return
         
-        question_data = self.belbin_test.QUESTIONS[self.current_question]
-        
         # Main frame
-        main_frame = ttk.Frame(self.root, padding="20")
+        main_frame = self.create_main_frame()
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.option_spinboxes, self.points_label, self.provisional_label = self.build_question(
+            main_frame, self.current_question
+        )
         
-        # Configure grid weights
-        self.root.columnconfigure(0, weight=1)
-        self.root.rowconfigure(0, weight=1)
+        self.update_points_display()
+        self.update_provisional_display()
+        self.enter_question_timing()
+    
+    def build_question(self, main_frame: ttk.Frame, question_index: int):
+        """Populate a main frame with the widgets for one question.
+        
+        Returns the option spinboxes keyed by option letter, the points label
+        and the provisional profile label.
+        """
+        question_data = self.belbin_test.QUESTIONS[question_index]
         main_frame.columnconfigure(0, weight=1)
         
         # Progress info
-        progress_text = f"Question {self.current_question + 1} of {len(self.belbin_test.QUESTIONS)}"
+        progress_text = f"Question {question_index + 1} of {len(self.belbin_test.QUESTIONS)}"
         progress_label = ttk.Label(main_frame, text=progress_text, font=('Arial', 10))
         progress_label.grid(row=0, column=0, sticky=tk.W, pady=(0, 10))
         
@@ -148,7 +261,7 @@ class BelbinTestGUI:
         options_frame.columnconfigure(1, weight=1)
         
         # Store spinboxes for validation
-        self.option_spinboxes = {}
+        option_spinboxes = {}
         
         # Create options
         for i, (key, (text, _)) in enumerate(question_data['options'].items()):
@@ -164,33 +277,37 @@ class BelbinTestGUI:
             # Points spinbox
             spinbox = tk.Spinbox(options_frame, from_=0, to=10, width=5, 
                                font=('Arial', 10), validate='key',
-                               validatecommand=(self.root.register(self.validate_points), '%P'))
+                               validatecommand=self.validate_command)
             spinbox.grid(row=i, column=2, padx=(10, 0), pady=2)
             spinbox.delete(0, tk.END)
             spinbox.insert(0, '0')
-            self.option_spinboxes[key] = spinbox
+            option_spinboxes[key] = spinbox
         
         # Points counter
-        self.points_label = ttk.Label(main_frame, text="Points used: 0/10", 
-                                     font=('Arial', 10, 'bold'))
-        self.points_label.grid(row=4, column=0, sticky=tk.W, pady=(10, 0))
+        points_label = ttk.Label(main_frame, text="Points used: 0/10", 
+                                 font=('Arial', 10, 'bold'))
+        points_label.grid(row=4, column=0, sticky=tk.W, pady=(10, 0))
+        
+        # Live provisional profile from the questions answered so far
+        provisional_label = ttk.Label(main_frame, font=('Arial', 10, 'italic'))
+        provisional_label.grid(row=5, column=0, sticky=tk.W, pady=(5, 0))
         
         # Update points display
-        for spinbox in self.option_spinboxes.values():
-            spinbox.config(command=self.update_points_display)
-            spinbox.bind('<KeyRelease>', lambda e: self.update_points_display())
+        for spinbox in option_spinboxes.values():
+            spinbox.config(command=self.points_edited)
+            spinbox.bind('<KeyRelease>', lambda e: self.points_edited())
         
         # Navigation buttons
         nav_frame = ttk.Frame(main_frame)
-        nav_frame.grid(row=5, column=0, sticky=(tk.W, tk.E), pady=20)
+        nav_frame.grid(row=6, column=0, sticky=(tk.W, tk.E), pady=20)
         
-        if self.current_question > 0:
+        if question_index > 0:
             ttk.Button(nav_frame, text="← Previous", command=self.previous_question).pack(side=tk.LEFT)
         
-        ttk.Button(nav_frame, text="Next →" if self.current_question < len(self.belbin_test.QUESTIONS) - 1 else "Finish Test", 
+        ttk.Button(nav_frame, text="Next →" if question_index < len(self.belbin_test.QUESTIONS) - 1 else "Finish Test", 
                   command=self.next_question).pack(side=tk.RIGHT)
         
-        self.update_points_display()
+        return option_spinboxes, points_label, provisional_label
     
     def validate_points(self, value):
         """Validate that points are numeric and within range."""
@@ -222,6 +339,36 @@ class BelbinTestGUI:
         else:
             self.points_label.config(foreground='black')
     
+    def points_edited(self):
+        """Update the points display and count a change to the answer."""
+        self.update_points_display()
+        points = tuple(spinbox.get() for spinbox in self.option_spinboxes.values())
+        if points != self.last_points:
+            self.last_points = points
+            if self.session_timer is not None:
+                self.session_timer.edit()
+    
+    def enter_question_timing(self):
+        """Start timing the question now on screen."""
+        self.last_points = tuple(spinbox.get() for spinbox in self.option_spinboxes.values())
+        if self.session_timer is not None:
+            self.session_timer.enter(self.current_question)
+    
+    def finish_session_timing(self, completed: bool):
+        """Queue the timing of the session in progress, if any, for writing."""
+        if self.session_timer is not None:
+            self.telemetry.record(self.session_timer.finish(completed))
+            self.session_timer = None
+    
+    def update_provisional_display(self):
+        """Show the dominant roles for the questions answered so far."""
+        if not len(self.scorer):
+            self.provisional_label.config(text="")
+            return
+        
+        role_names = [self.belbin_test.ROLES[role] for role, _ in self.scorer.get_dominant_roles()]
+        self.provisional_label.config(text=f"Provisional profile: {', '.join(role_names)}")
+    
     def next_question(self):
         """Move to the next question or finish the test."""
         # Validate points total
@@ -236,6 +383,7 @@ class BelbinTestGUI:
             question_answers[key] = int(spinbox.get() or '0')
         
         self.answers[self.current_question] = question_answers
+        self.scorer.set_answer(self.current_question, question_answers)
         
         # Move to next question
         self.current_question += 1
@@ -256,23 +404,32 @@ class BelbinTestGUI:
                         spinbox.delete(0, tk.END)
                         spinbox.insert(0, str(points))
                 self.update_points_display()
+                self.last_points = tuple(spinbox.get() for spinbox in self.option_spinboxes.values())
     
     def process_results(self):
         """Process test results and show results screen."""
         # Calculate scores
-        scores = self.belbin_test.calculate_scores(self.answers)
+        scores = self.scorer.scores
+        self.finish_session_timing(completed=True)
         
         # Save to database
-        try:
-            self.db_manager.save_results(self.username, scores)
-        except Exception as e:
-            print(f"Error saving results: {e}")
+        if self.kiosk:
+            self.save_queue.put((self.username, scores))
+        else:
+            try:
+                self.db_manager.save_results(self.username, scores)
+            except Exception as e:
+                messagebox.showerror("Error", f"Your results could not be saved: {e}")
         
         # Show results screen
         self.show_results(scores)
     
     def show_results(self, scores: Dict[str, int]):
         """Display the test results with visualization."""
+        if self.kiosk:
+            self.show_kiosk_results(scores)
+            return
+        
         self.clear_frame()
         
         # Main frame
@@ -314,6 +471,10 @@ class BelbinTestGUI:
         
         ttk.Button(button_frame, text="Take Test Again", 
                   command=self.create_welcome_screen).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="Team View", 
+                  command=self.show_team_view).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="History", 
+                  command=self.show_history).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="Exit", 
                   command=self.root.quit).pack(side=tk.LEFT)
     
@@ -370,13 +531,49 @@ class BelbinTestGUI:
             ttk.Label(parent, text="No scores to display", style='Question.TLabel').pack(expand=True)
             return
         
-        # Create matplotlib figure
-        fig, ax = plt.subplots(figsize=(8, 6))
+        # A plain Figure is freed with its canvas; pyplot would keep every
+        # figure alive in its registry until explicitly closed
+        fig = Figure(figsize=(8, 6))
+        ax = fig.add_subplot()
+        self.draw_role_chart(ax, filtered_scores)
+        
+        # Embed in tkinter; the canvas also binds handlers on the root window,
+        # which matplotlib only removes when a later event reaches them
+        before = {sequence: self.root.bind(sequence) for sequence in CANVAS_ROOT_EVENTS}
+        canvas = FigureCanvasTkAgg(fig, parent)
+        for sequence, script in before.items():
+            added = self.root.bind(sequence)[len(script):]
+            if added:
+                self.chart_bindings.append((sequence, added))
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # Add toolbar
+        toolbar_frame = ttk.Frame(parent)
+        toolbar_frame.pack(fill=tk.X)
         
+        # Save button
+        ttk.Button(toolbar_frame, text="Save Chart", 
+                  command=lambda: self.save_chart(fig)).pack(side=tk.LEFT, padx=5)
+    
+    def release_chart_bindings(self):
+        """Remove root window handlers left by destroyed chart canvases."""
+        for sequence, added in self.chart_bindings:
+            self.root.bind(sequence, self.root.bind(sequence).replace(added, ''))
+            command = re.search(r'\[(\S+)', added)
+            if command:
+                try:
+                    self.root.deletecommand(command.group(1))
+                except tk.TclError:
+                    pass
+        self.chart_bindings = []
+    
+    def draw_role_chart(self, ax, filtered_scores: Dict[str, int]):
+        """Draw the role profile pie chart for non-zero scores on an axes."""
         # Prepare data
         labels = [self.belbin_test.ROLES[role] for role in filtered_scores.keys()]
         sizes = list(filtered_scores.values())
-        colors = plt.cm.Set3(range(len(labels)))
+        colors = matplotlib.colormaps['Set3'](range(len(labels)))
         
         # Create pie chart
         wedges, texts, autotexts = ax.pie(sizes, labels=labels, autopct='%1.1f%%',
@@ -392,19 +589,35 @@ class BelbinTestGUI:
             text.set_fontsize(9)
         
         ax.set_title(f'Belbin Team Role Profile - {self.username}', fontsize=14, fontweight='bold')
+    
+    def show_team_view(self):
+        """Open a window comparing every user's latest results."""
+        usernames, scores = self.db_manager.get_latest_scores()
+        if not usernames:
+            messagebox.showinfo("Team View", "No results have been saved yet.")
+            return
         
-        # Embed in tkinter
-        canvas = FigureCanvasTkAgg(fig, parent)
+        window = tk.Toplevel(self.root)
+        window.title("Team Comparison")
+        
+        figure = Figure(figsize=team_figure_size(len(usernames)))
+        heatmap = TeamHeatmap(figure, usernames, scores)
+        canvas = FigureCanvasTkAgg(figure, window)
+        heatmap.connect(canvas)
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
-        # Add toolbar
-        toolbar_frame = ttk.Frame(parent)
+        toolbar_frame = ttk.Frame(window)
         toolbar_frame.pack(fill=tk.X)
-        
-        # Save button
         ttk.Button(toolbar_frame, text="Save Chart", 
-                  command=lambda: self.save_chart(fig)).pack(side=tk.LEFT, padx=5)
+                  command=lambda: self.save_chart(figure)).pack(side=tk.LEFT, padx=5)
+        
+        # Keep a reference so the view lives as long as its window
+        window.team_heatmap = heatmap
+    
+    def show_history(self) -> HistoryBrowser:
+        """Open a window for browsing every stored result."""
+        return HistoryBrowser(self.root, self.db_manager)
     
     def save_chart(self, fig):
         """Save the chart as an image file."""
@@ -421,6 +634,236 @@ class BelbinTestGUI:
                 messagebox.showinfo("Success", f"Chart saved as {filename}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save chart: {e}")
+    
+    # Kiosk mode
+    
+    def setup_kiosk(self):
+        """Prepare persistent screens, the background saver and the idle timer."""
+        self.kiosk_screens = {}
+        self.kiosk_question_widgets = {}
+        self.kiosk_question_sessions = {}
+        self.kiosk_results = None
+        self.kiosk_current_screen = None
+        self.session_id = 0
+        self.last_activity = time.monotonic()
+        
+        # Persist results off the UI thread
+        self.save_queue = queue.Queue()
+        self.failed_saves = []
+        self.save_thread = threading.Thread(target=self.kiosk_save_worker, daemon=True)
+        self.save_thread.start()
+        
+        # Any input counts as activity; a single repeating timer checks for idleness
+        for sequence in ('<Any-KeyPress>', '<Any-ButtonPress>', '<Motion>'):
+            self.root.bind_all(sequence, self.record_activity, add='+')
+        self.root.after(1000, self.check_idle)
+        self.root.after_idle(self.prewarm_kiosk)
+    
+    def record_activity(self, event=None):
+        """Remember the time of the last user input."""
+        self.last_activity = time.monotonic()
+    
+    def check_idle(self):
+        """Return to the welcome screen after a period of inactivity."""
+        at_rest = (self.kiosk_current_screen == 'welcome'
+                   and not self.username_entry.get())
+        if not at_rest and time.monotonic() - self.last_activity >= self.idle_timeout:
+            self.create_welcome_screen()
+        self.root.after(1000, self.check_idle)
+    
+    def kiosk_screen(self, key) -> ttk.Frame:
+        """Return the persistent frame for a screen, building it on first use.
+        
+        Keys are 'welcome', 'results' or a (question bank, question index)
+        pair, so every language keeps its own question screens.
+        """
+        frame = self.kiosk_screens.get(key)
+        if frame is None:
+            frame = self.create_main_frame()
+            if key == 'welcome':
+                self.build_welcome(frame)
+            elif key == 'results':
+                self.kiosk_results = self.build_kiosk_results(frame)
+            else:
+                self.kiosk_question_widgets[key] = self.build_question(frame, key[1])
+            self.kiosk_screens[key] = frame
+        return frame
+    
+    def prewarm_kiosk(self):
+        """Build every screen that does not exist yet."""
+        questions = [(self.bank_key, index) for index in range(len(self.belbin_test.QUESTIONS))]
+        for key in ['welcome', *questions, 'results']:
+            self.kiosk_screen(key)
+    
+    def show_kiosk_screen(self, key):
+        """Swap the visible screen without destroying the previous one."""
+        frame = self.kiosk_screen(key)
+        if self.kiosk_current_screen is not None and self.kiosk_current_screen != key:
+            self.kiosk_screens[self.kiosk_current_screen].grid_remove()
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.kiosk_current_screen = key
+    
+    def show_kiosk_welcome(self):
+        """Start a new session on the persistent welcome screen."""
+        # Only the session id changes here; question screens clear their
+        # inputs lazily the first time they are shown in a new session
+        self.session_id += 1
+        self.username = ""
+        self.current_question = 0
+        self.answers = {}
+        self.test_completed = False
+        self.scorer.reset()
+        self.retry_failed_saves()
+        
+        self.show_kiosk_screen('welcome')
+        self.username_entry.delete(0, tk.END)
+        self.username_entry.focus()
+    
+    def show_kiosk_question(self):
+        """Show the persistent screen for the current question."""
+        key = (self.bank_key, self.current_question)
+        self.show_kiosk_screen(key)
+        self.option_spinboxes, self.points_label, self.provisional_label = self.kiosk_question_widgets[key]
+        
+        if self.kiosk_question_sessions.get(key) != self.session_id:
+            for spinbox in self.option_spinboxes.values():
+                spinbox.delete(0, tk.END)
+                spinbox.insert(0, '0')
+            self.kiosk_question_sessions[key] = self.session_id
+        
+        self.update_points_display()
+        self.update_provisional_display()
+        self.enter_question_timing()
+    
+    def build_kiosk_results(self, main_frame: ttk.Frame) -> Dict:
+        """Populate the persistent results screen and return its updatable widgets."""
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(1, weight=1)
+        
+        # Title
+        title_label = ttk.Label(main_frame, style='Title.TLabel')
+        title_label.grid(row=0, column=0, pady=(0, 20))
+        
+        # Create notebook for tabs
+        notebook = ttk.Notebook(main_frame)
+        notebook.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        results_frame = ttk.Frame(notebook, padding="10")
+        notebook.add(results_frame, text="Detailed Results")
+        chart_frame = ttk.Frame(notebook, padding="10")
+        notebook.add(chart_frame, text="Visualization")
+        
+        # Dominant roles section
+        ttk.Label(results_frame, text="Your Top 3 Team Roles:", style='Question.TLabel').grid(
+            row=0, column=0, sticky=tk.W, pady=(0, 10)
+        )
+        dominant_labels = []
+        for i in range(3):
+            label = ttk.Label(results_frame, font=('Arial', 11))
+            label.grid(row=i+1, column=0, sticky=tk.W, padx=(20, 0), pady=2)
+            dominant_labels.append(label)
+        
+        # All scores section, one row per role updated in place
+        ttk.Label(results_frame, text="All Role Scores:", style='Question.TLabel').grid(
+            row=5, column=0, sticky=tk.W, pady=(20, 10)
+        )
+        tree = ttk.Treeview(results_frame, columns=('Role', 'Score'), show='headings', height=9)
+        tree.grid(row=6, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+        tree.heading('Role', text='Team Role')
+        tree.heading('Score', text='Score')
+        tree.column('Role', width=300)
+        tree.column('Score', width=100)
+        tree_items = [tree.insert('', tk.END, values=('', '')) for _ in self.belbin_test.ROLES]
+        results_frame.columnconfigure(0, weight=1)
+        
+        # One figure is reused for every session; it is not registered with pyplot
+        figure = Figure(figsize=(8, 6))
+        axes = figure.add_subplot()
+        canvas = FigureCanvasTkAgg(figure, chart_frame)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        toolbar_frame = ttk.Frame(chart_frame)
+        toolbar_frame.pack(fill=tk.X)
+        ttk.Button(toolbar_frame, text="Save Chart", 
+                  command=lambda: self.save_chart(figure)).pack(side=tk.LEFT, padx=5)
+        
+        # Action buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=2, column=0, pady=20)
+        ttk.Button(button_frame, text="Take Test Again", 
+                  command=self.create_welcome_screen).pack(side=tk.LEFT)
+        
+        return {
+            'title': title_label,
+            'dominant': dominant_labels,
+            'tree': tree,
+            'tree_items': tree_items,
+            'axes': axes,
+            'canvas': canvas,
+        }
+    
+    def show_kiosk_results(self, scores: Dict[str, int]):
+        """Update the persistent results screen in place and show it."""
+        self.show_kiosk_screen('results')
+        widgets = self.kiosk_results
+        
+        widgets['title'].config(text=f"Test Results for {self.username}")
+        
+        dominant_roles = self.belbin_test.get_dominant_roles(scores)
+        for i, (label, (role, score)) in enumerate(zip(widgets['dominant'], dominant_roles)):
+            label.config(text=f"{i+1}. {self.belbin_test.ROLES[role]}: {score} points")
+        
+        sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        for item, (role, score) in zip(widgets['tree_items'], sorted_scores):
+            widgets['tree'].item(item, values=(self.belbin_test.ROLES[role], score))
+        
+        axes = widgets['axes']
+        axes.clear()
+        filtered_scores = {role: score for role, score in scores.items() if score > 0}
+        if filtered_scores:
+            self.draw_role_chart(axes, filtered_scores)
+        else:
+            axes.axis('off')
+            axes.text(0.5, 0.5, "No scores to display", ha='center', va='center', fontsize=12)
+        widgets['canvas'].draw_idle()
+        
+        # Build anything the next session still needs while this participant reads
+        self.root.after_idle(self.prewarm_kiosk)
+    
+    def kiosk_save_worker(self):
+        """Persist queued results on a background thread until stopped."""
+        while True:
+            item = self.save_queue.get()
+            try:
+                if item is None:
+                    return
+                username, scores = item
+                try:
+                    self.db_manager.save_results(username, scores)
+                except Exception as e:
+                    # Kept for another attempt rather than interrupting the kiosk
+                    print(f"Error saving results for {username}, will retry: {e}")
+                    self.failed_saves.append(item)
+            finally:
+                self.save_queue.task_done()
+    
+    def retry_failed_saves(self):
+        """Queue results whose save failed for another attempt."""
+        while self.failed_saves:
+            self.save_queue.put(self.failed_saves.pop())
+    
+    def close(self):
+        """Flush pending background work before the application exits."""
+        if self.kiosk:
+            self.save_queue.join()
+            self.retry_failed_saves()
+            self.save_queue.put(None)
+            self.save_thread.join()
+            for username, _ in self.failed_saves:
+                print(f"Results for {username} could not be saved")
+        self.finish_session_timing(completed=False)
+        self.telemetry.close()
+        self.db_manager.close()
 
 
 def main():
@@ -428,6 +871,7 @@ def main():
     root = tk.Tk()
     app = BelbinTestGUI(root)
     root.mainloop()
+    app.close()
 
 
 if __name__ == "__main__":
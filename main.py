@@ -8,6 +8,7 @@ This application implements a complete Belbin Team Roles test with:
 - Matplotlib visualization of results
 """
 
+import argparse
 import tkinter as tk
 import sys
 import os
@@ -18,17 +19,37 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from gui.tkinter_interface import BelbinTestGUI
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Belbin Team Roles Test")
+    parser.add_argument('--kiosk', action='store_true',
+                        help="run continuously for a queue of participants")
+    parser.add_argument('--idle-timeout', type=float, default=120,
+                        help="seconds of inactivity before a kiosk returns to the welcome screen")
+    parser.add_argument('--in-memory', action='store_true',
+                        help="keep results in memory and save them to disk periodically")
+    parser.add_argument('--multi-writer', action='store_true',
+                        help="share the database file with other stations (WAL journaling and lock retries)")
+    parser.add_argument('--language',
+                        help="ask the questions of an installed question bank, e.g. 'en'")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main function to start the Belbin Test application."""
+    args = parse_args(argv)
     try:
         # Create main window
         root = tk.Tk()
         
         # Create and start the application
-        app = BelbinTestGUI(root)
+        app = BelbinTestGUI(root, kiosk=args.kiosk, idle_timeout=args.idle_timeout,
+                           in_memory=args.in_memory, multi_writer=args.multi_writer,
+                           language=args.language)
         
         # Start the main loop
         root.mainloop()
+        app.close()
         
     except Exception as e:
         print(f"Error starting application: {e}")
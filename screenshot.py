@@ -1,62 +1,40 @@
 #!/usr/bin/env python3
 """
 Screenshot script to capture the GUI interface for documentation.
+
+Screens are captured with the harness in gui/capture.py, which waits for
+the GUI to become idle instead of sleeping, and starts Xvfb when no display
+is available.
 """
 
 import sys
 import os
-import tkinter as tk
-from PIL import Image
-import time
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from gui.tkinter_interface import BelbinTestGUI
-
+from gui.capture import capture_screens, save_captures, virtual_display
 
-def capture_welcome_screen():
-    """Capture the welcome screen."""
-    root = tk.Tk()
-    app = BelbinTestGUI(root)
-    
-    # Wait a moment for rendering
-    root.update()
-    time.sleep(0.1)
-    
-    # Capture screenshot
-    root.after(500, lambda: capture_and_save(root, "welcome_screen"))
-    root.mainloop()
 
+def capture_all_screens(directory: str = "screenshots"):
+    """Capture the welcome, question and results screens as PNG files."""
+    with virtual_display() as display:
+        if display is None:
+            print("No display available and Xvfb is not installed.")
+            return False
+        captures = capture_screens()
 
-def capture_and_save(root, filename):
-    """Capture and save screenshot."""
-    try:
-        # Get window geometry
-        x = root.winfo_rootx()
-        y = root.winfo_rooty()
-        width = root.winfo_width()
-        height = root.winfo_height()
-        
-        # Use PIL to capture (if available)
-        try:
-            import PIL.ImageGrab as ImageGrab
-            img = ImageGrab.grab(bbox=(x, y, x + width, y + height))
-            img.save(f"{filename}.png")
-            print(f"Screenshot saved as {filename}.png")
-        except ImportError:
-            print("PIL not available for screenshots")
-        
-    except Exception as e:
-        print(f"Could not capture screenshot: {e}")
-    
-    root.quit()
+    save_captures(captures, directory)
+    for name in captures:
+        print(f"Screenshot saved as {os.path.join(directory, name)}.png")
+    return True
 
 
 if __name__ == "__main__":
     print("Attempting to capture GUI screenshots...")
     try:
-        capture_welcome_screen()
+        captured = capture_all_screens(sys.argv[1] if len(sys.argv) > 1 else "screenshots")
     except Exception as e:
         print(f"Screenshot capture failed: {e}")
-        print("This is normal in headless environments.")
\ No newline at end of file
+        captured = False
+    sys.exit(0 if captured else 1)
@@ -0,0 +1,136 @@
+"""
+Unit tests for online database backups.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+import sqlite3
+import threading
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_processing import BelbinTest, DatabaseManager
+from utils.backup import backup_database, list_backups, main, verify_backup
+
+
+class TestBackup(unittest.TestCase):
+    """Test cases for backups, rotation and verification."""
+    
+    def setUp(self):
+        """Set up a test database with some results."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'results.db')
+        self.backup_dir = os.path.join(self.temp_dir, 'backups')
+        self.db_manager = DatabaseManager(self.db_path)
+        self.save(200)
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def save(self, count):
+        """Save results with varied scores."""
+        for i in range(count):
+            self.db_manager.save_results(f"user{i % 7}", {role: (i + j) % 11 for j, role in enumerate(BelbinTest.ROLES)})
+    
+    def rows(self, path):
+        """Return every result row in a database file."""
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute('SELECT * FROM test_results ORDER BY id').fetchall()
+        finally:
+            conn.close()
+    
+    def test_backup_matches_source(self):
+        """Test that a stepped backup is a verified copy of the database."""
+        report = backup_database(self.db_manager, self.backup_dir, pages_per_step=2, sleep=0)
+        self.assertEqual(self.rows(report.path), self.rows(self.db_path))
+        self.assertEqual(report.integrity, 'ok')
+        self.assertEqual(report.bytes, os.path.getsize(report.path))
+        self.assertGreater(report.steps, 1)
+        self.assertGreater(report.bytes_per_sec, 0)
+        self.assertEqual(os.listdir(self.backup_dir), [os.path.basename(report.path)])
+    
+    def test_rotation(self):
+        """Test that only the newest generations are kept."""
+        reports = [backup_database(self.db_manager, self.backup_dir, keep=2) for _ in range(3)]
+        self.assertEqual(list_backups(self.backup_dir, self.db_path), [r.path for r in reports[1:]])
+        self.assertEqual(reports[2].removed, [reports[0].path])
+    
+    def test_in_memory_database(self):
+        """Test backing up an in-memory database."""
+        db_manager = DatabaseManager(':memory:')
+        db_manager.save_results("user1", {'PL': 4})
+        report = backup_database(db_manager, self.backup_dir)
+        self.assertEqual(len(self.rows(report.path)), 1)
+    
+    def test_concurrent_writer(self):
+        """Test that a backup finishes while another connection keeps writing."""
+        for multi_writer in (False, True):
+            with self.subTest(multi_writer=multi_writer):
+                db_manager = DatabaseManager(self.db_path, multi_writer=multi_writer)
+                stop = threading.Event()
+                locked = threading.Event()
+                stalls = []
+                
+                def write():
+                    # The backup always starts while a write transaction holds the
+                    # lock, so its setup has to wait instead of failing
+                    conn = sqlite3.connect(self.db_path)
+                    try:
+                        conn.execute('BEGIN EXCLUSIVE')
+                        conn.execute("INSERT INTO test_results (username) VALUES ('writer')")
+                        locked.set()
+                        time.sleep(0.1)
+                        conn.commit()
+                    finally:
+                        conn.close()
+                    while not stop.is_set() or len(stalls) < 3:
+                        start = time.perf_counter()
+                        db_manager.save_results("writer", {'PL': 1})
+                        stalls.append(time.perf_counter() - start)
+                        time.sleep(0.005)
+                
+                thread = threading.Thread(target=write)
+                thread.start()
+                locked.wait()
+                try:
+                    report = backup_database(db_manager, self.backup_dir, pages_per_step=4,
+                                             sleep=0.002, max_restarts=2)
+                finally:
+                    stop.set()
+                    thread.join()
+                self.assertEqual(report.integrity, 'ok')
+                self.assertTrue(stalls)
+                self.assertLess(report.max_step_seconds, 0.5)
+                self.assertLess(max(stalls), 1.0)
+                self.assertGreaterEqual(len(self.rows(report.path)), 200)
+                if multi_writer:
+                    # The copy reads one snapshot, so writes never restart it
+                    self.assertEqual(report.restarts, 0)
+    
+    def test_verify_detects_damage(self):
+        """Test that a damaged backup fails verification."""
+        report = backup_database(self.db_manager, self.backup_dir)
+        with open(report.path, 'r+b') as backup:
+            # Overwrite the b-tree page headers after the schema page
+            size = os.path.getsize(report.path)
+            for offset in range(2 * 4096, size, 4096):
+                backup.seek(offset)
+                backup.write(b'\xff' * 16)
+        self.assertNotEqual(verify_backup(report.path), 'ok')
+    
+    def test_cli(self):
+        """Test the backup and verify commands."""
+        self.assertEqual(main([self.backup_dir, '--db', self.db_path, '--keep', '1']), 0)
+        path = list_backups(self.backup_dir, self.db_path)[0]
+        self.assertEqual(main(['--verify', path]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
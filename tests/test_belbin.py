@@ -4,13 +4,36 @@ Unit tests for the Belbin Test application.
 
 import unittest
 import tempfile
+import multiprocessing
 import os
+import shutil
 import sys
 
 # Add parent directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from utils.data_processing import BelbinTest, DatabaseManager
+import random
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from utils.data_processing import BelbinTest, DatabaseManager, IncrementalScorer
+
+
+def write_results_worker(db_path, writer_id, count):
+    """Save results from a separate process (used by the stress test)."""
+    db_manager = DatabaseManager(db_path, multi_writer=True, max_retries=20)
+    for i in range(count):
+        db_manager.save_results(f"writer{writer_id}", {'PL': i})
+
+
+def read_results_worker(db_path, stop_event):
+    """Read results in a loop from a separate process (used by the stress test)."""
+    db_manager = DatabaseManager(db_path, multi_writer=True, max_retries=20)
+    while not stop_event.is_set():
+        db_manager.get_all_results()
 
 
 class TestBelbinTest(unittest.TestCase):
@@ -91,6 +114,84 @@ class TestBelbinTest(unittest.TestCase):
         self.assertEqual(top_3[0], ('PL', 15))
         self.assertEqual(top_3[1], ('RI', 12))
         self.assertEqual(top_3[2], ('CO', 8))
+    
+    def test_rank_dominant_roles_matches_single_row(self):
+        """Test that bulk ranking matches get_dominant_roles, including ties."""
+        roles = list(BelbinTest.ROLES)
+        rng = np.random.default_rng(0)
+        # Small score range forces plenty of ties
+        matrix = rng.integers(0, 4, size=(500, len(roles)))
+        
+        for top_n in (1, 3, 9):
+            indexes, top_scores = BelbinTest.rank_dominant_roles(matrix, top_n)
+            self.assertEqual(indexes.shape, (500, top_n))
+            for row, row_indexes, row_scores in zip(matrix, indexes, top_scores):
+                expected = BelbinTest.get_dominant_roles(dict(zip(roles, row.tolist())), top_n)
+                actual = [(roles[i], score) for i, score in zip(row_indexes, row_scores.tolist())]
+                self.assertEqual(actual, expected)
+    
+    def test_rank_dominant_roles_float_scores(self):
+        """Test bulk ranking of non-integer scores."""
+        matrix = np.array([[0.5, 2.5, 2.5, 0, 0, 0, 0, 0, 1.0]])
+        indexes, top_scores = BelbinTest.rank_dominant_roles(matrix, 3)
+        self.assertEqual(indexes.tolist(), [[1, 2, 8]])
+        self.assertEqual(top_scores.tolist(), [[2.5, 2.5, 1.0]])
+    
+    def test_rank_dominant_roles_bad_shape(self):
+        """Test that a matrix with the wrong number of columns is rejected."""
+        with self.assertRaises(ValueError):
+            BelbinTest.rank_dominant_roles(np.zeros((2, 5)))
+
+
+class TestIncrementalScorer(unittest.TestCase):
+    """Test cases for IncrementalScorer class."""
+    
+    def random_answer(self, rng, question_idx):
+        """Distribute 10 points randomly over a question's options."""
+        answer = {option: 0 for option in BelbinTest.QUESTIONS[question_idx]['options']}
+        for _ in range(10):
+            answer[rng.choice(list(answer))] += 1
+        return answer
+    
+    def test_initial_state(self):
+        """Test that a fresh scorer matches empty answers."""
+        scorer = IncrementalScorer()
+        self.assertEqual(scorer.scores, BelbinTest.calculate_scores({}))
+        self.assertEqual(scorer.get_dominant_roles(), BelbinTest.get_dominant_roles(scorer.scores))
+    
+    def test_matches_batch_scoring(self):
+        """Test that random edits, undos and resets match batch scoring."""
+        rng = random.Random(0)
+        scorer = IncrementalScorer()
+        for _ in range(500):
+            question_idx = rng.randrange(len(BelbinTest.QUESTIONS))
+            action = rng.random()
+            if action < 0.8:
+                scorer.set_answer(question_idx, self.random_answer(rng, question_idx))
+            elif action < 0.98:
+                scorer.clear_answer(question_idx)
+            else:
+                scorer.reset()
+            
+            expected = BelbinTest.calculate_scores(scorer.answers)
+            self.assertEqual(scorer.scores, expected)
+            for top_n in (1, 3, 9):
+                self.assertEqual(scorer.get_dominant_roles(top_n),
+                                 BelbinTest.get_dominant_roles(expected, top_n))
+    
+    def test_changing_answer_undoes_previous(self):
+        """Test that re-answering a question replaces its earlier points."""
+        scorer = IncrementalScorer()
+        scorer.set_answer(0, {'a': 10})
+        scorer.set_answer(0, {'c': 10})
+        
+        self.assertEqual(scorer.scores['RI'], 0)
+        self.assertEqual(scorer.scores['PL'], 10)
+        self.assertEqual(scorer.get_dominant_roles(1), [('PL', 10)])
+        self.assertEqual(len(scorer), 1)
+        
+        scorer.clear_answer(0)
+        self.assertEqual(len(scorer), 0)
 
 
 class TestDatabaseManager(unittest.TestCase):
@@ -151,6 +252,16 @@ class TestDatabaseManager(unittest.TestCase):
         all_results = self.db_manager.get_all_results()
         self.assertEqual(len(all_results), 2)
     
+    def test_get_score_matrix(self):
+        """Test retrieving scores as a matrix in ROLES order."""
+        self.db_manager.save_results("user1", {'PL': 10, 'RI': 5, 'SP': 1})
+        self.db_manager.save_results("user2", {'CO': 3})
+        
+        ids, matrix = self.db_manager.get_score_matrix()
+        self.assertEqual(ids.tolist(), [1, 2])
+        self.assertEqual(matrix.tolist(), [[10, 5, 0, 0, 0, 0, 0, 0, 1],
+                                           [0, 0, 3, 0, 0, 0, 0, 0, 0]])
+    
     def test_empty_database(self):
         """Test operations on empty database."""
         user_results = self.db_manager.get_user_results("nonexistent_user")
@@ -158,6 +269,306 @@ class TestDatabaseManager(unittest.TestCase):
         
         all_results = self.db_manager.get_all_results()
         self.assertEqual(len(all_results), 0)
+        
+        ids, matrix = self.db_manager.get_score_matrix()
+        self.assertEqual(matrix.shape, (0, 9))
+
+
+class TestMultiWriter(unittest.TestCase):
+    """Test cases for the multi-writer (WAL) DatabaseManager mode."""
+    
+    def setUp(self):
+        """Set up a WAL test database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'test_results.db')
+        self.db_manager = DatabaseManager(self.db_path, multi_writer=True)
+    
+    def tearDown(self):
+        """Clean up test database and WAL files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_wal_enabled(self):
+        """Test that the database is switched to WAL journaling."""
+        with self.db_manager.connect() as conn:
+            mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+    
+    def test_checkpoint(self):
+        """Test that a checkpoint copies every WAL page into the database."""
+        # Keep a connection open so the WAL is not checkpointed on close
+        with self.db_manager.connect() as reader:
+            reader.execute('SELECT COUNT(*) FROM test_results').fetchone()
+            self.db_manager.save_results("user1", {'PL': 1})
+            busy, wal_pages, checkpointed = self.db_manager.checkpoint('FULL')
+        
+        self.assertEqual(busy, 0)
+        self.assertGreater(wal_pages, 0)
+        self.assertEqual(checkpointed, wal_pages)
+        
+        with self.assertRaises(ValueError):
+            self.db_manager.checkpoint('SOMETIMES')
+    
+    def test_retry_on_lock(self):
+        """Test that a write blocked by another writer is retried."""
+        db_manager = DatabaseManager(self.db_path, multi_writer=True, busy_timeout=0,
+                                     max_retries=50, retry_backoff=0.01)
+        blocker = sqlite3.connect(self.db_path, check_same_thread=False)
+        blocker.execute('BEGIN IMMEDIATE')
+        
+        def release():
+            blocker.rollback()
+            blocker.close()
+        
+        timer = threading.Timer(0.1, release)
+        timer.start()
+        try:
+            self.assertGreater(db_manager.save_results("user1", {'PL': 1}), 0)
+        finally:
+            timer.join()
+    
+    def test_retry_time_is_bounded(self):
+        """Test that retrying a permanently locked operation gives up in bounded time."""
+        db_manager = DatabaseManager(self.db_path, multi_writer=True, max_retries=20,
+                                     retry_backoff=0.05, max_backoff=0.01)
+        attempts = []
+        
+        def always_locked():
+            attempts.append(1)
+            raise sqlite3.OperationalError("database is locked")
+        
+        start = time.monotonic()
+        with self.assertRaises(sqlite3.OperationalError):
+            db_manager.run_with_retry(always_locked)
+        
+        self.assertEqual(len(attempts), 21)
+        self.assertLess(time.monotonic() - start, 20 * 0.01 + 1)
+    
+    def test_no_retry_by_default(self):
+        """Test that locks surface immediately outside multi-writer mode."""
+        db_manager = DatabaseManager(self.db_path, busy_timeout=0)
+        blocker = sqlite3.connect(self.db_path)
+        blocker.execute('BEGIN IMMEDIATE')
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                db_manager.save_results("user1", {'PL': 1})
+        finally:
+            blocker.rollback()
+            blocker.close()
+    
+    def test_concurrent_writers_and_readers(self):
+        """Test that no result is lost with several writer and reader processes."""
+        writers, readers, per_writer = 4, 2, 50
+        stop_event = multiprocessing.Event()
+        reader_procs = [multiprocessing.Process(target=read_results_worker,
+                                                args=(self.db_path, stop_event))
+                        for _ in range(readers)]
+        writer_procs = [multiprocessing.Process(target=write_results_worker,
+                                                args=(self.db_path, i, per_writer))
+                        for i in range(writers)]
+        for proc in reader_procs + writer_procs:
+            proc.start()
+        for proc in writer_procs:
+            proc.join(60)
+        stop_event.set()
+        for proc in reader_procs:
+            proc.join(60)
+        
+        self.assertTrue(all(proc.exitcode == 0 for proc in writer_procs + reader_procs))
+        for i in range(writers):
+            results = self.db_manager.get_user_results(f"writer{i}")
+            self.assertEqual(sorted(r['pl_score'] for r in results), list(range(per_writer)))
+
+
+class TestUserResultsCache(unittest.TestCase):
+    """Test cases for the DatabaseManager user results cache."""
+    
+    SCORES = {'PL': 10, 'RI': 5, 'CO': 0, 'SH': 0, 'ME': 0, 'TW': 0, 'IMP': 0, 'CF': 0, 'SP': 0}
+    
+    def setUp(self):
+        """Set up a cached test database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'test_results.db')
+        self.db_manager = DatabaseManager(self.db_path, cache_size=2)
+    
+    def tearDown(self):
+        """Clean up test database."""
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        os.rmdir(self.temp_dir)
+    
+    def test_cache_disabled_by_default(self):
+        """Test that caching is opt-in."""
+        self.assertIsNone(DatabaseManager(self.db_path).cache_info())
+    
+    def test_hits_and_misses(self):
+        """Test that repeated lookups are served from the cache."""
+        self.db_manager.save_results("user1", self.SCORES)
+        
+        first = self.db_manager.get_user_results("user1")
+        second = self.db_manager.get_user_results("user1")
+        
+        self.assertEqual(first, second)
+        info = self.db_manager.cache_info()
+        self.assertEqual(info['hits'], 1)
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['size'], 1)
+    
+    def test_save_invalidates_user(self):
+        """Test that saving results invalidates only that user's entry."""
+        self.db_manager.save_results("user1", self.SCORES)
+        self.db_manager.get_user_results("user1")
+        self.db_manager.get_user_results("user2")
+        
+        self.db_manager.save_results("user1", self.SCORES)
+        
+        self.assertEqual(len(self.db_manager.get_user_results("user1")), 2)
+        self.db_manager.get_user_results("user2")
+        info = self.db_manager.cache_info()
+        self.assertEqual(info['misses'], 3)
+        self.assertEqual(info['hits'], 1)
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used user is evicted."""
+        for name in ("user1", "user2", "user1", "user3"):
+            self.db_manager.get_user_results(name)
+        
+        self.assertEqual(self.db_manager.cache_info()['size'], 2)
+        self.assertIsNone(self.db_manager.cache.get("user2"))
+        self.assertIsNotNone(self.db_manager.cache.get("user1"))
+    
+    def test_ttl_expiry(self):
+        """Test that expired entries are reloaded from the database."""
+        db_manager = DatabaseManager(self.db_path, cache_size=4, cache_ttl=0)
+        db_manager.get_user_results("user1")
+        db_manager.get_user_results("user1")
+        self.assertEqual(db_manager.cache_info()['hits'], 0)
+    
+    def test_invalidation_is_per_user(self):
+        """Test that a write only discards in-flight fills for the same user."""
+        cache = self.db_manager.cache
+        token1 = cache.begin_fill("user1")
+        token2 = cache.begin_fill("user2")
+        
+        cache.invalidate("user2")
+        cache.put("user1", [{'id': 1}], token1)
+        cache.put("user2", [{'id': 2}], token2)
+        
+        self.assertEqual(cache.get("user1"), [{'id': 1}])
+        self.assertIsNone(cache.get("user2"))
+    
+    def test_returned_rows_are_copies(self):
+        """Test that mutating returned rows does not corrupt the cache."""
+        self.db_manager.save_results("user1", self.SCORES)
+        self.db_manager.get_user_results("user1")[0]['pl_score'] = 99
+        self.assertEqual(self.db_manager.get_user_results("user1")[0]['pl_score'], 10)
+
+
+class TestInMemoryDatabase(unittest.TestCase):
+    """Test cases for the in-memory storage mode with periodic persistence."""
+    
+    SCORES = {'PL': 10, 'RI': 5, 'CO': 0, 'SH': 0, 'ME': 0, 'TW': 0, 'IMP': 0, 'CF': 0, 'SP': 0}
+    
+    def setUp(self):
+        """Set up a directory for persisted databases."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'data', 'test_results.db')
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def persisted_count(self):
+        """Count the rows in the database file, or None if it does not exist."""
+        if not os.path.exists(self.db_path):
+            return None
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute('SELECT COUNT(*) FROM test_results').fetchone()[0]
+        finally:
+            conn.close()
+    
+    def wait_for_count(self, count, timeout=5.0):
+        """Wait for the background thread to persist a number of rows."""
+        deadline = time.monotonic() + timeout
+        while self.persisted_count() != count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.persisted_count(), count)
+    
+    def test_memory_path(self):
+        """Test that ':memory:' works without touching the filesystem."""
+        db_manager = DatabaseManager(':memory:')
+        self.assertTrue(db_manager.in_memory)
+        result_id = db_manager.save_results("user1", self.SCORES)
+        self.assertEqual(db_manager.get_user_results("user1")[0]['id'], result_id)
+        self.assertEqual(db_manager.persist(), 0)
+        self.assertFalse(os.path.exists(':memory:'))
+        db_manager.close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            db_manager.get_all_results()
+    
+    def test_flush_on_close(self):
+        """Test that close writes results that were never persisted."""
+        with DatabaseManager(self.db_path, in_memory=True, persist_interval=None,
+                             persist_changes=None) as db_manager:
+            for i in range(3):
+                db_manager.save_results(f"user{i}", self.SCORES)
+            self.assertIsNone(self.persisted_count())
+            self.assertEqual(db_manager.dirty_changes, 3)
+        self.assertEqual(self.persisted_count(), 3)
+        self.assertEqual(len(DatabaseManager(self.db_path).get_all_results()), 3)
+    
+    def test_loads_existing_file(self):
+        """Test that an existing database file is loaded into memory."""
+        DatabaseManager(self.db_path).save_results("user1", self.SCORES)
+        db_manager = DatabaseManager(self.db_path, in_memory=True)
+        self.assertEqual(db_manager.dirty_changes, 0)
+        db_manager.save_results("user2", self.SCORES)
+        self.assertEqual(len(db_manager.get_all_results()), 2)
+        self.assertEqual(self.persisted_count(), 1)
+        self.assertEqual(db_manager.persist(), 1)
+        self.assertEqual((db_manager.dirty_changes, self.persisted_count()), (0, 2))
+        db_manager.close()
+    
+    def test_persist_by_changes(self):
+        """Test that enough changed rows trigger a background persist."""
+        db_manager = DatabaseManager(self.db_path, in_memory=True, persist_interval=None,
+                                     persist_changes=5)
+        for i in range(4):
+            db_manager.save_results(f"user{i}", self.SCORES)
+        time.sleep(0.05)
+        self.assertIsNone(self.persisted_count())
+        db_manager.save_results("user4", self.SCORES)
+        self.wait_for_count(5)
+        db_manager.close()
+    
+    def test_persist_by_interval(self):
+        """Test that pending changes are persisted on the interval."""
+        db_manager = DatabaseManager(self.db_path, in_memory=True, persist_interval=0.02,
+                                     persist_changes=None)
+        db_manager.save_results("user1", self.SCORES)
+        self.wait_for_count(1)
+        db_manager.close()
+    
+    def test_concurrent_threads(self):
+        """Test that threads can share the in-memory connection."""
+        db_manager = DatabaseManager(':memory:')
+        
+        def save(writer_id):
+            for i in range(50):
+                db_manager.save_results(f"writer{writer_id}", {'PL': i})
+                db_manager.get_user_results(f"writer{writer_id}")
+        
+        threads = [threading.Thread(target=save, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(db_manager.get_all_results()), 200)
+    
+    def test_rejects_multi_writer(self):
+        """Test that the in-memory mode cannot be combined with multi_writer."""
+        with self.assertRaises(ValueError):
+            DatabaseManager(':memory:', multi_writer=True)
 
 
 if __name__ == '__main__':
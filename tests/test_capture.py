@@ -0,0 +1,140 @@
+"""
+Unit tests for the GUI capture harness and image comparison.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+import time
+import tkinter as tk
+
+import numpy as np
+from PIL import Image
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from gui.capture import (BASELINE_DIR, SCREENS, capture_screens, check_baselines,
+                         compare_images, scripted_answer, virtual_display)
+
+TRACKED_DB = os.path.join(os.path.dirname(__file__), '..', 'data', 'results.db')
+
+
+def solid(color, size=(40, 30)):
+    """Create a single-colour RGB image."""
+    return Image.new('RGB', size, color)
+
+
+class TestCompareImages(unittest.TestCase):
+    """Test cases for pixel-diff comparison."""
+    
+    def test_identical(self):
+        """Test that identical images pass with no changed pixels."""
+        result = compare_images(solid((10, 20, 30)), solid((10, 20, 30)))
+        self.assertTrue(result.passed)
+        self.assertEqual((result.changed_fraction, result.max_delta), (0.0, 0))
+    
+    def test_threshold(self):
+        """Test that small per-channel differences are ignored."""
+        self.assertTrue(compare_images(solid((100, 100, 100)), solid((110, 100, 100))).passed)
+        result = compare_images(solid((100, 100, 100)), solid((140, 100, 100)))
+        self.assertFalse(result.passed)
+        self.assertEqual(result.max_delta, 40)
+    
+    def test_tolerance_and_diff_image(self):
+        """Test the changed-pixel tolerance and the marked diff image."""
+        baseline = solid((255, 255, 255))
+        actual = baseline.copy()
+        actual.putpixel((5, 5), (0, 0, 0))
+        self.assertFalse(compare_images(actual, baseline, tolerance=0).passed)
+        
+        result = compare_images(actual, baseline, tolerance=0.01)
+        self.assertTrue(result.passed)
+        self.assertAlmostEqual(result.changed_fraction, 1 / 1200)
+        diff = np.asarray(result.diff)
+        self.assertEqual(tuple(diff[5, 5]), (255, 0, 0))
+        self.assertEqual(int((diff == (255, 0, 0)).all(axis=2).sum()), 1)
+    
+    def test_size_mismatch(self):
+        """Test that images of different sizes never match."""
+        self.assertFalse(compare_images(solid(0, (40, 30)), solid(0, (30, 40))).passed)
+    
+    def test_check_baselines(self):
+        """Test that failing and missing baselines write the actual and diff images."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            solid((0, 0, 0)).save(os.path.join(temp_dir, 'same.png'))
+            solid((0, 0, 0)).save(os.path.join(temp_dir, 'changed.png'))
+            output = os.path.join(temp_dir, 'failures')
+            results = check_baselines({'same': solid((0, 0, 0)), 'changed': solid((200, 0, 0)),
+                                       'missing': solid((0, 0, 0))}, temp_dir, output)
+            self.assertEqual({name: r.passed for name, r in results.items()},
+                             {'same': True, 'changed': False, 'missing': False})
+            self.assertEqual(sorted(os.listdir(output)),
+                             ['changed.actual.png', 'changed.diff.png', 'missing.actual.png'])
+        finally:
+            shutil.rmtree(temp_dir)
+    
+    def test_scripted_answer(self):
+        """Test that scripted answers use exactly 10 points."""
+        for index in range(8):
+            answer = scripted_answer(index, 'abcdefgh')
+            self.assertEqual(sum(answer.values()), 10)
+            self.assertEqual(answer['abcdefgh'[index]], 6)
+
+
+class TestCaptureScreens(unittest.TestCase):
+    """Test cases that drive the real GUI; they need a display or Xvfb."""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.display = virtual_display()
+        if cls.display.__enter__() is None:
+            raise unittest.SkipTest("no display available and Xvfb is not installed")
+        try:
+            tk.Tk().destroy()
+        except tk.TclError as e:
+            cls.display.__exit__(None, None, None)
+            raise unittest.SkipTest(f"no display available: {e}")
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.display.__exit__(None, None, None)
+    
+    def test_captures_are_deterministic(self):
+        """Test that two runs capture identical screens quickly."""
+        with open(TRACKED_DB, 'rb') as tracked:
+            tracked_before = tracked.read()
+        start = time.perf_counter()
+        first = capture_screens()
+        second = capture_screens()
+        self.assertLess(time.perf_counter() - start, 20)
+        
+        # Captures save to a temporary database; the repository's stays untouched
+        with open(TRACKED_DB, 'rb') as tracked:
+            self.assertEqual(tracked.read(), tracked_before)
+        self.assertFalse(os.path.exists(TRACKED_DB + '-wal'))
+        
+        self.assertEqual(tuple(first), SCREENS)
+        for name in SCREENS:
+            self.assertEqual(first[name].size, (800, 600))
+            self.assertTrue(compare_images(first[name], second[name], tolerance=0).passed, name)
+    
+    def test_matches_baselines(self):
+        """Test the screens against the stored baselines."""
+        missing = [name for name in SCREENS if not os.path.exists(os.path.join(BASELINE_DIR, f'{name}.png'))]
+        if missing:
+            message = f"no baselines for {', '.join(missing)}; create them with python -m gui.capture --update"
+            # Locally a missing baseline only skips; on CI it must not pass unnoticed
+            if os.environ.get('CI'):
+                self.fail(message)
+            self.skipTest(message)
+        results = check_baselines(capture_screens())
+        failed = {name: f"{r.changed_fraction:.4%}" for name, r in results.items() if not r.passed}
+        self.assertEqual(failed, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
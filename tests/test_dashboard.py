@@ -0,0 +1,107 @@
+"""
+Unit tests for the static dashboard generator.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_processing import BelbinTest, DatabaseManager
+from utils.dashboard import build_dashboard, main, user_page_path
+
+
+class TestDashboard(unittest.TestCase):
+    """Test cases for full and incremental dashboard builds."""
+    
+    def setUp(self):
+        """Set up a test database and output directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'test_results.db')
+        self.db_manager = DatabaseManager(self.db_path)
+        self.site = os.path.join(self.temp_dir, 'site')
+        for i in range(6):
+            self.save(f"user{i}", i)
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def save(self, username, offset):
+        """Save a result whose scores depend on the offset."""
+        self.db_manager.save_results(username, {role: (offset + j) % 12 for j, role in enumerate(BelbinTest.ROLES)})
+    
+    def read(self, relative_path):
+        """Return the contents of a generated page."""
+        with open(os.path.join(self.site, relative_path), encoding='utf-8') as page:
+            return page.read()
+    
+    def test_full_build(self):
+        """Test that a first build renders every page."""
+        stats = build_dashboard(self.db_manager, self.site, workers=1)
+        self.assertEqual(stats, {'rendered': 6, 'unchanged': 0, 'removed': 0,
+                                 'summary_pages': 1 + len(BelbinTest.ROLES)})
+        
+        page = self.read(user_page_path("user3"))
+        self.assertIn('<svg', page)
+        self.assertIn('user3', page)
+        index = self.read('index.html')
+        for i in range(6):
+            self.assertIn(user_page_path(f"user{i}"), index)
+        for code in BelbinTest.ROLES:
+            self.assertIn('<svg', self.read(f'roles/{code}.html'))
+    
+    def test_incremental_build(self):
+        """Test that only users with new rows are rendered again."""
+        build_dashboard(self.db_manager, self.site, workers=1)
+        stats = build_dashboard(self.db_manager, self.site, workers=1)
+        self.assertEqual((stats['rendered'], stats['unchanged'], stats['summary_pages']), (0, 6, 0))
+        
+        self.save("user2", 100)
+        self.save("newcomer", 1)
+        stats = build_dashboard(self.db_manager, self.site, workers=1)
+        self.assertEqual((stats['rendered'], stats['unchanged']), (2, 5))
+        self.assertEqual(stats['summary_pages'], 1 + len(BelbinTest.ROLES))
+        self.assertIn('History (2 results)', self.read(user_page_path("user2")))
+        self.assertIn('newcomer', self.read('index.html'))
+    
+    def test_removed_user_and_missing_page(self):
+        """Test that pages are removed for deleted users and rebuilt if missing."""
+        build_dashboard(self.db_manager, self.site, workers=1)
+        with self.db_manager.connect() as conn:
+            conn.execute("DELETE FROM test_results WHERE username = 'user0'")
+        os.remove(os.path.join(self.site, user_page_path("user1")))
+        
+        stats = build_dashboard(self.db_manager, self.site, workers=1)
+        self.assertEqual((stats['rendered'], stats['removed']), (1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.site, user_page_path("user0"))))
+        self.assertTrue(os.path.exists(os.path.join(self.site, user_page_path("user1"))))
+    
+    def test_parallel_build(self):
+        """Test that rendering in worker processes writes the same pages."""
+        stats = build_dashboard(self.db_manager, self.site, workers=2, batch_size=2)
+        self.assertEqual(stats['rendered'], 6)
+        for i in range(6):
+            self.assertIn(f"user{i}", self.read(user_page_path(f"user{i}")))
+    
+    def test_escaping_and_paths(self):
+        """Test that usernames are escaped in pages and give distinct paths."""
+        self.save("<b>Bob</b>", 1)
+        self.save("bob", 2)
+        build_dashboard(self.db_manager, self.site, workers=1)
+        self.assertNotEqual(user_page_path("<b>Bob</b>"), user_page_path("bob"))
+        self.assertIn('&lt;b&gt;Bob&lt;/b&gt;', self.read('index.html'))
+        self.assertNotIn('<b>Bob</b>', self.read(user_page_path("<b>Bob</b>")))
+    
+    def test_cli(self):
+        """Test the command line entry point."""
+        self.assertEqual(main([self.site, '--db', self.db_path, '--workers', '1']), 0)
+        self.assertTrue(os.path.exists(os.path.join(self.site, 'index.html')))
+
+
+if __name__ == '__main__':
+    unittest.main()
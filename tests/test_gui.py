@@ -5,12 +5,26 @@ This test runs without displaying the GUI for CI environments.
 
 import sys
 import os
+import shutil
+import tempfile
 import tkinter as tk
+import unittest
 
 # Add parent directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from gui.tkinter_interface import BelbinTestGUI
+from utils.data_processing import BelbinTest
+from utils.question_bank import BankRegistry, export_bank
+
+
+def answer_all_questions(app):
+    """Drive the app through every question, putting all points on option 'a'."""
+    for _ in app.belbin_test.QUESTIONS:
+        for key, spinbox in app.option_spinboxes.items():
+            spinbox.delete(0, tk.END)
+            spinbox.insert(0, '10' if key == 'a' else '0')
+        app.next_question()
 
 
 def test_gui_initialization():
@@ -107,6 +121,135 @@ def test_database_integration():
         return False
 
 
+def create_root():
+    """Create a hidden root window, skipping the test when no display is available."""
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        raise unittest.SkipTest(f"no display available: {e}")
+    root.withdraw()
+    return root
+
+
+def count_widgets(widget):
+    """Count a widget and all of its descendants."""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def run_kiosk_session(app, username):
+    """Take one full kiosk session and return to the welcome screen."""
+    app.username_entry.insert(0, username)
+    app.start_test()
+    answer_all_questions(app)
+    assert app.kiosk_current_screen == 'results'
+    app.create_welcome_screen()
+    assert app.answers == {}
+    app.root.update()
+
+
+def test_kiosk_sessions():
+    """Test that kiosk mode reuses screens and saves results in the background."""
+    temp_dir = tempfile.mkdtemp()
+    root = create_root()
+    try:
+        app = BelbinTestGUI(root, kiosk=True, db_path=os.path.join(temp_dir, 'kiosk.db'))
+        app.prewarm_kiosk()
+        screen_count = len(app.kiosk_screens)
+        
+        run_kiosk_session(app, "kiosk_user_0")
+        tcl_commands = len(root.tk.call('info', 'commands'))
+        widgets = count_widgets(root)
+        
+        for session in range(1, 5):
+            run_kiosk_session(app, f"kiosk_user_{session}")
+        
+        # Screens are reused rather than rebuilt, so handle counts stay flat
+        assert len(app.kiosk_screens) == screen_count
+        assert len(root.winfo_children()) == screen_count
+        assert len(root.tk.call('info', 'commands')) == tcl_commands
+        assert count_widgets(root) == widgets
+        
+        # Answers from the previous session do not leak into the next one
+        app.username_entry.insert(0, "kiosk_user_next")
+        app.start_test()
+        assert all(spinbox.get() == '0' for spinbox in app.option_spinboxes.values())
+        
+        app.close()
+        assert len(app.db_manager.get_all_results()) == 5
+    finally:
+        root.destroy()
+        shutil.rmtree(temp_dir)
+
+
+def test_kiosk_language_switch():
+    """Test that a kiosk switches question banks and keeps each language's screens."""
+    temp_dir = tempfile.mkdtemp()
+    root = create_root()
+    try:
+        export_bank(os.path.join(temp_dir, 'en-1.json'))
+        translated = type('Translated', (BelbinTest,), {'QUESTIONS': [
+            {**question, 'question': f"[xx] {question['question']}"} for question in BelbinTest.QUESTIONS
+        ]})
+        export_bank(os.path.join(temp_dir, 'xx-1.json'), translated)
+        
+        app = BelbinTestGUI(root, kiosk=True, db_path=os.path.join(temp_dir, 'kiosk.db'),
+                            question_banks=BankRegistry(temp_dir), language='en')
+        app.prewarm_kiosk()
+        run_kiosk_session(app, "english")
+        
+        app.language_var.set('xx')
+        app.on_language_selected()
+        root.update()
+        screen_count = len(app.kiosk_screens)
+        app.username_entry.insert(0, "translated")
+        app.start_test()
+        assert app.belbin_test.QUESTIONS[0]['question'].startswith("[xx] ")
+        app.create_welcome_screen()
+        
+        # Switching back reuses the screens built for the first language
+        app.language_var.set('en')
+        app.on_language_selected()
+        root.update()
+        assert len(app.kiosk_screens) == screen_count
+        run_kiosk_session(app, "english again")
+        app.close()
+        assert len(app.db_manager.get_all_results()) == 2
+    finally:
+        root.destroy()
+        shutil.rmtree(temp_dir)
+
+
+def test_multi_writer_opt_in():
+    """Test that the GUI only switches its database to WAL when asked to."""
+    temp_dir = tempfile.mkdtemp()
+    root = create_root()
+    try:
+        for multi_writer, journal_mode in ((False, 'delete'), (True, 'wal')):
+            db_path = os.path.join(temp_dir, f'{journal_mode}.db')
+            app = BelbinTestGUI(root, db_path=db_path, multi_writer=multi_writer)
+            assert app.db_manager.multi_writer == multi_writer
+            with app.db_manager.connect() as conn:
+                assert conn.execute('PRAGMA journal_mode').fetchone()[0] == journal_mode
+            app.close()
+    finally:
+        root.destroy()
+        shutil.rmtree(temp_dir)
+
+
+def run_strict(test):
+    """Run an asserting test function, reporting the result like the tests above."""
+    try:
+        test()
+    except unittest.SkipTest as e:
+        print(f"- {test.__name__} skipped: {e}")
+        return True
+    except Exception as e:
+        print(f"✗ {test.__name__} failed: {e!r}")
+        return False
+    print(f"✓ {test.__name__} passed")
+    return True
+
+
 if __name__ == "__main__":
     print("Running GUI tests...")
     
@@ -114,6 +257,9 @@ if __name__ == "__main__":
     all_passed &= test_gui_initialization()
     all_passed &= test_question_data()
     all_passed &= test_database_integration()
+    all_passed &= run_strict(test_kiosk_sessions)
+    all_passed &= run_strict(test_kiosk_language_switch)
+    all_passed &= run_strict(test_multi_writer_opt_in)
     
     if all_passed:
         print("\n✓ All GUI tests passed!")
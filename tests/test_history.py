@@ -0,0 +1,173 @@
+"""
+Unit tests for keyset result paging and the history browser.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+import time
+import tkinter as tk
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from gui.history import HistoryBrowser, ResultPager
+from utils.data_processing import BelbinTest, DatabaseManager
+from utils.name_search import NameIndex
+from utils.transfer import load_rows
+
+
+class TestResultPaging(unittest.TestCase):
+    """Test cases for keyset paging, prefix search and sorting."""
+    
+    def setUp(self):
+        """Set up a database with ties in every sort column."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir, 'results.db'))
+        load_rows(self.db_manager, ({'username': ['alice', 'alan', 'bob', 'Al'][i % 4],
+                                     'timestamp': f'2024-01-{i % 5 + 1:02d} 10:00:00',
+                                     **{column: (i * (j + 3)) % 7 for j, column in enumerate(DatabaseManager.SCORE_COLUMNS)}}
+                                    for i in range(103)))
+        self.all_rows = self.db_manager.fetch_all(
+            f'SELECT {", ".join(DatabaseManager.RESULT_COLUMNS)} FROM test_results')
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def walk(self, pager):
+        """Collect every page forwards from the first one."""
+        rows = pager.first()
+        while True:
+            page = pager.after(rows[-1]) if rows else []
+            if not page:
+                return rows
+            rows.extend(page)
+    
+    def test_pages_cover_all_rows_in_order(self):
+        """Test that forward paging returns every row once, in sort order."""
+        for order_by in ('id', 'username', 'timestamp', 'sp_score'):
+            for descending in (False, True):
+                with self.subTest(order_by=order_by, descending=descending):
+                    pager = ResultPager(self.db_manager, '', order_by, descending, page_size=10)
+                    expected = sorted(self.all_rows, key=pager.key, reverse=descending)
+                    self.assertEqual(self.walk(pager), expected)
+    
+    def test_previous_pages(self):
+        """Test that paging backwards returns the rows before an anchor."""
+        pager = ResultPager(self.db_manager, '', 'timestamp', True, page_size=10)
+        rows = self.walk(pager)
+        self.assertEqual(pager.before(rows[35]), rows[25:35])
+        self.assertEqual(pager.before(rows[4]), rows[:4])
+    
+    def test_prefix_search(self):
+        """Test that the prefix filter is a case-sensitive username range."""
+        pager = ResultPager(self.db_manager, 'al', 'username', False, page_size=7)
+        rows = self.walk(pager)
+        self.assertEqual({row[1] for row in rows}, {'alice', 'alan'})
+        self.assertEqual(pager.count(), len(rows))
+        self.assertEqual(self.db_manager.count_results(), 103)
+        self.assertEqual(self.db_manager.count_results('b'), 26)
+        self.assertEqual(self.db_manager.count_results('z'), 0)
+        
+        # Prefixes ending in the last code point or just before the surrogates
+        last = chr(0x10FFFF)
+        names = ('x' + last, 'x' + last + 'y', last + 'z', '\ud7ff', '\ue000')
+        load_rows(self.db_manager, ({'username': name} for name in names))
+        self.assertEqual(self.db_manager.count_results('x' + last), 2)
+        self.assertEqual(self.db_manager.count_results('x'), 2)
+        self.assertEqual(self.db_manager.count_results(last), 1)
+        self.assertEqual(self.db_manager.count_results('\ud7ff'), 1)
+    
+    def test_keyset_queries_use_indexes(self):
+        """Test that name and time pages are index range scans, not sorts."""
+        for order_by in ('username', 'timestamp'):
+            with self.subTest(order_by=order_by):
+                plan = self.db_manager.fetch_all(
+                    f'EXPLAIN QUERY PLAN SELECT * FROM test_results WHERE ({order_by}, id) > (?, ?) '
+                    f'ORDER BY {order_by}, id LIMIT 10', ('a', 0))
+                details = ' '.join(row[-1] for row in plan)
+                self.assertIn(f'INDEX idx_test_results_{order_by}', details)
+                self.assertNotIn('TEMP B-TREE', details)
+    
+    def test_invalid_sort_column(self):
+        """Test that only result columns can be used for sorting."""
+        with self.assertRaises(ValueError):
+            self.db_manager.page_results(order_by='id; DROP TABLE test_results')
+
+
+class TestHistoryBrowser(unittest.TestCase):
+    """Test cases for the history window (skipped without a display)."""
+    
+    def setUp(self):
+        """Create a hidden root window and a database with results."""
+        try:
+            self.root = tk.Tk()
+        except tk.TclError as e:
+            self.skipTest(f"no display available: {e}")
+        self.root.withdraw()
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir, 'results.db'))
+        load_rows(self.db_manager, ({'username': f"user{i:04d}", 'timestamp': '2024-01-01 00:00:00',
+                                     **{column: i % 10 for column in DatabaseManager.SCORE_COLUMNS}}
+                                    for i in range(1000)))
+    
+    def tearDown(self):
+        """Destroy the window and clean up test files."""
+        self.root.destroy()
+        shutil.rmtree(self.temp_dir)
+    
+    def wait_until(self, condition, timeout=5.0):
+        """Process events until a condition holds."""
+        deadline = time.monotonic() + timeout
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, "timed out waiting for the browser")
+            self.root.update()
+            time.sleep(0.01)
+    
+    def test_paging_search_and_sort(self):
+        """Test loading pages while scrolling, searching and sorting."""
+        browser = HistoryBrowser(self.root, self.db_manager, page_size=50, max_rows=100)
+        self.wait_until(lambda: browser.rows and browser.total == 1000 and not browser.loading)
+        self.assertLessEqual(len(browser.tree.get_children()), 100)
+        self.assertEqual(len(browser.tree.get_children()), len(browser.rows))
+        
+        # Scroll to the end repeatedly: the window slides and stays bounded
+        for _ in range(30):
+            browser.tree.yview_moveto(1.0)
+            self.wait_until(lambda: not browser.loading)
+        self.assertTrue(browser.at_end)
+        self.assertFalse(browser.at_start)
+        self.assertEqual(browser.rows[-1][0], 1)
+        self.assertLessEqual(len(browser.rows), 100)
+        
+        browser.search_var.set('user09')
+        browser.apply_search()
+        self.wait_until(lambda: browser.total == 100 and not browser.loading and browser.rows)
+        self.assertTrue(all(row[1].startswith('user09') for row in browser.rows))
+        
+        browser.sort_by('username')
+        self.wait_until(lambda: not browser.loading and browser.rows)
+        self.assertEqual(browser.rows[0][1], 'user0900')
+        
+        # Without a name index, suggestions are names with the typed prefix
+        browser.search_var.set('user095')
+        browser.apply_search()
+        self.wait_until(lambda: browser.total == 10 and browser.suggestions)
+        self.assertEqual(browser.suggestions, [f"user{i:04d}" for i in range(950, 960)])
+        self.assertFalse(NameIndex.installed(self.db_manager))
+        
+        # With one, a misspelled name finds nothing but suggests the closest names
+        NameIndex.install(self.db_manager)
+        browser.search_var.set('usr0950')
+        browser.apply_search()
+        self.wait_until(lambda: browser.total == 0 and browser.suggestions)
+        self.assertEqual(browser.suggestions[0], 'user0950')
+        self.assertIn('user0950', browser.status_label.cget('text'))
+        browser.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Unit tests for the long-running session memory budget harness.
+"""
+
+import unittest
+import os
+import sys
+import tkinter as tk
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from gui.capture import virtual_display
+from gui.memory_budget import MemoryBudget, MemoryReport, measure_sessions
+
+
+class TestMemoryReport(unittest.TestCase):
+    """Test cases for checking measurements against budgets."""
+    
+    def test_within_budget(self):
+        """Test that a flat run passes and lists no allocation sites."""
+        report = MemoryReport(100, 10000, 0, 0, 0, ["site.py:1: size=10 KiB"])
+        self.assertEqual(report.bytes_per_session, 100)
+        self.assertEqual(report.failures(MemoryBudget()), [])
+        self.assertNotIn("site.py", report.format(MemoryBudget()))
+    
+    def test_over_budget(self):
+        """Test that every exceeded budget is reported with the allocation sites."""
+        report = MemoryReport(100, 1000000, 2, 1, 3, ["site.py:1: size=976 KiB"])
+        failures = report.failures(MemoryBudget())
+        self.assertEqual(len(failures), 4)
+        self.assertIn("10,000 bytes per session", failures[0])
+        text = report.format(MemoryBudget())
+        self.assertIn("Over budget:", text)
+        self.assertIn("site.py:1", text)
+        self.assertEqual(report.failures(MemoryBudget(20000, 2, 1, 3)), [])
+
+
+class TestLongRunningSessions(unittest.TestCase):
+    """Test cases that drive the real GUI; they need a display or Xvfb."""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.display = virtual_display()
+        if cls.display.__enter__() is None:
+            raise unittest.SkipTest("no display available and Xvfb is not installed")
+        try:
+            tk.Tk().destroy()
+        except tk.TclError as e:
+            cls.display.__exit__(None, None, None)
+            raise unittest.SkipTest(f"no display available: {e}")
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.display.__exit__(None, None, None)
+    
+    def test_sessions_within_budget(self):
+        """Test that repeated sessions stay within the memory budget."""
+        report = measure_sessions(sessions=200)
+        self.assertEqual(report.failures(MemoryBudget()), [], report.format(MemoryBudget()))
+        self.assertEqual(report.live_figures, 0)
+    
+    def test_kiosk_sessions_within_budget(self):
+        """Test that kiosk mode reuses its single figure across sessions."""
+        report = measure_sessions(sessions=200, kiosk=True)
+        self.assertEqual(report.failures(MemoryBudget()), [], report.format(MemoryBudget()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Unit tests for the username search index.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_processing import DatabaseManager
+from utils.name_search import NameIndex, main
+from utils.transfer import export_results, import_results, load_rows
+
+NAMES = ['Alice Johnson', 'Alicia Jones', 'alan smith', 'Bob Smith', 'Robert Smyth', 'Zoë Ålander']
+
+
+class TestNameIndex(unittest.TestCase):
+    """Test cases for prefix and fuzzy lookup and index maintenance."""
+    
+    def setUp(self):
+        """Set up a database with results for several names."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'results.db')
+        self.db_manager = DatabaseManager(self.db_path)
+        for i, name in enumerate(NAMES):
+            for _ in range(i % 3 + 1):
+                self.db_manager.save_results(name, {'PL': i})
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def names(self, matches):
+        """Return the names of a list of matches."""
+        return [match.name for match in matches]
+    
+    def test_backfill_and_prefix(self):
+        """Test that existing results are indexed and prefixes ignore case."""
+        index = NameIndex.install(self.db_manager)
+        self.assertEqual(len(index), len(NAMES))
+        self.assertEqual(self.names(index.prefix('ali')), ['Alice Johnson', 'Alicia Jones'])
+        self.assertEqual(self.names(index.prefix('AL')), ['alan smith', 'Alice Johnson', 'Alicia Jones'])
+        self.assertEqual(self.names(index.prefix('Zoë')), ['Zoë Ålander'])
+        self.assertEqual(index.prefix('Alice Johnson')[0].results, 1)
+        self.assertEqual(index.prefix('alicia')[0].results, 2)
+        self.assertEqual(index.prefix('xyz'), [])
+    
+    def test_fuzzy_ranking(self):
+        """Test that misspelled names find the closest names first."""
+        index = NameIndex.install(self.db_manager)
+        self.assertEqual(index.fuzzy('Alcie Jonson')[0].name, 'Alice Johnson')
+        self.assertEqual(self.names(index.fuzzy('Bob Smyth', limit=2)), ['Bob Smith', 'Robert Smyth'])
+        self.assertEqual(index.fuzzy('qqqqqq'), [])
+        scores = [match.score for match in index.fuzzy('smith')]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        # Too short for trigrams: falls back to prefixes
+        self.assertEqual(self.names(index.fuzzy('bo')), ['Bob Smith'])
+        
+        results = index.search('Ali', limit=3)
+        self.assertEqual(self.names(results)[:2], ['Alice Johnson', 'Alicia Jones'])
+        self.assertEqual(len(set(self.names(results))), len(results))
+    
+    def test_updated_on_save_and_delete(self):
+        """Test that saves, bulk imports and purges keep the index current."""
+        index = NameIndex.install(self.db_manager)
+        self.db_manager.save_results('Charlie Brown', {'PL': 1})
+        self.assertEqual(self.names(index.prefix('char')), ['Charlie Brown'])
+        self.db_manager.save_results('Charlie Brown', {'PL': 1})
+        self.assertEqual(index.prefix('char')[0].results, 2)
+        
+        load_rows(self.db_manager, ({'username': f"Bulk User {i}"} for i in range(250)), chunk_size=100)
+        self.assertEqual(len(index.prefix('bulk user', limit=1000)), 250)
+        self.assertEqual(index.fuzzy('Blk User 17')[0].name, 'Bulk User 17')
+        
+        export_results(self.db_manager, os.path.join(self.temp_dir, 'out.csv'), username='Charlie Brown')
+        import_results(self.db_manager, os.path.join(self.temp_dir, 'out.csv'))
+        self.assertEqual(index.prefix('char')[0].results, 4)
+        
+        with self.db_manager.connect() as conn:
+            conn.execute("DELETE FROM test_results WHERE username = 'Charlie Brown'")
+            conn.execute("UPDATE test_results SET username = 'Bobby Smith' WHERE username = 'Bob Smith'")
+        self.assertEqual(index.prefix('char'), [])
+        self.assertEqual(self.names(index.prefix('bob')), ['Bobby Smith'])
+        self.assertNotIn('Charlie Brown', self.names(index.fuzzy('Charlie Brown')))
+        
+        index.rebuild()
+        self.assertEqual(len(index), len(NAMES) + 250)
+    
+    def test_explicit_install(self):
+        """Test that opening an index never installs it, and installing twice is harmless."""
+        with self.assertRaisesRegex(ValueError, "--install"):
+            NameIndex(self.db_manager)
+        self.assertFalse(NameIndex.installed(self.db_manager))
+        NameIndex.install(self.db_manager)
+        self.assertTrue(NameIndex.installed(self.db_manager))
+        self.assertEqual(len(NameIndex.install(self.db_manager)), len(NAMES))
+    
+    def test_reopen_and_cli(self):
+        """Test that a second index on the same database reuses the tables."""
+        with self.assertRaises(ValueError):
+            main(['Alcie', '--db', self.db_path])
+        self.assertEqual(main(['--install', '--db', self.db_path]), 0)
+        self.assertEqual(len(NameIndex(DatabaseManager(self.db_path))), len(NAMES))
+        self.assertEqual(main(['Alcie', '--db', self.db_path]), 0)
+        self.assertEqual(main(['al', '--db', self.db_path, '--prefix', '--rebuild']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
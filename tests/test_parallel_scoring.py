@@ -0,0 +1,123 @@
+"""
+Unit tests for shared-memory parallel scoring.
+"""
+
+import unittest
+import tempfile
+import shutil
+import random
+import os
+import sys
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_processing import BelbinTest, DatabaseManager
+from utils.parallel_scoring import (ParallelScorer, SharedArray, import_answers, main, read_answers,
+                                    slot_columns, write_answers)
+from utils.scoring import encode_answers
+from utils.transfer import load_scores
+
+ROLE_CODES = list(BelbinTest.ROLES)
+
+
+def random_answer_sets(count, seed=5):
+    """Generate answer sets that spread 10 points over two options per question."""
+    rng = random.Random(seed)
+    answer_sets = []
+    for _ in range(count):
+        answers = {}
+        for question_idx, question in enumerate(BelbinTest.QUESTIONS):
+            first, second = rng.sample(list(question['options']), 2)
+            points = rng.randint(0, 10)
+            answers[question_idx] = {first: points, second: 10 - points}
+        answer_sets.append(answers)
+    return answer_sets
+
+
+class TestParallelScoring(unittest.TestCase):
+    """Test cases for scoring through shared memory and bulk saving."""
+    
+    def setUp(self):
+        """Create a temporary directory and reference scores."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.answer_sets = random_answer_sets(300)
+        self.points = encode_answers(self.answer_sets).astype(np.uint8)
+        self.expected = np.array([[BelbinTest.calculate_scores(answers)[role] for role in ROLE_CODES]
+                                  for answers in self.answer_sets])
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_matches_calculate_scores(self):
+        """Test that one and several workers agree with BelbinTest.calculate_scores."""
+        for workers in (1, 3):
+            scores = ParallelScorer(workers, chunk_rows=50).score(self.points)
+            self.assertEqual(scores.dtype, np.int32)
+            np.testing.assert_array_equal(scores, self.expected)
+        self.assertEqual(ParallelScorer(2).score(self.points[:0]).shape, (0, len(ROLE_CODES)))
+    
+    def test_shared_array(self):
+        """Test that attached arrays see the owner's data and closing frees the block."""
+        with SharedArray((4, 3), np.int32) as owner:
+            owner.array[:] = np.arange(12).reshape(4, 3)
+            attached = SharedArray.attach(owner.spec)
+            np.testing.assert_array_equal(attached.array, owner.array)
+            attached.array[0, 0] = 99
+            self.assertEqual(owner.array[0, 0], 99)
+            attached.close()
+            name = owner.spec[0]
+        with self.assertRaises(FileNotFoundError):
+            SharedArray((4, 3), np.int32, name)
+    
+    def test_import_answers(self):
+        """Test reading an answers file, scoring it in workers and saving every row."""
+        path = os.path.join(self.temp_dir, 'answers.csv')
+        usernames = [f"user{i}" for i in range(len(self.points))]
+        write_answers(path, usernames, self.points)
+        with open(path, 'a', encoding='utf-8') as output:
+            output.write('\n')
+        
+        names, answers = read_answers(path, ParallelScorer(2))
+        with answers:
+            self.assertEqual(names, usernames)
+            np.testing.assert_array_equal(answers.array, self.points)
+        
+        db_manager = DatabaseManager(os.path.join(self.temp_dir, 'results.db'))
+        self.assertEqual(import_answers(db_manager, path, workers=2), 300)
+        rows = db_manager.fetch_all(f'SELECT username, timestamp, {", ".join(DatabaseManager.SCORE_COLUMNS)} '
+                                    f'FROM test_results ORDER BY id')
+        self.assertEqual([row[0] for row in rows], usernames)
+        self.assertIsNotNone(rows[0][1])
+        np.testing.assert_array_equal(np.array([row[2:] for row in rows]), self.expected)
+    
+    def test_invalid_answer_files(self):
+        """Test that missing columns and out-of-range points are rejected."""
+        path = os.path.join(self.temp_dir, 'answers.csv')
+        with open(path, 'w', encoding='utf-8') as output:
+            output.write('username,1a\nuser,3\n')
+        with self.assertRaisesRegex(ValueError, 'missing columns'):
+            read_answers(path, ParallelScorer(1))
+        
+        points = np.zeros((2, len(slot_columns())), dtype=int)
+        points[1, 5] = 11
+        write_answers(path, ['a', 'b'], points)
+        with self.assertRaisesRegex(ValueError, 'row 2 has 11 points'):
+            read_answers(path, ParallelScorer(1))
+        with self.assertRaises(ValueError):
+            load_scores(DatabaseManager(os.path.join(self.temp_dir, 'results.db')), ['a'], self.expected)
+    
+    def test_cli(self):
+        """Test scoring a file from the command line."""
+        path = os.path.join(self.temp_dir, 'answers.csv')
+        write_answers(path, ['a', 'b'], self.points[:2])
+        db_path = os.path.join(self.temp_dir, 'results.db')
+        self.assertEqual(main([path, '--db', db_path, '--workers', '1']), 0)
+        self.assertEqual(DatabaseManager(db_path).count_results(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Unit tests for external question banks and their compiled cache.
+"""
+
+import unittest
+import tempfile
+import shutil
+import marshal
+import json
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_processing import BelbinTest, IncrementalScorer
+from utils.question_bank import (BANK_DIR, CACHE_DIRNAME, BankRegistry, export_bank, main,
+                                 validate_bank, version_key)
+
+
+class TestQuestionBanks(unittest.TestCase):
+    """Test cases for loading, validating and caching question banks."""
+    
+    def setUp(self):
+        """Create a bank directory with the built-in questions."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.bank_path = os.path.join(self.temp_dir, 'en-1.json')
+        export_bank(self.bank_path, title="Team roles")
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def cache_files(self):
+        """Return the compiled files in the cache directory."""
+        return sorted(os.listdir(os.path.join(self.temp_dir, CACHE_DIRNAME)))
+    
+    def test_built_in_round_trip(self):
+        """Test that an exported bank asks and scores exactly the built-in questions."""
+        bank = BankRegistry(self.temp_dir).get('en')
+        self.assertEqual((bank.key, bank.title), ('en-1', "Team roles"))
+        self.assertEqual(bank.questions, BelbinTest.QUESTIONS)
+        
+        answers = {0: {'a': 6, 'c': 4}, 2: {'h': 10}}
+        test = bank.test_class()
+        self.assertIs(test, bank.test_class())
+        self.assertEqual(test.calculate_scores(answers), BelbinTest.calculate_scores(answers))
+        scorer = IncrementalScorer(test)
+        for question_idx, question_answers in answers.items():
+            scorer.set_answer(question_idx, question_answers)
+        self.assertEqual(scorer.scores, BelbinTest.calculate_scores(answers))
+    
+    def test_compiled_cache(self):
+        """Test that loads read the compiled cache until the source content changes."""
+        BankRegistry(self.temp_dir).get('en')
+        cached, = self.cache_files()
+        self.assertTrue(cached.startswith('en-1.'))
+        
+        # A doctored cache entry proves later loads skip the JSON source
+        cache_path = os.path.join(self.temp_dir, CACHE_DIRNAME, cached)
+        with open(cache_path, 'rb') as source:
+            compiled = marshal.load(source)
+        compiled['title'] = "From cache"
+        with open(cache_path, 'wb') as output:
+            marshal.dump(compiled, output)
+        self.assertEqual(BankRegistry(self.temp_dir).get('en').title, "From cache")
+        
+        export_bank(self.bank_path, title="Revised")
+        self.assertEqual(BankRegistry(self.temp_dir).get('en').title, "Revised")
+        self.assertEqual(len(self.cache_files()), 1)
+        self.assertNotEqual(self.cache_files()[0], cached)
+        
+        # Unwritable cache locations still load the bank
+        blocker = os.path.join(self.temp_dir, 'not_a_directory')
+        open(blocker, 'w').close()
+        self.assertEqual(BankRegistry(self.temp_dir, cache_dir=blocker).get('en').title, "Revised")
+    
+    def test_validation(self):
+        """Test that malformed banks and unknown roles are rejected."""
+        question = {'question': "Q", 'options': {'a': ["One", 'PL'], 'b': ["Two", 'SP']}}
+        self.assertEqual(len(validate_bank({'questions': [question]})['questions']), 1)
+        bad_banks = {
+            'non-empty': {'questions': []},
+            "unknown role 'XX'": {'questions': [{**question, 'options': {'a': ["One", 'PL'], 'b': ["Two", 'XX']}}]},
+            'question text': {'questions': [{**question, 'question': ' '}]},
+            'at least two options': {'questions': [{**question, 'options': {'a': ["One", 'PL']}}]},
+            'lowercase letter': {'questions': [{**question, 'options': {'a': ["One", 'PL'], 'B': ["Two", 'SP']}}]},
+            r'\[text, role\]': {'questions': [{**question, 'options': {'a': ["One", 'PL'], 'b': "Two"}}]},
+        }
+        for message, data in bad_banks.items():
+            with self.assertRaisesRegex(ValueError, message):
+                validate_bank(data, 'bank.json')
+    
+    def test_registry(self):
+        """Test listing by file name, latest versions and lazy loading."""
+        for name in ('en-2.json', 'en-10.json', 'pt-BR-1.json'):
+            export_bank(os.path.join(self.temp_dir, name))
+        with open(os.path.join(self.temp_dir, 'de-1.json'), 'w', encoding='utf-8') as output:
+            output.write('{"questions": [')
+        open(os.path.join(self.temp_dir, 'notes.txt'), 'w').close()
+        
+        registry = BankRegistry(self.temp_dir)
+        self.assertEqual(registry.languages(), ['de', 'en', 'pt-BR'])
+        self.assertEqual(len(registry), 5)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, CACHE_DIRNAME)))
+        self.assertEqual(registry.get('en').key, 'en-10')
+        self.assertEqual(registry.get('en', '2').key, 'en-2')
+        self.assertIs(registry.get('en'), registry.get('en'))
+        self.assertEqual(registry.get('pt-BR').version, '1')
+        with self.assertRaisesRegex(ValueError, 'not valid JSON'):
+            registry.get('de')
+        with self.assertRaises(KeyError):
+            registry.get('fr')
+        self.assertLess(version_key('9'), version_key('10'))
+        self.assertEqual(len(BankRegistry(os.path.join(self.temp_dir, 'missing'))), 0)
+    
+    def test_installed_banks_and_cli(self):
+        """Test that the shipped banks are valid and the command line reports bad ones."""
+        self.assertEqual(BankRegistry(BANK_DIR, cache_dir=self.temp_dir).get('en').questions,
+                         BelbinTest.QUESTIONS)
+        self.assertEqual(main(['--dir', self.temp_dir, 'check']), 0)
+        with open(os.path.join(self.temp_dir, 'xx-1.json'), 'w', encoding='utf-8') as output:
+            json.dump({'questions': [{'question': "Q", 'options': {'a': ["A", 'PL'], 'b': ["B", 'NO']}}]}, output)
+        self.assertEqual(main(['--dir', self.temp_dir, 'check']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
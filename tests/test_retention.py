@@ -0,0 +1,124 @@
+"""
+Unit tests for result retention and archival.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_processing import DatabaseManager
+from utils.retention import RetentionPolicy, ResultArchive, archive_expired
+
+
+class TestRetention(unittest.TestCase):
+    """Test cases for retention policies and the result archive."""
+    
+    def setUp(self):
+        """Set up a test database and archive path."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir, 'test_results.db'))
+        self.archive = ResultArchive(os.path.join(self.temp_dir, 'archive', 'results.jsonl.gz'))
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def save_at(self, username, timestamp, pl_score=0):
+        """Save a result with an explicit timestamp."""
+        result_id = self.db_manager.save_results(username, {'PL': pl_score})
+        with self.db_manager.connect() as conn:
+            conn.execute('UPDATE test_results SET timestamp = ? WHERE id = ?', (timestamp, result_id))
+        return result_id
+    
+    def test_age_policy(self):
+        """Test that results older than the age limit are archived."""
+        old_id = self.save_at("user1", "2001-01-01 10:00:00")
+        self.db_manager.save_results("user1", {'PL': 5})
+        
+        stats = archive_expired(self.db_manager, RetentionPolicy(max_age_days=30), self.archive)
+        
+        self.assertEqual(stats['archived'], 1)
+        self.assertEqual([r['id'] for r in self.archive.iter_results()], [old_id])
+        self.assertEqual(len(self.db_manager.get_all_results()), 1)
+    
+    def test_per_user_policy(self):
+        """Test that only the newest results per user are kept."""
+        for day in range(1, 6):
+            self.save_at("user1", f"2024-01-0{day} 10:00:00", day)
+        self.save_at("user2", "2024-01-01 10:00:00")
+        
+        archive_expired(self.db_manager, RetentionPolicy(max_per_user=2), self.archive, batch_size=2)
+        
+        kept = sorted(r['pl_score'] for r in self.db_manager.get_user_results("user1"))
+        self.assertEqual(kept, [4, 5])
+        self.assertEqual(len(self.db_manager.get_user_results("user2")), 1)
+        archived = sorted(r['pl_score'] for r in self.archive.iter_results(username="user1"))
+        self.assertEqual(archived, [1, 2, 3])
+    
+    def test_archive_appends_and_filters(self):
+        """Test that repeated runs append and archived rows can be filtered like live ones."""
+        self.save_at("user1", "2001-01-01 10:00:00")
+        archive_expired(self.db_manager, RetentionPolicy(max_age_days=1), self.archive)
+        self.save_at("user2", "2002-06-01 10:00:00")
+        archive_expired(self.db_manager, RetentionPolicy(max_age_days=1), self.archive)
+        
+        self.assertEqual(len(list(self.archive.iter_results())), 2)
+        self.assertEqual([r['username'] for r in self.archive.iter_results(since="2002-01-01")], ["user2"])
+        self.assertEqual([r['username'] for r in self.archive.iter_results(until="2002-01-01")], ["user1"])
+        self.assertEqual(list(self.db_manager.iter_results()), [])
+    
+    def test_no_policy_limits(self):
+        """Test that an empty policy archives nothing."""
+        self.save_at("user1", "2001-01-01 10:00:00")
+        stats = archive_expired(self.db_manager, RetentionPolicy(), self.archive)
+        self.assertEqual(stats['archived'], 0)
+        self.assertFalse(os.path.exists(self.archive.path))
+    
+    def test_space_is_reclaimed(self):
+        """Test that incremental vacuum shrinks the database file after archival."""
+        with self.db_manager.connect() as conn:
+            conn.executemany(
+                "INSERT INTO test_results (username, timestamp) VALUES (?, '2001-01-01 00:00:00')",
+                [(f"user{i}" * 20,) for i in range(5000)]
+            )
+        size_before = os.path.getsize(self.db_manager.db_path)
+        
+        stats = archive_expired(self.db_manager, RetentionPolicy(max_age_days=1), self.archive,
+                                vacuum_step_pages=8)
+        
+        self.assertEqual(stats['archived'], 5000)
+        self.assertGreater(stats['pages_reclaimed'], 0)
+        self.assertLess(os.path.getsize(self.db_manager.db_path), size_before)
+
+
+class TestIterResults(unittest.TestCase):
+    """Test cases for DatabaseManager.iter_results."""
+    
+    def setUp(self):
+        """Set up test database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir, 'test_results.db'))
+    
+    def tearDown(self):
+        """Clean up test database."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_pages_cover_all_rows(self):
+        """Test that keyset paging returns every row once, in id order."""
+        for i in range(25):
+            self.db_manager.save_results(f"user{i % 3}", {'PL': i})
+        
+        rows = list(self.db_manager.iter_results(batch_size=4))
+        self.assertEqual([r['pl_score'] for r in rows], list(range(25)))
+        
+        user_rows = list(self.db_manager.iter_results(username="user1", batch_size=2))
+        self.assertEqual([r['pl_score'] for r in user_rows], list(range(1, 25, 3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Unit tests for streaming role statistics.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_processing import BelbinTest, DatabaseManager
+from utils.role_stats import RoleStatistics, main
+
+ROLE_CODES = list(BelbinTest.ROLES)
+
+
+class TestRoleStatistics(unittest.TestCase):
+    """Test cases for streaming, merging and persisting role statistics."""
+    
+    def setUp(self):
+        """Generate correlated random scores."""
+        self.temp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(3)
+        base = rng.integers(0, 20, size=(500, len(ROLE_CODES))).astype(float)
+        base[:, 1] = base[:, 0] + rng.integers(0, 3, size=500)
+        self.scores = base
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def assert_matches_numpy(self, stats, scores):
+        """Assert that statistics match a direct computation over all rows."""
+        self.assertEqual(stats.count, len(scores))
+        np.testing.assert_allclose(stats.mean, scores.mean(axis=0))
+        np.testing.assert_allclose(stats.covariance(), np.cov(scores, rowvar=False))
+        np.testing.assert_allclose(stats.correlation(), np.corrcoef(scores, rowvar=False))
+    
+    def test_chunked_updates(self):
+        """Test that uneven chunks give the same result as one pass."""
+        stats = RoleStatistics()
+        for start, stop in ((0, 1), (1, 40), (40, 41), (41, 500)):
+            stats.update(self.scores[start:stop])
+        self.assert_matches_numpy(stats, self.scores)
+        self.assertEqual(stats.top_pairs(1)[0][:2], ('PL', 'RI'))
+    
+    def test_merge_shards(self):
+        """Test that merging shard accumulators equals one accumulator."""
+        shards = [RoleStatistics().update(chunk) for chunk in np.array_split(self.scores, 7)]
+        merged = RoleStatistics()
+        for shard in shards:
+            merged.merge(shard)
+        self.assert_matches_numpy(merged, self.scores)
+        merged.merge(RoleStatistics())
+        self.assertEqual(merged.count, 500)
+    
+    def test_add_result_and_degenerate_cases(self):
+        """Test single results, empty statistics and constant roles."""
+        stats = RoleStatistics()
+        self.assertTrue(np.isnan(stats.covariance()).all())
+        stats.add_result({'PL': 4, 'RI': 2})
+        stats.add_result({'PL': 6, 'RI': 2})
+        self.assertEqual(stats.count, 2)
+        self.assertAlmostEqual(stats.covariance()[0, 0], 2.0)
+        self.assertTrue(np.isnan(stats.correlation()[0, 1]))
+        self.assertEqual(stats.top_pairs(), [])
+    
+    def test_save_and_load(self):
+        """Test that saved state round-trips exactly and keeps accumulating."""
+        path = os.path.join(self.temp_dir, 'stats', 'role_stats.json')
+        RoleStatistics().update(self.scores[:200]).save(path)
+        stats = RoleStatistics.load(path).update(self.scores[200:])
+        self.assert_matches_numpy(stats, self.scores)
+        self.assertEqual(RoleStatistics.load(os.path.join(self.temp_dir, 'missing.json')).count, 0)
+    
+    def test_refresh_and_cli(self):
+        """Test incremental refreshes from the database and the command line."""
+        db_path = os.path.join(self.temp_dir, 'results.db')
+        db_manager = DatabaseManager(db_path)
+        for row in self.scores[:100]:
+            db_manager.save_results("user", dict(zip(ROLE_CODES, row.astype(int).tolist())))
+        stats = RoleStatistics()
+        self.assertEqual(stats.refresh(db_manager, batch_size=30), 100)
+        for row in self.scores[100:150]:
+            db_manager.save_results("user", dict(zip(ROLE_CODES, row.astype(int).tolist())))
+        self.assertEqual(stats.refresh(db_manager, batch_size=30), 50)
+        self.assertEqual(stats.refresh(db_manager), 0)
+        self.assert_matches_numpy(stats, self.scores[:150])
+        
+        state = os.path.join(self.temp_dir, 'role_stats.json')
+        self.assertEqual(main([state, '--db', db_path]), 0)
+        self.assertEqual(RoleStatistics.load(state).count, 150)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Unit tests for stacked scoring schemes.
+"""
+
+import unittest
+import os
+import sys
+import random
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_processing import BelbinTest
+from utils.scoring import ScoringScheme, SchemeSet, encode_answers, normalize_points
+
+ROLE_CODES = list(BelbinTest.ROLES)
+
+
+def random_answers(rng):
+    """Spread up to 10 points per question over random options."""
+    answers = {}
+    for question_idx, question in enumerate(BelbinTest.QUESTIONS):
+        options = rng.sample(list(question['options']), rng.randint(1, 3))
+        answers[question_idx] = {option: rng.randint(0, 10 // len(options)) for option in options}
+    return answers
+
+
+class TestScoringSchemes(unittest.TestCase):
+    """Test cases for compiling and evaluating scoring schemes."""
+    
+    def setUp(self):
+        """Generate random answer sets."""
+        rng = random.Random(5)
+        self.answer_sets = [random_answers(rng) for _ in range(200)]
+        self.answer_sets.append({})
+    
+    def as_matrix(self, score_dicts):
+        """Convert score dictionaries to a matrix in ROLES order."""
+        return np.array([[scores[role] for role in ROLE_CODES] for scores in score_dicts], dtype=float)
+    
+    def test_raw_matches_calculate_scores(self):
+        """Test that the compiled default scheme reproduces calculate_scores."""
+        scores = SchemeSet([ScoringScheme.raw()]).score_answers(self.answer_sets)
+        self.assertEqual(scores.shape, (1, len(self.answer_sets), len(ROLE_CODES)))
+        expected = self.as_matrix(BelbinTest.calculate_scores(answers) for answers in self.answer_sets)
+        np.testing.assert_array_equal(scores[0], expected)
+    
+    def test_stacked_schemes(self):
+        """Test that every stacked scheme equals scoring it on its own."""
+        swapped = {0: {'a': 'PL', 'c': 'RI'}, 1: {'h': {'CF': 0.5, 'SP': 0.5}}, 2: {'b': 'CF'}}
+        schemes = [
+            ScoringScheme.raw(),
+            ScoringScheme.raw('weighted', weights=[2, 1, 0.5]),
+            ScoringScheme.raw('normalized', normalize=True),
+            ScoringScheme.from_mapping('alternative', swapped),
+        ]
+        stacked = SchemeSet(schemes).score_answers(self.answer_sets)
+        self.assertEqual(stacked.shape, (4, len(self.answer_sets), len(ROLE_CODES)))
+        for i, scheme in enumerate(schemes):
+            np.testing.assert_allclose(stacked[i], SchemeSet([scheme]).score_answers(self.answer_sets)[0])
+        
+        # Weighting only the first question doubles its contribution
+        first_only = [{0: answers[0]} for answers in self.answer_sets[:-1]]
+        expected = self.as_matrix(BelbinTest.calculate_scores(answers) for answers in first_only)
+        np.testing.assert_allclose(SchemeSet(schemes[1:2]).score_answers(first_only)[0], expected * 2)
+        
+        alternative = stacked[3]
+        sample = self.answer_sets[0]
+        self.assertEqual(alternative[0, ROLE_CODES.index('PL')], sample[0].get('a', 0))
+        self.assertEqual(alternative[0, ROLE_CODES.index('SP')], sample[1].get('h', 0) / 2)
+    
+    def test_normalization(self):
+        """Test that normalized questions each carry the full points budget."""
+        points = encode_answers([{0: {'a': 2, 'b': 2}, 1: {'c': 5}}, {}])
+        normalized = normalize_points(points)
+        self.assertEqual(normalized[0].sum(), 20)
+        self.assertEqual(normalized[0, 0], 5)
+        self.assertFalse(normalized[1].any())
+        
+        scores = SchemeSet([ScoringScheme.raw(normalize=True)]).evaluate(points)
+        self.assertEqual(scores[0, 0, ROLE_CODES.index('PL')], 10)
+        self.assertEqual(scores[0, 0, ROLE_CODES.index('RI')], 5)
+    
+    def test_dominant_agreement(self):
+        """Test top-role agreement between schemes."""
+        schemes = SchemeSet([ScoringScheme.raw(), ScoringScheme.raw('weighted', weights=[1, 1, 1.0001])])
+        agreement = schemes.dominant_agreement(schemes.score_answers(self.answer_sets))
+        self.assertEqual(agreement['raw'], 1.0)
+        self.assertGreater(agreement['weighted'], 0.9)
+    
+    def test_validation(self):
+        """Test errors for malformed schemes."""
+        with self.assertRaises(ValueError):
+            ScoringScheme.from_mapping('bad', {0: {'a': 'XX'}})
+        with self.assertRaises(ValueError):
+            ScoringScheme.raw(weights=[1, 2])
+        with self.assertRaises(ValueError):
+            SchemeSet([ScoringScheme.raw(), ScoringScheme.raw()])
+        with self.assertRaises(ValueError):
+            SchemeSet([ScoringScheme('small', np.zeros((3, 9)))])
+        with self.assertRaises(ValueError):
+            SchemeSet([])
+
+
+if __name__ == '__main__':
+    unittest.main()
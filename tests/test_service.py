@@ -0,0 +1,183 @@
+"""
+Unit tests for the HTTP scoring service.
+"""
+
+import unittest
+import tempfile
+import shutil
+import asyncio
+import random
+import sqlite3
+import json
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_processing import BelbinTest, DatabaseManager
+from utils.service import HttpError, ScoringService, parse_submission, random_submission, run_load
+
+
+async def request(port, method, path, payload=None, raw_body=None):
+    """Send one request on a new connection and return (status, headers, decoded body)."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = raw_body if raw_body is not None else (b'' if payload is None else json.dumps(payload).encode())
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n'
+                 f'Content-Length: {len(body)}\r\n\r\n'.encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    head, _, content = response.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, json.loads(content) if content else None
+
+
+class TestScoringService(unittest.TestCase):
+    """Test cases for submitting, batching and refusing scoring requests."""
+    
+    def setUp(self):
+        """Create a temporary database and valid submissions."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir, 'results.db'))
+        rng = random.Random(3)
+        self.submissions = [random_submission(rng, f"user{i}") for i in range(20)]
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def run_service(self, scenario, **options):
+        """Run a coroutine against a service started on a free port."""
+        async def main():
+            service = ScoringService(self.db_manager, **options)
+            _, port = await service.start('127.0.0.1', 0)
+            try:
+                return await scenario(service, port)
+            finally:
+                await service.close()
+        return asyncio.run(main())
+    
+    def test_score_and_save(self):
+        """Test that a submission is scored like calculate_scores and saved."""
+        submission = self.submissions[0]
+        answers = {int(key): value for key, value in submission['answers'].items()}
+        expected = BelbinTest.calculate_scores(answers)
+        
+        async def scenario(service, port):
+            return await request(port, 'POST', '/score', submission)
+        status, headers, result = self.run_service(scenario)
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Access-Control-Allow-Origin'], '*')
+        self.assertEqual(result['scores'], expected)
+        self.assertEqual(result['dominant_roles'], [role for role, _ in BelbinTest.get_dominant_roles(expected)])
+        saved = self.db_manager.get_user_results('user0')
+        self.assertEqual(len(saved), 1)
+        self.assertEqual(saved[0]['id'], result['id'])
+        self.assertEqual([saved[0][column] for column in DatabaseManager.SCORE_COLUMNS],
+                         [expected[role] for role in BelbinTest.ROLES])
+    
+    def test_batching(self):
+        """Test that concurrent submissions are saved in fewer, larger batches."""
+        async def scenario(service, port):
+            single = [request(port, 'POST', '/score', submission) for submission in self.submissions[:15]]
+            listed = request(port, 'POST', '/score', self.submissions[15:])
+            responses = await asyncio.gather(*single, listed)
+            _, _, health = await request(port, 'GET', '/health')
+            return responses, health
+        responses, health = self.run_service(scenario)
+        self.assertTrue(all(status == 200 for status, _, _ in responses))
+        self.assertEqual([r['username'] for r in responses[-1][2]], [f"user{i}" for i in range(15, 20)])
+        self.assertEqual(health['scored'], 20)
+        self.assertLess(health['batches'], 16)
+        self.assertEqual(self.db_manager.count_results(), 20)
+    
+    def test_backpressure(self):
+        """Test that a full queue refuses submissions with 503 and Retry-After."""
+        async def scenario(service, port):
+            # Hold the database so the queued submissions cannot be saved
+            lock = sqlite3.connect(self.db_manager.db_path)
+            lock.execute('BEGIN EXCLUSIVE')
+            first = asyncio.create_task(request(port, 'POST', '/score', self.submissions[:4]))
+            while service.queue.qsize() != 3:
+                await asyncio.sleep(0.01)
+            refused = await request(port, 'POST', '/score', self.submissions[4:6])
+            lock.rollback()
+            lock.close()
+            return refused, await first
+        (status, headers, body), (first_status, _, _) = self.run_service(scenario, max_batch=1, max_queue=4)
+        self.assertEqual(status, 503)
+        self.assertEqual(headers['Retry-After'], '1')
+        self.assertIn('try again', body['error'])
+        self.assertEqual(first_status, 200)
+        self.assertEqual(self.db_manager.count_results(), 4)
+    
+    def test_list_larger_than_queue(self):
+        """Test that a list that can never fit in the queue is refused with 413."""
+        async def scenario(service, port):
+            return await request(port, 'POST', '/score', self.submissions[:5])
+        status, headers, body = self.run_service(scenario, max_queue=4)
+        self.assertEqual(status, 413)
+        self.assertNotIn('Retry-After', headers)
+        self.assertIn('At most 4', body['error'])
+        self.assertEqual(self.db_manager.count_results(), 0)
+    
+    def test_slow_body_times_out(self):
+        """Test that a body that stops arriving is answered with 408."""
+        async def scenario(service, port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'POST /score HTTP/1.1\r\nHost: test\r\nContent-Length: 100\r\n\r\n{"username"')
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            await writer.wait_closed()
+            return response
+        response = self.run_service(scenario, idle_timeout=0.2)
+        self.assertTrue(response.startswith(b'HTTP/1.1 408 '))
+        self.assertIn(b'Connection: close', response)
+    
+    def test_invalid_requests(self):
+        """Test that bad submissions, paths and bodies get clear errors."""
+        submission = self.submissions[0]
+        async def scenario(service, port):
+            return [
+                await request(port, 'POST', '/score', raw_body=b'{not json'),
+                await request(port, 'POST', '/score', {**submission, 'username': ' '}),
+                await request(port, 'GET', '/score'),
+                await request(port, 'GET', '/missing'),
+                await request(port, 'POST', '/score', raw_body=b'x' * 2000),
+                await request(port, 'OPTIONS', '/score'),
+            ]
+        statuses = [status for status, _, _ in self.run_service(scenario, max_body=1000)]
+        self.assertEqual(statuses, [400, 400, 405, 404, 413, 204])
+        
+        answers = dict(submission['answers'])
+        bad_answers = {
+            'Answer all': {key: value for key, value in answers.items() if key != '0'},
+            'exactly 10 points': {**answers, '0': {'a': 9}},
+            'Unknown question': {**answers, '99': {'a': 10}},
+            'expected points': {**answers, '0': {'z': 10}},
+        }
+        for message, bad in bad_answers.items():
+            with self.assertRaisesRegex(HttpError, message):
+                parse_submission({'username': 'u', 'answers': bad})
+    
+    def test_keep_alive_and_load(self):
+        """Test the questions endpoint and the load generator over keep-alive connections."""
+        async def scenario(service, port):
+            questions = await request(port, 'GET', '/questions')
+            report = await run_load(f'http://127.0.0.1:{port}', concurrency=4, requests=40)
+            return questions, report
+        (status, _, questions), report = self.run_service(scenario)
+        self.assertEqual(status, 200)
+        self.assertEqual(len(questions['questions']), len(BelbinTest.QUESTIONS))
+        self.assertEqual((report.requests, report.errors, report.rejected), (40, 0, 0))
+        self.assertLessEqual(report.p50_ms, report.p99_ms)
+        self.assertGreater(report.requests_per_second, 0)
+        self.assertEqual(self.db_manager.count_results(), 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Unit tests for memory-mapped result snapshots.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_processing import BelbinTest, DatabaseManager
+from utils.snapshot import USER_INDEX_FILE, ResultSnapshot, refresh_snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test cases for building, refreshing and reading snapshots."""
+    
+    def setUp(self):
+        """Set up a test database and snapshot directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir, 'test_results.db'))
+        self.directory = os.path.join(self.temp_dir, 'snapshot')
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def save(self, count, offset=0):
+        """Save results whose scores depend on their position."""
+        for i in range(offset, offset + count):
+            scores = {role: i + j for j, role in enumerate(BelbinTest.ROLES)}
+            self.db_manager.save_results(f"user{i % 3}", scores)
+    
+    def test_matches_database(self):
+        """Test that snapshot columns match the database."""
+        self.save(10)
+        self.assertEqual(refresh_snapshot(self.db_manager, self.directory, batch_size=4), 10)
+        
+        snapshot = ResultSnapshot(self.directory)
+        ids, matrix = self.db_manager.get_score_matrix()
+        self.assertIsInstance(snapshot.scores, np.memmap)
+        np.testing.assert_array_equal(snapshot.ids, ids)
+        np.testing.assert_array_equal(snapshot.scores, matrix)
+        self.assertEqual(snapshot.usernames, ["user0", "user1", "user2"])
+        
+        rows = self.db_manager.get_all_results()
+        expected = np.array(sorted(r['timestamp'] for r in rows), dtype='datetime64[s]').astype(np.int64)
+        np.testing.assert_array_equal(np.sort(snapshot.timestamps), expected)
+    
+    def test_incremental_refresh(self):
+        """Test that a refresh only appends rows newer than the snapshot."""
+        self.save(5)
+        refresh_snapshot(self.db_manager, self.directory)
+        self.save(4, offset=5)
+        self.db_manager.save_results("newcomer", {'SP': 7})
+        
+        self.assertEqual(refresh_snapshot(self.db_manager, self.directory), 5)
+        self.assertEqual(refresh_snapshot(self.db_manager, self.directory), 0)
+        
+        snapshot = ResultSnapshot(self.directory)
+        self.assertEqual(len(snapshot), 10)
+        np.testing.assert_array_equal(snapshot.ids, np.arange(1, 11))
+        np.testing.assert_array_equal(snapshot.user_rows("user1"), [1, 4, 7])
+        self.assertEqual(snapshot.scores[snapshot.user_rows("newcomer")[0], -1], 7)
+        self.assertEqual(len(snapshot.user_rows("nobody")), 0)
+    
+    def test_interrupted_refresh_is_ignored(self):
+        """Test that bytes past the published row count are discarded."""
+        self.save(3)
+        refresh_snapshot(self.db_manager, self.directory)
+        with open(os.path.join(self.directory, 'ids.bin'), 'ab') as column:
+            column.write(b'\xff' * 8)
+        
+        self.save(1, offset=3)
+        refresh_snapshot(self.db_manager, self.directory)
+        np.testing.assert_array_equal(ResultSnapshot(self.directory).ids, [1, 2, 3, 4])
+    
+    def test_user_index(self):
+        """Test that the per-user row index matches a scan across incremental refreshes."""
+        rng = np.random.default_rng(4)
+        with self.db_manager.connect() as conn:
+            for batch in range(4):
+                # Later batches bring new users and more results for earlier ones
+                names = rng.integers(0, 10 * (batch + 1), size=300)
+                conn.executemany('INSERT INTO test_results (username) VALUES (?)',
+                                 [(f"user{n}",) for n in names])
+                conn.commit()
+                refresh_snapshot(self.db_manager, self.directory, batch_size=128)
+        
+        snapshot = ResultSnapshot(self.directory)
+        index = np.fromfile(os.path.join(self.directory, USER_INDEX_FILE), dtype='<i8')
+        self.assertEqual(index[0], len(snapshot.usernames))
+        self.assertEqual(index[len(snapshot.usernames) + 1], len(snapshot))
+        for code, username in enumerate(snapshot.usernames):
+            np.testing.assert_array_equal(snapshot.user_rows(username),
+                                          np.flatnonzero(np.asarray(snapshot.user_codes) == code))
+    
+    def test_user_index_behind_rows(self):
+        """Test lookups when the index is older than the rows, or missing."""
+        self.save(6)
+        refresh_snapshot(self.db_manager, self.directory)
+        index_path = os.path.join(self.directory, USER_INDEX_FILE)
+        with open(index_path, 'rb') as index:
+            stale = index.read()
+        self.save(4, offset=6)
+        self.db_manager.save_results("newcomer", {'SP': 7})
+        refresh_snapshot(self.db_manager, self.directory)
+        
+        # As if a reader opened the snapshot between publishing rows and the index
+        with open(index_path, 'wb') as index:
+            index.write(stale)
+        snapshot = ResultSnapshot(self.directory)
+        np.testing.assert_array_equal(snapshot.user_rows("user1"), [1, 4, 7])
+        np.testing.assert_array_equal(snapshot.user_rows("newcomer"), [10])
+        
+        os.remove(index_path)
+        np.testing.assert_array_equal(ResultSnapshot(self.directory).user_rows("user0"), [0, 3, 6, 9])
+        refresh_snapshot(self.db_manager, self.directory)
+        self.assertTrue(os.path.exists(index_path))
+    
+    def test_empty_and_rebuild(self):
+        """Test opening an empty snapshot and rebuilding after deletes."""
+        self.assertEqual(len(ResultSnapshot(self.directory)), 0)
+        self.save(4)
+        refresh_snapshot(self.db_manager, self.directory)
+        with self.db_manager.connect() as conn:
+            conn.execute('DELETE FROM test_results WHERE id <= 2')
+        
+        refresh_snapshot(self.db_manager, self.directory, rebuild=True)
+        np.testing.assert_array_equal(ResultSnapshot(self.directory).ids, [3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
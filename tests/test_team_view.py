@@ -0,0 +1,84 @@
+"""
+Unit tests for the team comparison view (rendered headlessly).
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from gui.team_view import TeamHeatmap, render_team_heatmap
+from utils.data_processing import BelbinTest, DatabaseManager
+
+
+class TestTeamHeatmap(unittest.TestCase):
+    """Test cases for TeamHeatmap and headless rendering."""
+    
+    def setUp(self):
+        """Create a large random team."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.usernames = [f"user{i:03d}" for i in range(500)]
+        self.scores = np.random.default_rng(0).integers(0, 20, size=(500, len(BelbinTest.ROLES)))
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_single_image_artist(self):
+        """Test that the heatmap is one image rather than per-cell patches."""
+        heatmap = TeamHeatmap(Figure(), self.usernames, self.scores)
+        self.assertEqual(len(heatmap.heat_ax.images), 1)
+        self.assertEqual(heatmap.image.get_array().shape, (500, 9))
+        self.assertLessEqual(len(heatmap.heat_ax.patches), 2)
+        np.testing.assert_allclose([bar.get_width() for bar in heatmap.bar_ax.patches],
+                                   self.scores.mean(axis=0))
+    
+    def test_hover_and_select_blit(self):
+        """Test hover and selection updates with a blitting canvas."""
+        figure = Figure()
+        canvas = FigureCanvasAgg(figure)
+        heatmap = TeamHeatmap(figure, self.usernames, self.scores)
+        heatmap.connect(canvas)
+        canvas.draw()
+        self.assertIsNotNone(heatmap.background)
+        
+        heatmap.hover(10)
+        self.assertTrue(heatmap.hover_box.get_visible())
+        self.assertEqual(heatmap.hover_box.get_y(), 9.5)
+        self.assertTrue(heatmap.info_text.get_text().startswith("user010"))
+        
+        heatmap.select(42)
+        np.testing.assert_array_equal(heatmap.selection_line.get_xdata(), self.scores[42])
+        heatmap.hover(None)
+        self.assertTrue(heatmap.info_text.get_text().startswith("user042"))
+    
+    def test_render_headless(self):
+        """Test exporting the team view to an image file."""
+        path = os.path.join(self.temp_dir, 'team.png')
+        render_team_heatmap(self.usernames, self.scores, path, dpi=50, selected="user007")
+        self.assertGreater(os.path.getsize(path), 0)
+    
+    def test_latest_scores(self):
+        """Test loading each user's most recent result for the team view."""
+        db_manager = DatabaseManager(os.path.join(self.temp_dir, 'team.db'))
+        db_manager.save_results("bob", {'PL': 1})
+        db_manager.save_results("alice", {'RI': 2})
+        db_manager.save_results("bob", {'PL': 3})
+        
+        usernames, scores = db_manager.get_latest_scores()
+        self.assertEqual(usernames, ["alice", "bob"])
+        self.assertEqual(scores[:, :2].tolist(), [[0, 2], [3, 0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
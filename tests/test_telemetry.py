@@ -0,0 +1,222 @@
+"""
+Unit tests for per-question timing telemetry.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+import tkinter as tk
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_processing import DatabaseManager
+from utils.telemetry import (SessionTimer, TelemetryWriter, latency_histogram, load_timings, main,
+                             question_stats)
+
+
+class FakeClock:
+    """A clock advanced by hand."""
+    
+    def __init__(self):
+        self.now = 100.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestSessionTimer(unittest.TestCase):
+    """Test cases for accumulating per-question timing."""
+    
+    def test_dwell_edits_and_back_navigation(self):
+        """Test that time after navigating back adds to the earlier question."""
+        clock = FakeClock()
+        timer = SessionTimer(3, clock)
+        timer.enter(0)
+        clock.now += 5
+        timer.edit()
+        timer.edit()
+        timer.enter(1)
+        clock.now += 2
+        timer.enter(1)
+        clock.now += 1
+        timer.enter(0)
+        clock.now += 4
+        timer.edit()
+        timer.enter(1)
+        clock.now += 0.5
+        timing = timer.finish(completed=False)
+        
+        np.testing.assert_array_equal(timing.dwell_ms, [9000, 3500, 0])
+        np.testing.assert_array_equal(timing.edits, [3, 0, 0])
+        np.testing.assert_array_equal(timing.visits, [2, 2, 0])
+        self.assertFalse(timing.completed)
+        self.assertEqual(len(b''.join(timing.to_row()[2:5])), 3 * (4 + 2 + 1))
+    
+    def test_saturation(self):
+        """Test that counters stop at their type's maximum instead of wrapping."""
+        timer = SessionTimer(1, FakeClock())
+        for _ in range(300):
+            timer.enter(0)
+            timer.leave()
+        self.assertEqual(timer.visits[0], 255)
+        timer.edit()
+        self.assertEqual(timer.edits[0], 0)
+
+
+class TestTelemetryStorage(unittest.TestCase):
+    """Test cases for batched writes and aggregate queries."""
+    
+    def setUp(self):
+        """Set up a test database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'results.db')
+        self.db_manager = DatabaseManager(self.db_path)
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def record_sessions(self, dwell, completed=True, batch_size=50, bank='builtin'):
+        """Write sessions with the given dwell milliseconds (rows) through a writer."""
+        writer = TelemetryWriter(self.db_manager, batch_size=batch_size, flush_interval=60)
+        for row in dwell:
+            clock = FakeClock()
+            timer = SessionTimer(len(row), clock, bank=bank)
+            for question, ms in enumerate(row):
+                if ms:
+                    timer.enter(question)
+                    clock.now += ms / 1000
+                    timer.edit()
+            writer.record(timer.finish(completed))
+        writer.close()
+        return writer
+    
+    def test_batched_writes(self):
+        """Test that sessions are written in batches and on flush."""
+        writer = TelemetryWriter(self.db_manager, batch_size=10, flush_interval=60)
+        timing = SessionTimer(3, FakeClock()).finish(True)
+        for _ in range(25):
+            writer.record(timing)
+        writer.flush()
+        self.assertEqual(writer.written, 25)
+        writer.close()
+        writer.close()
+        self.assertEqual(len(load_timings(self.db_manager)[0]), 25)
+    
+    def test_question_stats(self):
+        """Test per-question percentiles against numpy."""
+        rng = np.random.default_rng(1)
+        dwell = rng.integers(1000, 60000, size=(400, 3))
+        dwell[:50, 2] = 0
+        self.record_sessions(dwell, batch_size=64)
+        self.record_sessions(dwell[:20] * 10, completed=False)
+        
+        stats = question_stats(self.db_manager)
+        self.assertEqual([row.sessions for row in stats], [400, 400, 350])
+        for row in stats:
+            seconds = dwell[:, row.question][dwell[:, row.question] > 0] / 1000
+            self.assertAlmostEqual(row.median_seconds, np.median(seconds))
+            self.assertAlmostEqual(row.p90_seconds, np.percentile(seconds, 90))
+            self.assertAlmostEqual(row.mean_seconds, seconds.mean())
+            self.assertEqual((row.mean_edits, row.revisit_rate), (1.0, 0.0))
+        
+        self.assertEqual(question_stats(self.db_manager, completed_only=False)[0].sessions, 420)
+        self.assertEqual([row.sessions for row in question_stats(self.db_manager, questions=5)], [0] * 5)
+        
+        counts, edges = latency_histogram(self.db_manager, 0)
+        self.assertEqual(counts.sum(), 400)
+        self.assertEqual(edges[0], 1)
+    
+    def test_banks_are_kept_apart(self):
+        """Test that banks with the same question count are reported separately."""
+        self.record_sessions([[1000, 1000, 1000]] * 4)
+        self.record_sessions([[9000, 9000, 9000]] * 2, bank='de-1')
+        self.assertEqual(question_stats(self.db_manager)[0].median_seconds, 1.0)
+        self.assertEqual(len(load_timings(self.db_manager)[0]), 4)
+        
+        dwell, _, _ = load_timings(self.db_manager, bank='de-1')
+        np.testing.assert_array_equal(dwell, [[9000] * 3] * 2)
+        self.assertEqual(question_stats(self.db_manager, bank='de-1')[0].median_seconds, 9.0)
+        self.assertEqual(len(load_timings(self.db_manager, bank='fr-1')[0]), 0)
+    
+    def test_table_without_bank_column(self):
+        """Test that sessions stored before banks were recorded count as built-in ones."""
+        with self.db_manager.connect() as conn:
+            conn.execute('''
+                CREATE TABLE question_timings (
+                    id INTEGER PRIMARY KEY, recorded DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    questions INTEGER NOT NULL, completed INTEGER NOT NULL,
+                    dwell_ms BLOB NOT NULL, edits BLOB NOT NULL, visits BLOB NOT NULL
+                )
+            ''')
+            conn.execute('INSERT INTO question_timings (questions, completed, dwell_ms, edits, visits) '
+                         'VALUES (?, ?, ?, ?, ?)', SessionTimer(3).finish(True).to_row()[:5])
+        self.record_sessions([[1000, 1000, 1000]], bank='de-1')
+        self.assertEqual(len(load_timings(self.db_manager)[0]), 1)
+        self.assertEqual(len(load_timings(self.db_manager, bank='de-1')[0]), 1)
+    
+    def test_cli(self):
+        """Test the timing report command."""
+        self.record_sessions([[2000, 3000, 4000]])
+        self.record_sessions([[2000, 3000]], bank='xx-1')
+        self.assertEqual(main(['--db', self.db_path]), 0)
+        self.assertEqual(main(['--db', self.db_path, '--bank', 'xx-1']), 0)
+
+
+class TestGuiTiming(unittest.TestCase):
+    """Test that the GUI records a timing row per session (skipped without a display)."""
+    
+    def test_session_recorded(self):
+        """Test completed and abandoned sessions, including back-navigation."""
+        try:
+            root = tk.Tk()
+        except tk.TclError as e:
+            self.skipTest(f"no display available: {e}")
+        root.withdraw()
+        temp_dir = tempfile.mkdtemp()
+        try:
+            from gui.tkinter_interface import BelbinTestGUI
+            app = BelbinTestGUI(root, db_path=os.path.join(temp_dir, 'gui.db'))
+            app.telemetry.close()
+            app.telemetry = TelemetryWriter(app.db_manager, flush_interval=60)
+            
+            def fill():
+                for key, spinbox in app.option_spinboxes.items():
+                    spinbox.delete(0, tk.END)
+                    spinbox.insert(0, '10' if key == 'a' else '0')
+                app.points_edited()
+            
+            app.username_entry.insert(0, "timed_user")
+            app.start_test()
+            fill()
+            app.next_question()
+            fill()
+            app.previous_question()
+            app.next_question()
+            fill()
+            app.next_question()
+            fill()
+            app.next_question()
+            app.create_welcome_screen()
+            app.username_entry.insert(0, "abandoning_user")
+            app.start_test()
+            app.create_welcome_screen()
+            app.close()
+            
+            dwell, edits, visits = load_timings(app.db_manager, completed_only=False)
+            self.assertEqual(len(dwell), 2)
+            np.testing.assert_array_equal(visits[0], [2, 2, 1])
+            np.testing.assert_array_equal(edits[0], [1, 2, 1])
+            np.testing.assert_array_equal(visits[1], [1, 0, 0])
+        finally:
+            root.destroy()
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
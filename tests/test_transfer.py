@@ -0,0 +1,115 @@
+"""
+Unit tests for exporting and importing results.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+import sqlite3
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_processing import BelbinTest, DatabaseManager
+from utils.transfer import FIELDS, export_results, import_results, load_rows, main
+
+
+class TestTransfer(unittest.TestCase):
+    """Test cases for CSV and JSON lines export and import."""
+    
+    def setUp(self):
+        """Set up a source database with results for every role."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.source = DatabaseManager(os.path.join(self.temp_dir, 'source.db'))
+        for i in range(30):
+            scores = {role: (i + j) % 13 for j, role in enumerate(BelbinTest.ROLES)}
+            result_id = self.source.save_results(f"user{i % 4}, \"quoted\"", scores)
+            with self.source.connect() as conn:
+                conn.execute('UPDATE test_results SET timestamp = ? WHERE id = ?',
+                             (f"2024-02-{i % 28 + 1:02d} 12:{i:02d}:05", result_id))
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def path(self, name):
+        """Return a path in the temporary directory."""
+        return os.path.join(self.temp_dir, name)
+    
+    def rows(self, db_manager):
+        """Return all rows as comparable tuples."""
+        return [tuple(row[field] for field in FIELDS) for row in db_manager.iter_results()]
+    
+    def test_round_trip(self):
+        """Test that timestamps and all nine scores survive both formats."""
+        for fmt in ('csv', 'jsonl'):
+            with self.subTest(fmt=fmt):
+                self.assertEqual(export_results(self.source, self.path(f'out.{fmt}')), 30)
+                
+                target = DatabaseManager(self.path(f'target_{fmt}.db'))
+                self.assertEqual(import_results(target, self.path(f'out.{fmt}'), keep_ids=True), 30)
+                self.assertEqual(self.rows(target), self.rows(self.source))
+    
+    def test_import_assigns_new_ids(self):
+        """Test that importing without keep_ids appends after existing rows."""
+        export_results(self.source, self.path('out.jsonl'))
+        import_results(self.source, self.path('out.jsonl'), chunk_size=7)
+        
+        rows = self.rows(self.source)
+        self.assertEqual(len(rows), 60)
+        self.assertEqual([row[1:] for row in rows[30:]], [row[1:] for row in rows[:30]])
+    
+    def test_filtered_export(self):
+        """Test exporting one user's results within a date range."""
+        count = export_results(self.source, self.path('out.csv'), username='user1, "quoted"',
+                               since='2024-02-05', until='2024-02-20')
+        expected = [row for row in self.source.iter_results(username='user1, "quoted"')
+                    if '2024-02-05' <= row['timestamp'] < '2024-02-20']
+        self.assertEqual(count, len(expected))
+        self.assertGreater(count, 0)
+    
+    def index_names(self):
+        """Return the names of the secondary indexes in the source database."""
+        with self.source.connect() as conn:
+            return sorted(name for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"))
+    
+    def test_indexes_are_restored(self):
+        """Test that secondary indexes are rebuilt after an import."""
+        with self.source.connect() as conn:
+            conn.execute('CREATE INDEX idx_test_username ON test_results (username)')
+        
+        before = self.index_names()
+        self.assertIn('idx_test_username', before)
+        self.assertTrue(set(DatabaseManager.RESULT_INDEXES) <= set(before))
+        export_results(self.source, self.path('out.csv'))
+        import_results(self.source, self.path('out.csv'))
+        self.assertEqual(self.index_names(), before)
+    
+    def test_failed_chunk_is_rolled_back(self):
+        """Test that a chunk failing partway is discarded whole and indexes are restored."""
+        before = self.index_names()
+        rows = [{'username': f"new{i}"} for i in range(9)] + [{'username': None}]
+        with self.assertRaisesRegex(sqlite3.IntegrityError, 'NOT NULL'):
+            load_rows(self.source, rows, chunk_size=7)
+        # The first chunk was committed; the second stopped at its last row
+        self.assertEqual(self.source.count_results(), 37)
+        self.assertEqual(self.index_names(), before)
+    
+    def test_unknown_format(self):
+        """Test that unsupported file types are rejected."""
+        with self.assertRaises(ValueError):
+            export_results(self.source, self.path('out.xlsx'))
+    
+    def test_command_line(self):
+        """Test the export and import commands."""
+        target_db = self.path('cli.db')
+        main(['--db', self.source.db_path, 'export', self.path('cli.csv')])
+        main(['--db', target_db, 'import', self.path('cli.csv'), '--keep-ids'])
+        self.assertEqual(self.rows(DatabaseManager(target_db)), self.rows(self.source))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+"""
+Unit tests for per-user role trends.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+import csv
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_processing import BelbinTest, DatabaseManager
+from utils.transfer import load_rows
+from utils.trends import TrendCache, main
+
+ROLE_CODES = list(BelbinTest.ROLES)
+
+
+def reference_trend(history, shift_threshold=8.0, min_run=2):
+    """Compute trend measures for one history directly from its definitions."""
+    history = np.asarray(history, dtype=float)
+    n = len(history)
+    t = np.arange(n)
+    drift = np.polyfit(t, history, 1)[0] if n > 1 else np.zeros(len(ROLE_CODES))
+    volatility = np.sqrt((np.diff(history, axis=0) ** 2).mean(axis=0)) if n > 1 else np.zeros(len(ROLE_CODES))
+    stability = None
+    if n > 1:
+        correlations = [np.corrcoef(a, b)[0, 1] if a.std() and b.std() else 0.0
+                        for a, b in zip(history[:-1], history[1:])]
+        stability = float(np.mean(correlations))
+    change_points, run = [], [history[0]]
+    for i in range(1, n):
+        if len(run) >= min_run and np.abs(history[i] - np.mean(run, axis=0)).max() >= shift_threshold:
+            change_points.append(i)
+            run = [history[i]]
+        else:
+            run.append(history[i])
+    return drift, volatility, stability, change_points
+
+
+class TestTrendCache(unittest.TestCase):
+    """Test cases for trend computation, caching and incremental updates."""
+    
+    def setUp(self):
+        """Generate random histories for several users."""
+        self.temp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(7)
+        self.histories = {f"user{i}": rng.integers(0, 20, size=(rng.integers(1, 7), len(ROLE_CODES)))
+                          for i in range(30)}
+        # Interleave users the way results arrive
+        self.rows = [(username, scores) for position in range(7)
+                     for username, history in self.histories.items()
+                     for scores in history[position:position + 1]]
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def build(self, rows, cache=None):
+        """Apply rows to a cache."""
+        cache = TrendCache() if cache is None else cache
+        cache.add_results([username for username, _ in rows], [scores for _, scores in rows])
+        return cache
+    
+    def assert_matches_reference(self, cache):
+        """Assert that every user's trend matches the reference computation."""
+        for username, history in self.histories.items():
+            drift, volatility, stability, change_points = reference_trend(history)
+            trend = cache.trend(username)
+            self.assertEqual(trend.results, len(history))
+            np.testing.assert_allclose([trend.drift[c] for c in ROLE_CODES], drift, atol=1e-9)
+            np.testing.assert_allclose([trend.volatility[c] for c in ROLE_CODES], volatility, atol=1e-9)
+            if stability is None:
+                self.assertIsNone(trend.stability)
+            else:
+                self.assertAlmostEqual(trend.stability, stability)
+            self.assertEqual(trend.change_points, len(change_points))
+            self.assertEqual(trend.last_change, change_points[-1] if change_points else None)
+    
+    def test_matches_reference(self):
+        """Test that one batch gives the same trends as the definitions."""
+        self.assert_matches_reference(self.build(self.rows))
+    
+    def test_incremental_updates(self):
+        """Test that applying results in pieces equals applying them at once."""
+        cache = TrendCache()
+        for start in range(0, len(self.rows), 7):
+            self.build(self.rows[start:start + 7], cache)
+        self.assert_matches_reference(cache)
+        
+        whole = self.build(self.rows).report()
+        for key, values in cache.report().items():
+            if key == 'stability':
+                np.testing.assert_allclose(values, whole[key], equal_nan=True)
+            else:
+                np.testing.assert_array_equal(values, whole[key])
+    
+    def test_user_order_within_batch(self):
+        """Test that several results of one user in a batch keep their order."""
+        history = self.histories["user0"]
+        cache = self.build([("user0", scores) for scores in history])
+        self.assertEqual(cache.trend("user0").results, len(history))
+        np.testing.assert_array_equal(cache._state['last'][0], history[-1])
+    
+    def test_change_point(self):
+        """Test that a large shift after a stable run is flagged."""
+        stable = [[10, 5, 0, 0, 0, 0, 0, 0, 0]] * 3
+        shifted = [[0, 5, 10, 0, 0, 0, 0, 0, 0]] * 2
+        cache = self.build([("alice", scores) for scores in stable + shifted])
+        trend = cache.trend("alice")
+        self.assertEqual((trend.change_points, trend.last_change), (1, 3))
+        self.assertGreater(trend.drift['CO'], 0)
+        self.assertLess(trend.drift['PL'], 0)
+        self.assertEqual(trend.drift['RI'], 0)
+        self.assertIsNone(cache.trend("nobody"))
+    
+    def test_save_and_load(self):
+        """Test that a saved cache continues where it left off."""
+        path = os.path.join(self.temp_dir, 'trends.npz')
+        half = len(self.rows) // 2
+        self.build(self.rows[:half], TrendCache(path)).save()
+        cache = TrendCache(path)
+        self.build(self.rows[half:], cache)
+        self.assert_matches_reference(cache)
+        
+        with self.assertRaises(ValueError):
+            TrendCache(path, shift_threshold=3)
+        with self.assertRaisesRegex(ValueError, "No path"):
+            TrendCache().save()
+    
+    def test_refresh_from_database(self):
+        """Test refreshing from the database, incrementally and from scratch."""
+        db_manager = DatabaseManager(os.path.join(self.temp_dir, 'results.db'))
+        half = len(self.rows) // 2
+        for username, scores in self.rows[:half]:
+            db_manager.save_results(username, dict(zip(ROLE_CODES, scores.tolist())))
+        cache = TrendCache()
+        self.assertEqual(cache.refresh(db_manager, batch_size=10), half)
+        for username, scores in self.rows[half:]:
+            db_manager.save_results(username, dict(zip(ROLE_CODES, scores.tolist())))
+        self.assertEqual(cache.refresh(db_manager, batch_size=10), len(self.rows) - half)
+        self.assert_matches_reference(cache)
+        self.assertEqual(cache.refresh(db_manager), 0)
+        self.assertEqual(cache.refresh(db_manager, rebuild=True), len(self.rows))
+        self.assert_matches_reference(cache)
+    
+    def test_imported_results_in_timestamp_order(self):
+        """Test that results imported with older timestamps are replayed in timestamp order."""
+        db_manager = DatabaseManager(os.path.join(self.temp_dir, 'results.db'))
+        rows = [{'username': username, 'timestamp': f'2024-01-{position + 1:02d} 09:00:00',
+                 **dict(zip(DatabaseManager.SCORE_COLUMNS, scores.tolist()))}
+                for username, history in self.histories.items()
+                for position, scores in enumerate(history)]
+        late = [row for row in rows if row['timestamp'].startswith('2024-01-02')]
+        load_rows(db_manager, [row for row in reversed(rows) if row not in late])
+        cache = TrendCache()
+        self.assertEqual(cache.refresh(db_manager, batch_size=10), len(rows) - len(late))
+        self.assertEqual(load_rows(db_manager, late), len(late))
+        self.assertEqual(cache.refresh(db_manager, batch_size=10), len(late))
+        self.assert_matches_reference(cache)
+        
+        shuffled = [rows[i] for i in np.random.default_rng(1).permutation(len(rows))]
+        cache = TrendCache()
+        cache.add_results([row['username'] for row in shuffled],
+                          [[row[column] for column in DatabaseManager.SCORE_COLUMNS] for row in shuffled],
+                          timestamps=[row['timestamp'] for row in shuffled])
+        self.assert_matches_reference(cache)
+    
+    def test_cli(self):
+        """Test the command line entry point and CSV report."""
+        db_path = os.path.join(self.temp_dir, 'results.db')
+        db_manager = DatabaseManager(db_path)
+        for username, scores in self.rows:
+            db_manager.save_results(username, dict(zip(ROLE_CODES, scores.tolist())))
+        cache_path = os.path.join(self.temp_dir, 'trends.npz')
+        csv_path = os.path.join(self.temp_dir, 'trends.csv')
+        self.assertEqual(main([cache_path, '--db', db_path, '--csv', csv_path]), 0)
+        with open(csv_path, newline='') as report:
+            rows = list(csv.DictReader(report))
+        self.assertEqual(len(rows), len(self.histories))
+        self.assertEqual(int(rows[0]['results']), len(self.histories[rows[0]['username']]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+"""
+Backup module for Belbin Test application.
+Takes online backups of the results database while it is in use.
+
+Backups use the SQLite backup API, copying a few pages per step and sleeping
+between steps so writers are only ever held up for one short step. Each
+backup is checked with ``PRAGMA integrity_check`` before it replaces its
+temporary name, and the oldest generations are rotated out.
+
+Usage:
+    python -m utils.backup backups/ --db data/results.db --keep 7
+    python -m utils.backup --verify backups/results-20240101T120000.db
+"""
+
+import argparse
+import glob
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+from urllib.request import pathname2url
+
+from utils.data_processing import DatabaseManager
+
+
+@dataclass
+class BackupReport:
+    """Outcome of one backup run."""
+    path: str
+    pages: int
+    bytes: int
+    seconds: float
+    steps: int
+    # Longest step holding the source lock; writers wait at most about this long
+    max_step_seconds: float
+    # Times the copy started over because another connection changed the source
+    restarts: int
+    integrity: str
+    removed: List[str] = field(default_factory=list)
+    
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes / self.seconds if self.seconds else float('inf')
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def _stem(db_path: str) -> str:
+    return 'memory' if db_path == ':memory:' else os.path.splitext(os.path.basename(db_path))[0]
+
+
+def backup_path(directory: str, db_path: str, now: Optional[datetime] = None) -> str:
+    """Return a new, unused generation path for a backup of ``db_path``."""
+    stem = _stem(db_path)
+    name = f"{stem}-{(now or datetime.now()).strftime('%Y%m%dT%H%M%S')}"
+    path = os.path.join(directory, f'{name}.db')
+    counter = 1
+    while os.path.exists(path):
+        path = os.path.join(directory, f'{name}.{counter}.db')
+        counter += 1
+    return path
+
+
+def list_backups(directory: str, db_path: str) -> List[str]:
+    """Return the backup generations of ``db_path`` in a directory, oldest first."""
+    stem = _stem(db_path)
+    return sorted(glob.glob(os.path.join(glob.escape(directory), f'{glob.escape(stem)}-*.db')),
+                  key=lambda path: (os.path.getmtime(path), path))
+
+
+def verify_backup(path: str) -> str:
+    """Run ``PRAGMA integrity_check`` on a backup; returns 'ok' or the problems found."""
+    try:
+        conn = sqlite3.connect(f'file:{pathname2url(os.path.abspath(path))}?mode=ro', uri=True)
+        try:
+            return '\n'.join(row[0] for row in conn.execute('PRAGMA integrity_check'))
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError as e:
+        # Damage to the header or schema fails before the check can report it
+        return str(e)
+
+
+def backup_database(db_manager: DatabaseManager, directory: str, pages_per_step: int = 256,
+                    sleep: float = 0.01, keep: Optional[int] = 7, max_restarts: int = 3,
+                    verify: bool = True) -> BackupReport:
+    """Copy the live database into a new backup generation.
+    
+    ``pages_per_step`` pages are copied per step with ``sleep`` seconds
+    between steps. WAL databases are copied from one read snapshot, so
+    concurrent writes neither block nor disturb the copy. With a rollback
+    journal SQLite restarts the copy whenever another connection writes;
+    after ``max_restarts`` restarts the step size is doubled so a busy
+    database still finishes. In-memory databases are
+    copied in one step while holding their lock. The backup is verified
+    before it gets its final name, and only the newest ``keep`` generations
+    are kept. Raises ``sqlite3.DatabaseError`` if verification fails.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = backup_path(directory, db_manager.db_path)
+    partial = path + '.partial'
+    steps, restarts, max_step = 0, 0, 0.0
+    start = time.perf_counter()
+    
+    if db_manager.in_memory:
+        with db_manager.connect() as source:
+            target = sqlite3.connect(partial)
+            try:
+                step_start = time.perf_counter()
+                source.backup(target)
+                steps, max_step = 1, time.perf_counter() - step_start
+            finally:
+                target.close()
+    else:
+        # Setup waits out a writer's lock like any other connection
+        source = sqlite3.connect(db_manager.db_path, timeout=db_manager.busy_timeout)
+        try:
+            # In WAL mode an open read transaction pins a snapshot: writers carry on
+            # and the copy never restarts. With a rollback journal it would block
+            # writers, so each step takes its own short lock instead.
+            wal = source.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            if wal:
+                source.execute('BEGIN')
+                source.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+            # No busy wait inside a step: a locked source returns at once and is
+            # retried after ``sleep``, so step times measure only lock holding
+            source.execute('PRAGMA busy_timeout = 0')
+            while True:
+                state = {'last': time.perf_counter(), 'remaining': None, 'restarts': 0}
+                
+                def progress(status, remaining, total):
+                    nonlocal steps, max_step
+                    max_step = max(max_step, time.perf_counter() - state['last'])
+                    steps += 1
+                    if state['remaining'] is not None and remaining > state['remaining']:
+                        state['restarts'] += 1
+                        if pages_per_step > 0 and state['restarts'] > max_restarts:
+                            raise _TooManyRestarts()
+                    state['remaining'] = remaining
+                    # Between steps the source is unlocked, so pausing here lets writers in
+                    if remaining and sleep:
+                        time.sleep(sleep)
+                    state['last'] = time.perf_counter()
+                
+                target = sqlite3.connect(partial)
+                try:
+                    source.backup(target, pages=pages_per_step, progress=progress, sleep=sleep)
+                    restarts += state['restarts']
+                    break
+                except _TooManyRestarts:
+                    restarts += state['restarts']
+                    pages_per_step = pages_per_step * 2 if pages_per_step < 1 << 20 else -1
+                finally:
+                    target.close()
+            if wal:
+                source.rollback()
+        finally:
+            source.close()
+    seconds = time.perf_counter() - start
+    
+    integrity = verify_backup(partial) if verify else 'not checked'
+    if verify and integrity != 'ok':
+        os.remove(partial)
+        raise sqlite3.DatabaseError(f"Backup failed integrity check: {integrity}")
+    
+    conn = sqlite3.connect(partial)
+    try:
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    finally:
+        conn.close()
+    os.replace(partial, path)
+    
+    removed = []
+    if keep is not None:
+        generations = list_backups(directory, db_manager.db_path)
+        for old in generations[:max(0, len(generations) - keep)]:
+            os.remove(old)
+            removed.append(old)
+    
+    return BackupReport(path, page_count, page_count * page_size, seconds, steps,
+                        max_step, restarts, integrity, removed)
+
+
+def main(argv=None):
+    """Command line entry point for backing up and verifying databases."""
+    parser = argparse.ArgumentParser(description="Back up the Belbin results database while it is in use")
+    parser.add_argument('directory', nargs='?', default='backups', help="backup directory")
+    parser.add_argument('--db', default='data/results.db', help="database path")
+    parser.add_argument('--pages', type=int, default=256, help="pages copied per step (-1 for all at once)")
+    parser.add_argument('--sleep', type=float, default=0.01, help="seconds to pause between steps")
+    parser.add_argument('--keep', type=int, default=7, help="backup generations to keep")
+    parser.add_argument('--verify', metavar='BACKUP', help="only run an integrity check on a backup file")
+    args = parser.parse_args(argv)
+    
+    if args.verify:
+        result = verify_backup(args.verify)
+        print(f"{args.verify}: {result}")
+        return 0 if result == 'ok' else 1
+    
+    report = backup_database(DatabaseManager(args.db), args.directory, args.pages, args.sleep, args.keep)
+    print(f"Backed up {report.bytes / 1e6:.1f} MB to {report.path} in {report.seconds:.2f}s "
+          f"({report.bytes_per_sec / 1e6:.1f} MB/s, {report.steps} steps, {report.restarts} restarts)")
+    print(f"Longest step (maximum writer stall): {report.max_step_seconds * 1000:.1f} ms; "
+          f"integrity: {report.integrity}")
+    for path in report.removed:
+        print(f"Removed old backup {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
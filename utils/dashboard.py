@@ -0,0 +1,243 @@
+"""
+Dashboard module for Belbin Test application.
+Builds a static HTML site from the results database.
+
+The site has one page per user, a team index and one page per role. Builds
+are incremental: a manifest records a content hash of the rows behind every
+page, and only pages whose rows changed are rendered again. User pages are
+rendered in parallel worker processes.
+
+Usage:
+    python -m utils.dashboard site/ --db data/results.db
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utils.data_processing import BelbinTest, DatabaseManager
+
+MANIFEST_FILE = 'manifest.json'
+# Bump when page templates change so every page is regenerated
+TEMPLATE_VERSION = 1
+ROLE_CODES = list(BelbinTest.ROLES)
+
+STYLE = """
+body { font-family: Arial, sans-serif; margin: 2em auto; max-width: 960px; color: #222; }
+h1 { font-size: 1.6em; } h2 { font-size: 1.2em; margin-top: 1.5em; }
+table { border-collapse: collapse; width: 100%; font-size: 0.9em; }
+th, td { border-bottom: 1px solid #ddd; padding: 4px 8px; text-align: left; }
+nav a { margin-right: 1em; }
+"""
+
+
+def user_page_path(username: str) -> str:
+    """Relative path of a user's page; a hash suffix keeps similar names apart."""
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', username).strip('-').lower()[:40] or 'user'
+    digest = hashlib.sha1(username.encode('utf-8')).hexdigest()[:8]
+    return f'users/{slug}-{digest}.html'
+
+
+def content_hash(*parts) -> str:
+    """Hash the data behind a page together with the template version."""
+    return hashlib.sha1(repr((TEMPLATE_VERSION, parts)).encode('utf-8')).hexdigest()
+
+
+def svg_bar_chart(labels: Sequence[str], values: Sequence[float], width: int = 480,
+                  bar_height: int = 18, color: str = '#4c78a8') -> str:
+    """Return an inline SVG horizontal bar chart."""
+    label_width, gap = 170, 4
+    scale = (width - label_width - 40) / max(max(values, default=0), 1)
+    height = len(values) * (bar_height + gap)
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'font-family="Arial" font-size="12">']
+    for i, (label, value) in enumerate(zip(labels, values)):
+        y = i * (bar_height + gap)
+        parts.append(
+            f'<text x="{label_width - 6}" y="{y + bar_height - 5}" text-anchor="end">{html.escape(label)}</text>'
+            f'<rect x="{label_width}" y="{y}" width="{value * scale:.1f}" height="{bar_height}" fill="{color}"/>'
+            f'<text x="{label_width + value * scale + 4:.1f}" y="{y + bar_height - 5}">{value:g}</text>'
+        )
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def page(title: str, body: str, depth: int = 0) -> str:
+    """Wrap page content in the shared layout."""
+    root = '../' * depth
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+            f'<style>{STYLE}</style></head><body>'
+            f'<nav><a href="{root}index.html">Team</a>'
+            + ''.join(f'<a href="{root}roles/{code}.html">{code}</a>' for code in ROLE_CODES)
+            + f'</nav><h1>{html.escape(title)}</h1>{body}</body></html>')
+
+
+def render_user_page(username: str, rows: Sequence[Tuple]) -> str:
+    """Render a user's page from (id, timestamp, 9 scores) rows, oldest first."""
+    latest = rows[-1][2:]
+    top_roles = BelbinTest.get_dominant_roles(dict(zip(ROLE_CODES, latest)))
+    history = ''.join(
+        f'<tr><td>{html.escape(str(row[1]))}</td>' + ''.join(f'<td>{score}</td>' for score in row[2:]) + '</tr>'
+        for row in reversed(rows)
+    )
+    body = (
+        '<h2>Top roles</h2><ol>'
+        + ''.join(f'<li>{html.escape(BelbinTest.ROLES[role])}: {score} points</li>' for role, score in top_roles)
+        + '</ol><h2>Latest profile</h2>'
+        + svg_bar_chart([BelbinTest.ROLES[code] for code in ROLE_CODES], latest)
+        + f'<h2>History ({len(rows)} results)</h2><table><tr><th>Taken</th>'
+        + ''.join(f'<th>{code}</th>' for code in ROLE_CODES)
+        + f'</tr>{history}</table>'
+    )
+    return page(username, body, depth=1)
+
+
+def render_index(latest: Dict[str, Tuple]) -> str:
+    """Render the team index from each user's latest scores."""
+    dominant = {username: BelbinTest.get_dominant_roles(dict(zip(ROLE_CODES, scores)), 1)[0][0]
+                for username, scores in latest.items()}
+    counts = [sum(1 for role in dominant.values() if role == code) for code in ROLE_CODES]
+    rows = ''.join(
+        f'<tr><td><a href="{user_page_path(username)}">{html.escape(username)}</a></td>'
+        f'<td>{html.escape(BelbinTest.ROLES[dominant[username]])}</td></tr>'
+        for username in sorted(latest)
+    )
+    body = (
+        f'<p>{len(latest)} team members.</p><h2>Primary roles</h2>'
+        + svg_bar_chart([BelbinTest.ROLES[code] for code in ROLE_CODES], counts)
+        + f'<h2>Members</h2><table><tr><th>Name</th><th>Primary role</th></tr>{rows}</table>'
+    )
+    return page("Belbin Team Dashboard", body)
+
+
+def render_role_page(code: str, latest: Dict[str, Tuple]) -> str:
+    """Render the distribution of one role's score across users."""
+    index = ROLE_CODES.index(code)
+    values = [scores[index] for scores in latest.values()]
+    buckets = [0] * 10
+    top = max(values, default=0) or 1
+    for value in values:
+        buckets[min(9, value * 10 // (top + 1))] += 1
+    bucket_labels = [f'{i * (top + 1) / 10:.0f}-{(i + 1) * (top + 1) / 10:.0f}' for i in range(10)]
+    strongest = sorted(latest.items(), key=lambda item: item[1][index], reverse=True)[:50]
+    rows = ''.join(
+        f'<tr><td><a href="../{user_page_path(username)}">{html.escape(username)}</a></td>'
+        f'<td>{scores[index]}</td></tr>'
+        for username, scores in strongest
+    )
+    body = (
+        f'<h2>Score distribution</h2>{svg_bar_chart(bucket_labels, buckets, color="#f58518")}'
+        f'<h2>Strongest members</h2><table><tr><th>Name</th><th>Score</th></tr>{rows}</table>'
+    )
+    return page(BelbinTest.ROLES[code], body, depth=1)
+
+
+def write_page(output_dir: str, relative_path: str, content: str):
+    """Write a page atomically."""
+    path = os.path.join(output_dir, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as output:
+        output.write(content)
+    os.replace(path + '.tmp', path)
+
+
+def _render_user_batch(output_dir: str, batch: List[Tuple[str, List[Tuple]]]) -> int:
+    for username, rows in batch:
+        write_page(output_dir, user_page_path(username), render_user_page(username, rows))
+    return len(batch)
+
+
+def build_dashboard(db_manager: DatabaseManager, output_dir: str, workers: Optional[int] = None,
+                    batch_size: int = 500, force: bool = False) -> Dict[str, int]:
+    """Build or incrementally update the static dashboard site.
+    
+    Returns counts of rendered user pages, unchanged user pages, removed
+    user pages and rendered summary (index and role) pages.
+    """
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path, encoding='utf-8') as source:
+            manifest = json.load(source)
+    new_manifest = {}
+    
+    # One streaming pass: hash every user's rows and keep only the changed ones
+    query = (f'SELECT username, id, timestamp, {", ".join(DatabaseManager.SCORE_COLUMNS)} '
+             f'FROM test_results ORDER BY username, id')
+    latest, changed = {}, []
+    with db_manager.connect() as conn:
+        for username, group in groupby(conn.execute(query), key=lambda row: row[0]):
+            rows = [row[1:] for row in group]
+            path = user_page_path(username)
+            digest = content_hash(username, rows)
+            new_manifest[path] = digest
+            latest[username] = rows[-1][2:]
+            if manifest.get(path) != digest or not os.path.exists(os.path.join(output_dir, path)):
+                changed.append((username, rows))
+    
+    batches = [changed[i:i + batch_size] for i in range(0, len(changed), batch_size)]
+    if workers == 1 or len(batches) <= 1:
+        for batch in batches:
+            _render_user_batch(output_dir, batch)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_render_user_batch, [output_dir] * len(batches), batches))
+    
+    # Pages of users that no longer have results
+    removed = 0
+    for path in manifest:
+        if path.startswith('users/') and path not in new_manifest:
+            full_path = os.path.join(output_dir, path)
+            if os.path.exists(full_path):
+                os.remove(full_path)
+            removed += 1
+    
+    # Summary pages depend on every user's latest scores
+    summary_pages = {'index.html': lambda: render_index(latest)}
+    for code in ROLE_CODES:
+        summary_pages[f'roles/{code}.html'] = lambda code=code: render_role_page(code, latest)
+    summary_digest = content_hash(sorted(latest.items()))
+    summaries = 0
+    for path, render in summary_pages.items():
+        new_manifest[path] = summary_digest
+        if manifest.get(path) != summary_digest or not os.path.exists(os.path.join(output_dir, path)):
+            write_page(output_dir, path, render())
+            summaries += 1
+    
+    os.makedirs(output_dir, exist_ok=True)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as output:
+        json.dump(new_manifest, output)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    
+    return {
+        'rendered': len(changed),
+        'unchanged': len(latest) - len(changed),
+        'removed': removed,
+        'summary_pages': summaries,
+    }
+
+
+def main(argv=None):
+    """Command line entry point for building the dashboard."""
+    parser = argparse.ArgumentParser(description="Build the static Belbin results dashboard")
+    parser.add_argument('output', help="output directory")
+    parser.add_argument('--db', default='data/results.db', help="database path")
+    parser.add_argument('--workers', type=int, help="render processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="regenerate every page")
+    args = parser.parse_args(argv)
+    
+    stats = build_dashboard(DatabaseManager(args.db), args.output, args.workers, force=args.force)
+    print(f"Rendered {stats['rendered']} user pages ({stats['unchanged']} unchanged, "
+          f"{stats['removed']} removed) and {stats['summary_pages']} summary pages")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,8 +4,17 @@ Handles test questions, scoring logic, and database operations.
 """
 
 import sqlite3
+import atexit
 import os
-from typing import Dict, List, Tuple
+import random
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 
 class BelbinTest:
@@ -86,21 +95,403 @@ class BelbinTest:
         """Get the top N dominant roles."""
         sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
         return sorted_scores[:top_n]
+    
+    @classmethod
+    def rank_dominant_roles(cls, score_matrix, top_n: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the top N dominant roles for every row of an N x 9 score matrix.
+        
+        Columns follow ``ROLES`` order. Returns (role indexes, scores), each of
+        shape (rows, top_n). Ties are broken by role order, matching
+        ``get_dominant_roles``.
+        """
+        scores = np.asarray(score_matrix)
+        n_roles = len(cls.ROLES)
+        top_n = min(top_n, n_roles)
+        if scores.ndim != 2 or scores.shape[1] != n_roles:
+            raise ValueError(f"Expected a score matrix with {n_roles} columns, got shape {scores.shape}")
+        
+        if top_n <= n_roles // 2:
+            # Partial selection: argmax returns the first (lowest role index)
+            # maximum, so each pass picks the next role in tie-break order
+            work = scores.astype(np.float64 if scores.dtype.kind == 'f' else np.int64)
+            floor = -np.inf if work.dtype.kind == 'f' else np.iinfo(np.int64).min
+            rows = np.arange(len(work))
+            indexes = np.empty((len(work), top_n), dtype=np.intp)
+            for rank in range(top_n):
+                indexes[:, rank] = work.argmax(axis=1)
+                work[rows, indexes[:, rank]] = floor
+        else:
+            indexes = np.argsort(-scores, axis=1, kind='stable')[:, :top_n]
+        
+        return indexes, np.take_along_axis(scores, indexes, axis=1)
+
+
+class IncrementalScorer:
+    """Keeps role totals and a dominant-role ranking current as answers change.
+    
+    Setting an answer for a question first undoes any earlier answer to the
+    same question, so going back and changing points is handled naturally.
+    The ranking is kept ordered by adjacent swaps, breaking ties the same way
+    as ``BelbinTest.get_dominant_roles`` (role definition order).
+    """
+    
+    def __init__(self, test: type = BelbinTest):
+        self.test = test
+        self._role_index = {role: i for i, role in enumerate(test.ROLES)}
+        self.reset()
+    
+    @property
+    def answers(self) -> Dict[int, Dict[str, int]]:
+        """Answers currently applied, keyed by question index."""
+        return {idx: dict(answer) for idx, answer in self._answers.items()}
+    
+    def __len__(self) -> int:
+        """Number of questions currently answered."""
+        return len(self._answers)
+    
+    @property
+    def scores(self) -> Dict[str, int]:
+        """Current role totals, equal to ``calculate_scores(answers)``."""
+        return dict(self._scores)
+    
+    def set_answer(self, question_idx: int, question_answers: Dict[str, int]):
+        """Apply the answer to a question, replacing any earlier answer."""
+        self._apply(question_idx, self._answers.get(question_idx, {}), -1)
+        self._answers[question_idx] = dict(question_answers)
+        self._apply(question_idx, question_answers, 1)
+    
+    def clear_answer(self, question_idx: int):
+        """Undo the answer to a question, if any."""
+        self._apply(question_idx, self._answers.pop(question_idx, {}), -1)
+    
+    def reset(self):
+        """Clear all answers."""
+        self._scores = {role: 0 for role in self.test.ROLES}
+        self._order = list(self.test.ROLES)
+        self._position = dict(self._role_index)
+        self._answers = {}
+    
+    def get_dominant_roles(self, top_n: int = 3) -> List[Tuple[str, int]]:
+        """Get the top N dominant roles without re-sorting."""
+        return [(role, self._scores[role]) for role in self._order[:top_n]]
+    
+    def _apply(self, question_idx: int, question_answers: Dict[str, int], sign: int):
+        options = self.test.QUESTIONS[question_idx]['options']
+        for option, points in question_answers.items():
+            if option in options and points:
+                role = options[option][1]
+                self._scores[role] += sign * points
+                self._reposition(role)
+    
+    def _ranks_before(self, a: str, b: str) -> bool:
+        """Whether role a ranks ahead of role b."""
+        score_a, score_b = self._scores[a], self._scores[b]
+        return score_a > score_b or (score_a == score_b and self._role_index[a] < self._role_index[b])
+    
+    def _reposition(self, role: str):
+        order, position = self._order, self._position
+        i = position[role]
+        while i > 0 and self._ranks_before(role, order[i - 1]):
+            order[i] = order[i - 1]
+            position[order[i]] = i
+            i -= 1
+        while i < len(order) - 1 and self._ranks_before(order[i + 1], role):
+            order[i] = order[i + 1]
+            position[order[i]] = i
+            i += 1
+        order[i] = role
+        position[role] = i
+
+
+class UserResultsCache:
+    """Bounded LRU cache of per-user result histories.
+    
+    Entries are keyed by username. An optional TTL (in seconds) bounds how
+    stale an entry may get when another process writes to the same database.
+    """
+    
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Latest in-flight fill per username; invalidation revokes it
+        self._fills = {}
+        self._lock = threading.Lock()
+    
+    def get(self, username: str) -> Optional[List[Dict]]:
+        """Return a copy of the cached history, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None:
+                stored_at, rows = entry
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(username)
+                    self.hits += 1
+                    return [dict(row) for row in rows]
+                del self._entries[username]
+            self.misses += 1
+            return None
+    
+    def begin_fill(self, username: str) -> object:
+        """Start loading a user's history and return a token for ``put``."""
+        token = object()
+        with self._lock:
+            self._fills[username] = token
+        return token
+    
+    def cancel_fill(self, username: str, token: object):
+        """Abandon a fill started with ``begin_fill``."""
+        with self._lock:
+            if self._fills.get(username) is token:
+                del self._fills[username]
+    
+    def put(self, username: str, rows: List[Dict], token: Optional[object] = None):
+        """Store a history, evicting the least recently used entry if full.
+        
+        If ``token`` is given, the rows are only stored when that user was
+        not invalidated (and no newer fill started) since ``begin_fill``.
+        """
+        with self._lock:
+            if token is not None:
+                if self._fills.get(username) is not token:
+                    return
+                del self._fills[username]
+            if self.maxsize <= 0:
+                return
+            self._entries[username] = (time.monotonic(), [dict(row) for row in rows])
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, username: Optional[str] = None):
+        """Drop one user's entry, or every entry when no username is given."""
+        with self._lock:
+            if username is None:
+                self._entries.clear()
+                self._fills.clear()
+            else:
+                self._entries.pop(username, None)
+                self._fills.pop(username, None)
+    
+    def info(self) -> Dict[str, int]:
+        """Return cache size and hit/miss statistics."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
 
 
 class DatabaseManager:
     """Handles database operations for storing test results."""
     
-    def __init__(self, db_path: str = 'data/results.db'):
+    # Score columns in ROLES order
+    SCORE_COLUMNS = tuple(f"{role.lower()}_score" for role in BelbinTest.ROLES)
+    # Columns results can be paged by, in the order page_results returns them
+    RESULT_COLUMNS = ('id', 'username', 'timestamp') + SCORE_COLUMNS
+    # Secondary indexes init_database creates; bulk loads drop and rebuild
+    # only these, so an interrupted load loses nothing the next open restores
+    RESULT_INDEXES = {
+        # Keyset paging by username or time (rowid is the tie-breaker)
+        'idx_test_results_username': 'CREATE INDEX IF NOT EXISTS idx_test_results_username ON test_results(username)',
+        'idx_test_results_timestamp': 'CREATE INDEX IF NOT EXISTS idx_test_results_timestamp ON test_results(timestamp)',
+    }
+    
+    def __init__(self, db_path: str = 'data/results.db', cache_size: int = 0,
+                 cache_ttl: Optional[float] = None, multi_writer: bool = False,
+                 busy_timeout: float = 5.0, max_retries: int = 5,
+                 retry_backoff: float = 0.05, max_backoff: float = 1.0,
+                 checkpoint_pages: int = 1000, in_memory: bool = False,
+                 persist_interval: Optional[float] = 30.0, persist_changes: Optional[int] = 1000):
+        """Create a manager for the database at ``db_path``.
+        
+        With ``multi_writer`` enabled the database uses WAL journaling so
+        readers never block writers, and operations that still hit a lock
+        after ``busy_timeout`` seconds are retried up to ``max_retries`` times.
+        Retries sleep a jittered exponential backoff starting at
+        ``retry_backoff`` seconds and capped at ``max_backoff`` seconds.
+        ``checkpoint_pages`` sets the WAL auto-checkpoint threshold.
+        
+        With ``in_memory`` (implied by ``db_path=':memory:'``) all operations
+        share one in-memory connection. The file at ``db_path`` is loaded at
+        startup and written back with the backup API in the background every
+        ``persist_interval`` seconds or after ``persist_changes`` changed
+        rows, whichever comes first, and once more by ``close()``.
+        """
+        if multi_writer and (in_memory or db_path == ':memory:'):
+            raise ValueError("multi_writer cannot be combined with an in-memory database")
         self.db_path = db_path
-        self.init_database()
+        self.multi_writer = multi_writer
+        self.busy_timeout = busy_timeout
+        self.max_retries = max_retries if multi_writer else 0
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.checkpoint_pages = checkpoint_pages
+        # Per-user history cache; disabled unless cache_size > 0
+        self.cache = UserResultsCache(cache_size, cache_ttl) if cache_size > 0 else None
+        
+        self.in_memory = in_memory or db_path == ':memory:'
+        self.persist_interval = persist_interval
+        self.persist_changes = persist_changes
+        self._memory_conn = None
+        if self.in_memory:
+            self._open_memory()
+        self.run_with_retry(self.init_database)
+    
+    def _open_memory(self):
+        # One connection shared by all threads; the lock serialises its use
+        self._memory_conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self._memory_lock = threading.RLock()
+        self._persist_path = None if self.db_path == ':memory:' else self.db_path
+        self._persisted_changes = 0
+        self._closed = False
+        if self._persist_path is None:
+            return
+        
+        if os.path.exists(self._persist_path):
+            source = sqlite3.connect(self._persist_path)
+            try:
+                source.backup(self._memory_conn)
+            finally:
+                source.close()
+        self._persisted_changes = self._memory_conn.total_changes
+        
+        self._persist_wanted = threading.Event()
+        self._persist_thread = threading.Thread(target=self._persist_loop, daemon=True)
+        self._persist_thread.start()
+        _open_memory_databases.add(self)
+    
+    @property
+    def dirty_changes(self) -> int:
+        """Rows changed in memory since the last persist (0 for file databases)."""
+        if self._memory_conn is None:
+            return 0
+        return self._memory_conn.total_changes - self._persisted_changes
+    
+    def _persist_loop(self):
+        while not self._closed:
+            self._persist_wanted.wait(self.persist_interval)
+            self._persist_wanted.clear()
+            if not self._closed and self.dirty_changes:
+                self.persist()
+    
+    def persist(self) -> int:
+        """Write an in-memory database to its file; returns the changes written.
+        
+        The backup goes to a temporary file that then replaces ``db_path``,
+        so the file on disk is always a complete snapshot.
+        """
+        if self._memory_conn is None or self._persist_path is None:
+            return 0
+        directory = os.path.dirname(self._persist_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self._persist_path + '.tmp'
+        
+        with self._memory_lock:
+            changes = self._memory_conn.total_changes
+            target = sqlite3.connect(temp_path)
+            try:
+                self._memory_conn.backup(target)
+            finally:
+                target.close()
+            os.replace(temp_path, self._persist_path)
+            # WAL files left by an earlier file-backed run belong to the replaced database
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(self._persist_path + suffix):
+                    os.remove(self._persist_path + suffix)
+            written = changes - self._persisted_changes
+            self._persisted_changes = changes
+        return written
+    
+    def close(self):
+        """Stop background persistence, flush an in-memory database and release it."""
+        if self._memory_conn is None or self._closed:
+            return
+        self._closed = True
+        if self._persist_path is not None:
+            self._persist_wanted.set()
+            self._persist_thread.join()
+            self.persist()
+            _open_memory_databases.discard(self)
+        with self._memory_lock:
+            self._memory_conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    @contextmanager
+    def connect(self):
+        """Open a configured connection, committing on success and always closing it.
+        
+        In-memory databases hand out the shared connection, locked for the block.
+        """
+        if self._memory_conn is not None:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+            with self._memory_lock:
+                with self._memory_conn:
+                    yield self._memory_conn
+                if (self._persist_path is not None and self.persist_changes
+                        and self.dirty_changes >= self.persist_changes):
+                    self._persist_wanted.set()
+            return
+        
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout)
+        try:
+            if self.multi_writer:
+                conn.execute('PRAGMA synchronous=NORMAL')
+                conn.execute(f'PRAGMA wal_autocheckpoint={int(self.checkpoint_pages)}')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def run_with_retry(self, operation, *args, **kwargs):
+        """Run a database operation, retrying while the database is locked.
+        
+        Total time spent sleeping is at most ``max_retries * max_backoff``.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return operation(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                message = str(e)
+                if attempt == self.max_retries or ('locked' not in message and 'busy' not in message):
+                    raise
+                delay = min(self.max_backoff, self.retry_backoff * 2 ** attempt)
+                time.sleep(random.uniform(0, delay))
+    
+    def checkpoint(self, mode: str = 'PASSIVE') -> Tuple[int, int, int]:
+        """Checkpoint the WAL into the main database file.
+        
+        Returns (busy, wal pages, checkpointed pages) as reported by SQLite.
+        ``TRUNCATE`` also resets the WAL file to zero bytes.
+        """
+        if mode.upper() not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+            raise ValueError(f"Unknown checkpoint mode: {mode}")
+        with self.connect() as conn:
+            return tuple(conn.execute(f'PRAGMA wal_checkpoint({mode.upper()})').fetchone())
     
     def init_database(self):
         """Initialize the database and create tables if they don't exist."""
         # Ensure data directory exists
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        directory = os.path.dirname(self.db_path)
+        if directory and self._memory_conn is None:
+            os.makedirs(directory, exist_ok=True)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connect() as conn:
+            # Only takes effect for a new database; see enable_incremental_vacuum
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            if self.multi_writer:
+                conn.execute('PRAGMA journal_mode=WAL')
             cursor = conn.cursor()
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS test_results (
@@ -118,11 +509,41 @@ class DatabaseManager:
                     sp_score INTEGER DEFAULT 0
                 )
             ''')
+            for sql in self.RESULT_INDEXES.values():
+                cursor.execute(sql)
             conn.commit()
     
     def save_results(self, username: str, scores: Dict[str, int]) -> int:
         """Save test results to database."""
-        with sqlite3.connect(self.db_path) as conn:
+        result_id = self.run_with_retry(self._insert_results, username, scores)
+        
+        if self.cache is not None:
+            self.cache.invalidate(username)
+        return result_id
+    
+    def save_many(self, results: Sequence[Tuple[str, Dict[str, int]]]) -> List[int]:
+        """Save several (username, scores) results in one transaction and return their ids."""
+        ids = self.run_with_retry(self._insert_many, results)
+        
+        if self.cache is not None:
+            for username in {username for username, _ in results}:
+                self.cache.invalidate(username)
+        return ids
+    
+    def _insert_many(self, results: Sequence[Tuple[str, Dict[str, int]]]) -> List[int]:
+        insert = (f'INSERT INTO test_results (username, {", ".join(self.SCORE_COLUMNS)}) '
+                  f'VALUES ({", ".join("?" * (len(self.SCORE_COLUMNS) + 1))})')
+        with self.connect() as conn:
+            cursor = conn.cursor()
+            ids = []
+            for username, scores in results:
+                cursor.execute(insert, (username, *(scores.get(role, 0) for role in BelbinTest.ROLES)))
+                ids.append(cursor.lastrowid)
+            conn.commit()
+            return ids
+    
+    def _insert_results(self, username: str, scores: Dict[str, int]) -> int:
+        with self.connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO test_results 
@@ -146,21 +567,198 @@ class DatabaseManager:
     
     def get_user_results(self, username: str) -> List[Dict]:
         """Get all results for a specific user."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM test_results WHERE username = ? 
-                ORDER BY timestamp DESC
-            ''', (username,))
-            
-            columns = [desc[0] for desc in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        token = None
+        if self.cache is not None:
+            cached = self.cache.get(username)
+            if cached is not None:
+                return cached
+            token = self.cache.begin_fill(username)
+        
+        try:
+            results = self.run_with_retry(
+                self.select_rows,
+                'SELECT * FROM test_results WHERE username = ? ORDER BY timestamp DESC',
+                (username,)
+            )
+        except Exception:
+            if token is not None:
+                self.cache.cancel_fill(username, token)
+            raise
+        
+        if self.cache is not None:
+            self.cache.put(username, results, token)
+        return results
+    
+    def get_score_matrix(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get result ids and an N x 9 score matrix (columns in ROLES order)."""
+        rows = self.run_with_retry(self.fetch_all,
+                                   f'SELECT id, {", ".join(self.SCORE_COLUMNS)} FROM test_results ORDER BY id')
+        rows = np.array(rows, dtype=np.int64).reshape(-1, len(self.SCORE_COLUMNS) + 1)
+        return rows[:, 0], rows[:, 1:]
+    
+    def get_latest_scores(self) -> Tuple[List[str], np.ndarray]:
+        """Get each user's most recent scores as usernames and an N x 9 matrix."""
+        rows = self.run_with_retry(self.fetch_all, f'''
+            SELECT username, {", ".join(self.SCORE_COLUMNS)} FROM test_results
+            WHERE id IN (SELECT MAX(id) FROM test_results GROUP BY username)
+            ORDER BY username
+        ''')
+        usernames = [row[0] for row in rows]
+        matrix = np.array([row[1:] for row in rows], dtype=np.int64).reshape(-1, len(self.SCORE_COLUMNS))
+        return usernames, matrix
+    
+    def cache_info(self) -> Optional[Dict[str, int]]:
+        """Return user results cache statistics, or None if caching is off."""
+        return self.cache.info() if self.cache is not None else None
     
     def get_all_results(self) -> List[Dict]:
         """Get all test results."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM test_results ORDER BY timestamp DESC')
+        return self.run_with_retry(self.select_rows, 'SELECT * FROM test_results ORDER BY timestamp DESC')
+    
+    @staticmethod
+    def result_filters(username: Optional[str] = None, since: Optional[str] = None,
+                       until: Optional[str] = None, prefix: Optional[str] = None) -> Tuple[List[str], List]:
+        """Build WHERE conditions and parameters for the common result filters.
+        
+        ``since`` is inclusive and ``until`` exclusive; both are timestamps in
+        the stored ``YYYY-MM-DD HH:MM:SS`` form (a date prefix also works).
+        ``prefix`` matches usernames starting with it (case-sensitive), as an
+        index range rather than a LIKE scan.
+        """
+        conditions, params = [], []
+        if username is not None:
+            conditions.append('username = ?')
+            params.append(username)
+        if prefix:
+            # The range ends at the prefix with its last character incremented.
+            # Trailing U+10FFFF cannot be incremented and is dropped first, and
+            # surrogates cannot be stored, so U+D7FF is followed by U+E000
+            stem = prefix.rstrip(chr(0x10FFFF))
+            if stem:
+                code = ord(stem[-1]) + 1
+                conditions.append('username >= ? AND username < ?')
+                params.extend([prefix, stem[:-1] + chr(0xE000 if 0xD800 <= code <= 0xDFFF else code)])
+            else:
+                conditions.append('username >= ?')
+                params.append(prefix)
+        if since is not None:
+            conditions.append('timestamp >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('timestamp < ?')
+            params.append(until)
+        return conditions, params
+    
+    def iter_results(self, username: Optional[str] = None, since: Optional[str] = None,
+                     until: Optional[str] = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """Iterate over results in id order, optionally filtered, in constant memory.
+        
+        Rows are fetched in pages with keyset queries (``id > last id``), so
+        no connection or lock is held between pages.
+        """
+        conditions, params = self.result_filters(username, since, until)
+        last_id = 0
+        while True:
+            where = ' AND '.join(['id > ?'] + conditions)
+            page = self.run_with_retry(
+                self.select_rows,
+                f'SELECT * FROM test_results WHERE {where} ORDER BY id LIMIT ?',
+                (last_id, *params, batch_size)
+            )
+            yield from page
+            if len(page) < batch_size:
+                return
+            last_id = page[-1]['id']
+    
+    def page_results(self, prefix: Optional[str] = None, order_by: str = 'id', descending: bool = False,
+                     after: Optional[Tuple] = None, limit: int = 200) -> List[Tuple]:
+        """Get one page of results as tuples of ``RESULT_COLUMNS``.
+        
+        Rows are ordered by ``order_by`` with the id as tie-breaker. ``after``
+        is the (``order_by`` value, id) key of the last row of the previous
+        page, so each page is a keyset query that costs the same however
+        deep into the results it is. To page backwards, pass the first
+        row's key with ``descending`` flipped and reverse the rows.
+        """
+        if order_by not in self.RESULT_COLUMNS:
+            raise ValueError(f"Cannot order results by {order_by!r}")
+        conditions, params = self.result_filters(prefix=prefix)
+        if after is not None:
+            if order_by == 'id':
+                conditions.append(f'id {"<" if descending else ">"} ?')
+                params.append(after[-1])
+            else:
+                conditions.append(f'({order_by}, id) {"<" if descending else ">"} (?, ?)')
+                params.extend(after)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        direction = 'DESC' if descending else 'ASC'
+        order = 'id' if order_by == 'id' else f'{order_by} {direction}, id'
+        return self.run_with_retry(
+            self.fetch_all,
+            f'SELECT {", ".join(self.RESULT_COLUMNS)} FROM test_results {where} '
+            f'ORDER BY {order} {direction} LIMIT ?',
+            (*params, limit)
+        )
+    
+    def count_results(self, prefix: Optional[str] = None) -> int:
+        """Count results, optionally only those whose username starts with ``prefix``."""
+        conditions, params = self.result_filters(prefix=prefix)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        return self.run_with_retry(self.fetch_all, f'SELECT COUNT(*) FROM test_results {where}', tuple(params))[0][0]
+    
+    def incremental_vacuum(self, step_pages: int = 64, max_steps: Optional[int] = None,
+                           pause: float = 0.0) -> int:
+        """Return free pages to the filesystem in small steps.
+        
+        Each step is its own short transaction, so writers are only ever
+        blocked for one step. Returns the number of pages reclaimed.
+        """
+        reclaimed, steps = 0, 0
+        while max_steps is None or steps < max_steps:
+            def step():
+                with self.connect() as conn:
+                    before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+                    if before:
+                        conn.execute(f'PRAGMA incremental_vacuum({int(step_pages)})').fetchall()
+                    return before - conn.execute('PRAGMA freelist_count').fetchone()[0], before
             
+            freed, before = self.run_with_retry(step)
+            reclaimed += freed
+            steps += 1
+            if not freed or freed == before:
+                break
+            if pause:
+                time.sleep(pause)
+        return reclaimed
+    
+    def enable_incremental_vacuum(self):
+        """Switch an existing database to incremental auto-vacuum.
+        
+        Requires a one-off full VACUUM, which locks the database while it runs.
+        """
+        with self.connect() as conn:
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+                conn.execute('VACUUM')
+    
+    def fetch_all(self, query: str, params: Tuple = ()) -> List[Tuple]:
+        """Run a query against the database and return rows as tuples."""
+        with self.connect() as conn:
+            return conn.execute(query, params).fetchall()
+    
+    def select_rows(self, query: str, params: Tuple = ()) -> List[Dict]:
+        """Run a query against the database and return rows as dictionaries."""
+        with self.connect() as conn:
+            cursor = conn.execute(query, params)
             columns = [desc[0] for desc in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
\ No newline at end of file
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+# In-memory databases with a file to persist to; flushed at interpreter exit
+_open_memory_databases = weakref.WeakSet()
+
+
+@atexit.register
+def _persist_open_databases():
+    for db_manager in list(_open_memory_databases):
+        db_manager.close()
@@ -0,0 +1,232 @@
+"""
+Name search module for Belbin Test application.
+Indexes distinct usernames for prefix and fuzzy (misspelled name) lookup.
+
+The index lives in the results database: a ``usernames`` table with one row
+per distinct name and its result count, an expression index on
+``lower(name)`` for case-insensitive prefix ranges, and an FTS5 trigram
+table over the names for fuzzy candidates. Triggers on ``test_results``
+keep both current, so every ``save_results``, import or retention purge
+updates the index in the same transaction.
+
+The index is installed explicitly, once per database, with
+``NameIndex.install`` or ``python -m utils.name_search --install``; opening
+a ``NameIndex`` never changes the schema.
+
+Fuzzy lookup fetches the names sharing the most trigrams with the query
+(ranked by FTS5's bm25) and re-ranks that short list by edit similarity.
+
+Usage:
+    python -m utils.name_search --install --db data/results.db
+    python -m utils.name_search "Jon Smiht" --db data/results.db
+"""
+
+import argparse
+import difflib
+import sys
+from dataclasses import dataclass
+from typing import List, Optional
+
+from utils.data_processing import DatabaseManager
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS usernames (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        results INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_usernames_lower ON usernames(lower(name));
+    CREATE VIRTUAL TABLE IF NOT EXISTS usernames_fts USING fts5(
+        name, content='usernames', content_rowid='id', tokenize='trigram'
+    );
+'''
+
+TRIGGERS = '''
+    CREATE TRIGGER IF NOT EXISTS usernames_result_insert AFTER INSERT ON test_results BEGIN
+        INSERT INTO usernames (name, results) VALUES (NEW.username, 1)
+            ON CONFLICT (name) DO UPDATE SET results = results + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS usernames_result_delete AFTER DELETE ON test_results BEGIN
+        UPDATE usernames SET results = results - 1 WHERE name = OLD.username;
+        DELETE FROM usernames WHERE name = OLD.username AND results <= 0;
+    END;
+    CREATE TRIGGER IF NOT EXISTS usernames_result_rename AFTER UPDATE OF username ON test_results
+    WHEN OLD.username IS NOT NEW.username BEGIN
+        UPDATE usernames SET results = results - 1 WHERE name = OLD.username;
+        DELETE FROM usernames WHERE name = OLD.username AND results <= 0;
+        INSERT INTO usernames (name, results) VALUES (NEW.username, 1)
+            ON CONFLICT (name) DO UPDATE SET results = results + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS usernames_fts_insert AFTER INSERT ON usernames BEGIN
+        INSERT INTO usernames_fts (rowid, name) VALUES (NEW.id, NEW.name);
+    END;
+    CREATE TRIGGER IF NOT EXISTS usernames_fts_delete AFTER DELETE ON usernames BEGIN
+        INSERT INTO usernames_fts (usernames_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+    END;
+'''
+
+# Sorts after any other character, closing a prefix range
+_MAX_CHAR = chr(0x10FFFF)
+
+
+@dataclass
+class NameMatch:
+    """A username found by a search, with its similarity and result count."""
+    name: str
+    score: float
+    results: int
+
+
+class NameIndex:
+    """Prefix and fuzzy username lookup backed by tables in the results database.
+    
+    Raises ValueError if the index has not been installed in the database.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+        if not self.installed(db_manager):
+            raise ValueError(f"No name index in {db_manager.db_path}; "
+                             f"install it with python -m utils.name_search --install")
+    
+    @staticmethod
+    def installed(db_manager: DatabaseManager) -> bool:
+        """Return True if the name index tables exist in the database."""
+        return bool(db_manager.run_with_retry(
+            db_manager.fetch_all, "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'usernames'"))
+    
+    @classmethod
+    def install(cls, db_manager: DatabaseManager) -> 'NameIndex':
+        """Create the index tables and triggers, fill them from existing results and open the index.
+        
+        Does nothing to a database that already has the index.
+        """
+        db_manager.run_with_retry(cls._install, db_manager)
+        return cls(db_manager)
+    
+    @classmethod
+    def _install(cls, db_manager: DatabaseManager):
+        with db_manager.connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'usernames'"
+            ).fetchone()
+            if exists:
+                conn.rollback()
+                return
+            try:
+                for statement in SCHEMA.split(';'):
+                    if statement.strip():
+                        conn.execute(statement)
+                cls._fill(conn)
+                for statement in TRIGGERS.split('END;'):
+                    if statement.strip():
+                        conn.execute(statement + 'END;')
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    
+    @staticmethod
+    def _fill(conn):
+        conn.execute('DELETE FROM usernames')
+        conn.execute('INSERT INTO usernames (name, results) '
+                     'SELECT username, COUNT(*) FROM test_results GROUP BY username')
+        conn.execute("INSERT INTO usernames_fts (usernames_fts) VALUES ('rebuild')")
+    
+    def rebuild(self):
+        """Rebuild the index from ``test_results``, e.g. after editing the database by hand."""
+        def rebuild():
+            with self.db_manager.connect() as conn:
+                self._fill(conn)
+                conn.commit()
+        
+        self.db_manager.run_with_retry(rebuild)
+    
+    def __len__(self) -> int:
+        return self.db_manager.run_with_retry(self.db_manager.fetch_all, 'SELECT COUNT(*) FROM usernames')[0][0]
+    
+    def prefix(self, text: str, limit: int = 20) -> List[NameMatch]:
+        """Return names starting with ``text`` (case-insensitive), in name order."""
+        text = text.strip()
+        rows = self.db_manager.run_with_retry(
+            self.db_manager.fetch_all,
+            'SELECT name, results FROM usernames '
+            'WHERE lower(name) >= lower(?) AND lower(name) < lower(?) '
+            'ORDER BY lower(name) LIMIT ?',
+            (text, text + _MAX_CHAR, limit)
+        )
+        return [NameMatch(name, 1.0, results) for name, results in rows]
+    
+    def fuzzy(self, text: str, limit: int = 10, candidates: int = 200,
+              min_score: float = 0.5) -> List[NameMatch]:
+        """Return the names most similar to ``text``, best first.
+        
+        Queries shorter than three characters have no trigrams and fall back
+        to prefix lookup. Scores are ``difflib`` similarity ratios of the
+        lowercased names, from 0 to 1.
+        """
+        query = text.strip().lower()
+        trigrams = sorted({query[i:i + 3] for i in range(len(query) - 2)})
+        if not trigrams:
+            return self.prefix(text, limit)
+        match = ' OR '.join('"' + trigram.replace('"', '""') + '"' for trigram in trigrams)
+        rows = self.db_manager.run_with_retry(
+            self.db_manager.fetch_all,
+            'SELECT usernames.name, usernames.results FROM usernames_fts '
+            'JOIN usernames ON usernames.id = usernames_fts.rowid '
+            'WHERE usernames_fts MATCH ? ORDER BY rank LIMIT ?',
+            (match, candidates)
+        )
+        matcher = difflib.SequenceMatcher(b=query, autojunk=False)
+        matches = []
+        for name, results in rows:
+            matcher.set_seq1(name.lower())
+            score = matcher.ratio()
+            if score >= min_score:
+                matches.append(NameMatch(name, score, results))
+        matches.sort(key=lambda match: (-match.score, match.name))
+        return matches[:limit]
+    
+    def search(self, text: str, limit: int = 10) -> List[NameMatch]:
+        """Return prefix matches first, then fuzzy matches for the rest of the list."""
+        matches = self.prefix(text, limit)
+        if len(matches) < limit:
+            found = {match.name for match in matches}
+            matches.extend(match for match in self.fuzzy(text, limit) if match.name not in found)
+        return matches[:limit]
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for looking up usernames."""
+    parser = argparse.ArgumentParser(description="Search Belbin test usernames")
+    parser.add_argument('text', nargs='?', help="name, name prefix or misspelled name")
+    parser.add_argument('--db', default='data/results.db', help="database path")
+    parser.add_argument('--limit', type=int, default=10, help="maximum matches to show")
+    parser.add_argument('--prefix', action='store_true', help="only show names starting with the text")
+    parser.add_argument('--install', action='store_true', help="install the index if the database lacks it")
+    parser.add_argument('--rebuild', action='store_true', help="rebuild the index first")
+    args = parser.parse_args(argv)
+    if args.text is None and not args.install:
+        parser.error("give a name to search for, or --install")
+    
+    db_manager = DatabaseManager(args.db)
+    if args.install:
+        index = NameIndex.install(db_manager)
+        print(f"Name index installed in {args.db} ({len(index)} names)")
+    else:
+        index = NameIndex(db_manager)
+    if args.rebuild:
+        index.rebuild()
+    if args.text is None:
+        return 0
+    matches = index.prefix(args.text, args.limit) if args.prefix else index.search(args.text, args.limit)
+    for match in matches:
+        print(f"{match.score:5.2f}  {match.name}  ({match.results} results)")
+    if not matches:
+        print("No matching names")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
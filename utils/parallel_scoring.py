@@ -0,0 +1,262 @@
+"""
+Parallel scoring module for Belbin Test application.
+Scores very large answer sets in worker processes that share memory with the parent.
+
+Answers are an N x K points matrix with one uint8 column per (question,
+option) slot, as in ``utils.scoring``. It is placed in
+``multiprocessing.shared_memory`` together with the N x 9 int32 score
+matrix. Workers attach to both blocks by name and score disjoint row ranges
+through the option-to-role matrix compiled from ``BelbinTest.QUESTIONS``.
+Only block names and row ranges are pickled, never answers or scores. The
+parent process is the only database writer and bulk-loads the scores with
+``utils.transfer.load_scores``.
+
+Usage:
+    python -m utils.parallel_scoring answers.csv --db data/results.db --workers 8
+"""
+
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.data_processing import BelbinTest, DatabaseManager
+from utils.scoring import POINTS_PER_QUESTION, ScoringScheme, option_slots
+from utils.transfer import load_scores
+
+ANSWER_DTYPE = np.dtype(np.uint8)
+SCORE_DTYPE = np.dtype(np.int32)
+
+
+def slot_columns(test: type = BelbinTest) -> List[str]:
+    """Return the answer file column of every slot, e.g. '1a' for question 1 option a."""
+    return [f'{question_idx + 1}{option}' for question_idx, option in option_slots(test)]
+
+
+def compile_role_matrix(test: type = BelbinTest) -> np.ndarray:
+    """Return the test's K x 9 option-to-role matrix as float32."""
+    return ScoringScheme.raw(test=test).matrix.astype(np.float32)
+
+
+class SharedArray:
+    """A NumPy array backed by a named shared memory block.
+    
+    The creating process owns the block and unlinks it on close; other
+    processes attach with ``SharedArray.attach(spec)``.
+    """
+    
+    def __init__(self, shape: Tuple[int, ...], dtype, name: Optional[str] = None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = name is None
+        size = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        self.memory = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.array = np.ndarray(self.shape, self.dtype, buffer=self.memory.buf)
+    
+    @property
+    def spec(self) -> Tuple[str, Tuple[int, ...], str]:
+        """Return what another process needs to attach: (name, shape, dtype)."""
+        return self.memory.name, self.shape, self.dtype.str
+    
+    @classmethod
+    def attach(cls, spec: Tuple[str, Tuple[int, ...], str]) -> 'SharedArray':
+        """Attach to a block created by another process."""
+        name, shape, dtype = spec
+        return cls(shape, dtype, name)
+    
+    def truncate(self, rows: int):
+        """Use only the first ``rows`` rows of the block from now on."""
+        self.shape = (rows, *self.shape[1:])
+        self.array = self.array[:rows]
+    
+    def close(self):
+        """Release the array, and free the block if this process created it."""
+        # The buffer cannot be released while an array still points into it
+        self.array = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def score_rows(answers: np.ndarray, scores: np.ndarray, matrix: np.ndarray, start: int, stop: int,
+               chunk_rows: int = 65536):
+    """Score answer rows [start, stop) into the same rows of ``scores``.
+    
+    Rows are converted in chunks, so temporaries stay small however long
+    the range is.
+    """
+    for begin in range(start, stop, chunk_rows):
+        end = min(begin + chunk_rows, stop)
+        scores[begin:end] = np.rint(answers[begin:end] @ matrix)
+
+
+# Shared blocks attached once per worker process
+_worker_state = {}
+
+
+def _init_worker(answers_spec, scores_spec, matrix: np.ndarray):
+    _worker_state['answers'] = SharedArray.attach(answers_spec)
+    _worker_state['scores'] = SharedArray.attach(scores_spec)
+    _worker_state['matrix'] = matrix
+
+
+def _score_range(start: int, stop: int, chunk_rows: int) -> int:
+    score_rows(_worker_state['answers'].array, _worker_state['scores'].array, _worker_state['matrix'],
+               start, stop, chunk_rows)
+    return stop - start
+
+
+class ParallelScorer:
+    """Scores an answers matrix in worker processes through shared memory.
+    
+    With one worker everything runs in the calling process.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, test: type = BelbinTest, chunk_rows: int = 65536):
+        self.workers = workers or os.cpu_count() or 1
+        self.test = test
+        self.chunk_rows = chunk_rows
+        self.matrix = compile_role_matrix(test)
+    
+    def allocate(self, respondents: int) -> SharedArray:
+        """Create a zeroed shared answers matrix for callers to fill in place."""
+        answers = SharedArray((respondents, len(self.matrix)), ANSWER_DTYPE)
+        answers.array.fill(0)
+        return answers
+    
+    def score_shared(self, answers: SharedArray) -> SharedArray:
+        """Score a shared answers matrix into a new shared score matrix.
+        
+        The caller closes the returned block.
+        """
+        respondents = answers.shape[0]
+        scores = SharedArray((respondents, self.matrix.shape[1]), SCORE_DTYPE)
+        workers = min(self.workers, max(respondents // self.chunk_rows, 1))
+        try:
+            if workers == 1:
+                score_rows(answers.array, scores.array, self.matrix, 0, respondents, self.chunk_rows)
+                return scores
+            bounds = np.linspace(0, respondents, workers + 1).astype(int).tolist()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(answers.spec, scores.spec, self.matrix)) as executor:
+                list(executor.map(_score_range, bounds[:-1], bounds[1:], [self.chunk_rows] * workers))
+            return scores
+        except BaseException:
+            scores.close()
+            raise
+    
+    def score(self, points: np.ndarray) -> np.ndarray:
+        """Score an N x K points matrix and return the N x 9 scores."""
+        points = np.asarray(points)
+        if self.workers == 1:
+            scores = np.empty((len(points), self.matrix.shape[1]), SCORE_DTYPE)
+            score_rows(points, scores, self.matrix, 0, len(points), self.chunk_rows)
+            return scores
+        with self.allocate(len(points)) as answers:
+            answers.array[:] = points
+            with self.score_shared(answers) as scores:
+                return scores.array.copy()
+
+
+def read_answers(path: str, scorer: ParallelScorer, chunk_rows: int = 65536) -> Tuple[List[str], SharedArray]:
+    """Read an answers CSV straight into a shared answers matrix.
+    
+    The file has a ``username`` column and one column per slot (see
+    ``slot_columns``); empty cells count as 0 points. Returns the usernames
+    and the shared matrix, which the caller closes.
+    """
+    with open(path, newline='', encoding='utf-8') as source:
+        respondents = max(sum(1 for _ in source) - 1, 0)
+    
+    columns = slot_columns(scorer.test)
+    answers = scorer.allocate(respondents)
+    usernames = []
+    try:
+        with open(path, newline='', encoding='utf-8') as source:
+            reader = csv.reader(source)
+            header = next(reader, [])
+            missing = [column for column in ['username', *columns] if column not in header]
+            if missing:
+                raise ValueError(f"{path}: missing columns {', '.join(missing)}")
+            name_position = header.index('username')
+            positions = [header.index(column) for column in columns]
+            
+            row_count = 0
+            chunk = []
+            for row in reader:
+                if not row:
+                    continue
+                usernames.append(row[name_position])
+                chunk.append([row[i] or '0' for i in positions])
+                if len(chunk) == chunk_rows:
+                    _store_chunk(answers, chunk, row_count, path)
+                    row_count += len(chunk)
+                    chunk = []
+            _store_chunk(answers, chunk, row_count, path)
+            row_count += len(chunk)
+        # Blank lines were counted but not stored
+        answers.truncate(row_count)
+        return usernames, answers
+    except BaseException:
+        answers.close()
+        raise
+
+
+def _store_chunk(answers: SharedArray, chunk: List[List[str]], offset: int, path: str):
+    if not chunk:
+        return
+    values = np.array(chunk, dtype=np.int64)
+    bad = np.argwhere((values < 0) | (values > POINTS_PER_QUESTION))
+    if len(bad):
+        raise ValueError(f"{path}: row {offset + bad[0][0] + 1} has {values[tuple(bad[0])]} points "
+                         f"for one option (expected 0 to {POINTS_PER_QUESTION})")
+    answers.array[offset:offset + len(chunk)] = values
+
+
+def import_answers(db_manager: DatabaseManager, path: str, workers: Optional[int] = None,
+                   chunk_size: int = 50000) -> int:
+    """Score an answers CSV in parallel and bulk-insert the results.
+    
+    Returns the number of results saved.
+    """
+    scorer = ParallelScorer(workers)
+    usernames, answers = read_answers(path, scorer)
+    with answers, scorer.score_shared(answers) as scores:
+        return load_scores(db_manager, usernames, scores.array, chunk_size)
+
+
+def write_answers(path: str, usernames: Sequence[str], points: np.ndarray, test: type = BelbinTest):
+    """Write an answers CSV readable by ``read_answers``."""
+    with open(path, 'w', newline='', encoding='utf-8') as output:
+        writer = csv.writer(output)
+        writer.writerow(['username', *slot_columns(test)])
+        for username, row in zip(usernames, np.asarray(points).tolist()):
+            writer.writerow([username, *row])
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for scoring an answers file."""
+    parser = argparse.ArgumentParser(description="Score a large answers file in parallel")
+    parser.add_argument('path', help="CSV with a username column and one column per option, e.g. 1a")
+    parser.add_argument('--db', default='data/results.db', help="database path")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+    
+    count = import_answers(DatabaseManager(args.db), args.path, args.workers)
+    print(f"Scored and saved {count} results from {args.path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Question bank module for Belbin Test application.
+Loads question sets for other languages and revised items from external files.
+
+A bank is a JSON file named ``<language>-<version>.json`` in the
+``question_banks`` directory, holding an optional title and a list of
+questions in the ``BelbinTest.QUESTIONS`` layout (options map a letter to
+``[text, role code]``). Every role code is validated against
+``BelbinTest.ROLES``.
+
+The first load validates a bank and compiles it to a ``marshal`` file in
+``question_banks/__cache__``, named by the SHA-256 of the JSON source.
+Later loads only hash the source and read the compiled file, and editing a
+bank changes its hash, so the stale cache is never read. Listing banks
+only reads file names, and a bank is loaded when it is first selected.
+
+Usage:
+    python -m utils.question_bank list
+    python -m utils.question_bank check             # validate and compile every bank
+    python -m utils.question_bank export en-1.json  # write the built-in questions
+"""
+
+import argparse
+import hashlib
+import json
+import marshal
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from utils.data_processing import BelbinTest
+
+BANK_DIR = os.path.join(os.path.dirname(__file__), '..', 'question_banks')
+CACHE_DIRNAME = '__cache__'
+# Bump when the compiled layout changes so every bank is compiled again
+CACHE_FORMAT = 1
+
+_BANK_FILE = re.compile(r'^(?P<language>.+)-(?P<version>[^-]+)\.json$')
+
+
+@dataclass(frozen=True)
+class BankInfo:
+    """An installed bank file, known from its name before it is loaded."""
+    language: str
+    version: str
+    path: str
+    
+    @property
+    def key(self) -> str:
+        """Return the bank's name, e.g. 'en-1'."""
+        return f'{self.language}-{self.version}'
+
+
+@dataclass
+class QuestionBank:
+    """A validated question set for one language and version."""
+    language: str
+    version: str
+    title: str
+    questions: List[Dict]
+    digest: str
+    _test_class: Optional[type] = field(default=None, repr=False, compare=False)
+    
+    @property
+    def key(self) -> str:
+        """Return the bank's name, e.g. 'en-1'."""
+        return f'{self.language}-{self.version}'
+    
+    def test_class(self) -> type:
+        """Return a ``BelbinTest`` subclass asking this bank's questions.
+        
+        It can be passed wherever a test class is accepted, for example to
+        ``IncrementalScorer`` or ``ScoringScheme.raw``.
+        """
+        if self._test_class is None:
+            name = 'BelbinTest_' + re.sub(r'\W', '_', self.key)
+            self._test_class = type(name, (BelbinTest,), {'QUESTIONS': self.questions})
+        return self._test_class
+
+
+def version_key(version: str):
+    """Sort key placing '10' after '9' and numbers before words."""
+    return [(0, int(part), '') if part.isdigit() else (1, 0, part) for part in re.split(r'[._]', version)]
+
+
+def validate_bank(data, source: str = '<bank>') -> Dict:
+    """Check a parsed bank and return its compiled form.
+    
+    The compiled form holds the questions in the ``BelbinTest.QUESTIONS``
+    layout, ready to use once unmarshalled.
+    
+    Raises ValueError naming the source and the first problem found.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('questions'), list) or not data['questions']:
+        raise ValueError(f"{source}: expected an object with a non-empty 'questions' list")
+    title = data.get('title', '')
+    if not isinstance(title, str):
+        raise ValueError(f"{source}: 'title' must be a string")
+    
+    questions = []
+    for number, question in enumerate(data['questions'], start=1):
+        where = f"{source}: question {number}"
+        if not isinstance(question, dict) or not isinstance(question.get('question'), str) \
+                or not question['question'].strip():
+            raise ValueError(f"{where}: missing question text")
+        options = question.get('options')
+        if not isinstance(options, dict) or len(options) < 2:
+            raise ValueError(f"{where}: expected at least two options")
+        compiled = {}
+        for option, value in options.items():
+            if not re.fullmatch(r'[a-z]', option):
+                raise ValueError(f"{where}: option {option!r} must be a single lowercase letter")
+            if not isinstance(value, (list, tuple)) or len(value) != 2 \
+                    or not isinstance(value[0], str) or not value[0].strip():
+                raise ValueError(f"{where} option {option!r}: expected [text, role]")
+            if value[1] not in BelbinTest.ROLES:
+                raise ValueError(f"{where} option {option!r}: unknown role {value[1]!r} "
+                                 f"(expected one of {', '.join(BelbinTest.ROLES)})")
+            compiled[option] = (value[0], value[1])
+        questions.append({'question': question['question'], 'options': compiled})
+    return {'format': CACHE_FORMAT, 'title': title, 'questions': questions}
+
+
+def load_bank(info: BankInfo, cache_dir: Optional[str] = None) -> QuestionBank:
+    """Load a bank, compiling it first unless a cache for its current content exists."""
+    with open(info.path, 'rb') as source:
+        raw = source.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    cache_dir = cache_dir or os.path.join(os.path.dirname(info.path), CACHE_DIRNAME)
+    cache_path = os.path.join(cache_dir, f'{info.key}.{digest[:16]}.marshal')
+    
+    compiled = None
+    try:
+        # One read; marshal.load on a file object reads it in small pieces
+        with open(cache_path, 'rb') as cached:
+            compiled = marshal.loads(cached.read())
+        if not isinstance(compiled, dict) or compiled.get('format') != CACHE_FORMAT:
+            compiled = None
+    except (OSError, EOFError, ValueError, TypeError):
+        compiled = None
+    
+    if compiled is None:
+        try:
+            data = json.loads(raw.decode('utf-8'))
+        except ValueError as e:
+            raise ValueError(f"{info.path}: not valid JSON: {e}") from e
+        compiled = validate_bank(data, info.path)
+        _write_cache(cache_dir, cache_path, info.key, compiled)
+    return QuestionBank(info.language, info.version, compiled['title'], compiled['questions'], digest)
+
+
+def _write_cache(cache_dir: str, cache_path: str, key: str, compiled: Dict):
+    # A read-only install still loads banks, just without the cache
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path + '.tmp', 'wb') as output:
+            marshal.dump(compiled, output)
+        os.replace(cache_path + '.tmp', cache_path)
+        stale = re.compile(re.escape(key) + r'\.[0-9a-f]{16}\.marshal$')
+        for name in os.listdir(cache_dir):
+            if stale.match(name) and os.path.join(cache_dir, name) != cache_path:
+                os.remove(os.path.join(cache_dir, name))
+    except OSError:
+        pass
+
+
+class BankRegistry:
+    """The banks installed in a directory, each loaded on first use."""
+    
+    def __init__(self, directory: str = BANK_DIR, cache_dir: Optional[str] = None):
+        self.directory = directory
+        self.cache_dir = cache_dir
+        self._available: Optional[List[BankInfo]] = None
+        self._loaded: Dict[str, QuestionBank] = {}
+    
+    def available(self) -> List[BankInfo]:
+        """Return the installed banks by language and version, from file names only."""
+        if self._available is None:
+            infos = []
+            try:
+                entries = list(os.scandir(self.directory))
+            except FileNotFoundError:
+                entries = []
+            for entry in entries:
+                match = _BANK_FILE.match(entry.name)
+                if match and entry.is_file():
+                    infos.append(BankInfo(match['language'], match['version'], entry.path))
+            self._available = sorted(infos, key=lambda info: (info.language, version_key(info.version)))
+        return self._available
+    
+    def __len__(self) -> int:
+        return len(self.available())
+    
+    def languages(self) -> List[str]:
+        """Return the installed languages."""
+        return sorted({info.language for info in self.available()})
+    
+    def find(self, language: str, version: Optional[str] = None) -> BankInfo:
+        """Return the named bank, or the latest version of a language."""
+        matches = [info for info in self.available()
+                   if info.language == language and version in (None, info.version)]
+        if not matches:
+            wanted = language if version is None else f'{language} version {version}'
+            raise KeyError(f"No question bank for {wanted} in {self.directory}")
+        return matches[-1]
+    
+    def get(self, language: str, version: Optional[str] = None) -> QuestionBank:
+        """Return a bank, loading it the first time it is asked for."""
+        info = self.find(language, version)
+        bank = self._loaded.get(info.key)
+        if bank is None:
+            bank = self._loaded[info.key] = load_bank(info, self.cache_dir)
+        return bank
+
+
+def export_bank(path: str, test: type = BelbinTest, title: str = ''):
+    """Write a test class's questions as a bank file."""
+    data = {
+        'title': title,
+        'questions': [{'question': question['question'],
+                       'options': {option: list(value) for option, value in question['options'].items()}}
+                      for question in test.QUESTIONS],
+    }
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(data, output, ensure_ascii=False, indent=2)
+        output.write('\n')
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for listing, checking and exporting banks."""
+    parser = argparse.ArgumentParser(description="Manage Belbin test question banks")
+    parser.add_argument('--dir', default=BANK_DIR, help="question bank directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="list installed banks")
+    commands.add_parser('check', help="validate and compile every bank")
+    export_parser = commands.add_parser('export', help="write the built-in questions as a bank")
+    export_parser.add_argument('path')
+    export_parser.add_argument('--title', default='Belbin Team Roles Test')
+    args = parser.parse_args(argv)
+    
+    if args.command == 'export':
+        export_bank(args.path, title=args.title)
+        print(f"Wrote {len(BelbinTest.QUESTIONS)} questions to {args.path}")
+        return 0
+    
+    registry = BankRegistry(args.dir)
+    failed = 0
+    for info in registry.available():
+        if args.command == 'list':
+            print(f"{info.language:<8} {info.version:<8} {info.path}")
+            continue
+        try:
+            bank = registry.get(info.language, info.version)
+            print(f"ok      {info.key:<16} {len(bank.questions)} questions")
+        except ValueError as e:
+            print(f"FAILED  {e}")
+            failed += 1
+    if not len(registry):
+        print(f"No question banks in {args.dir}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
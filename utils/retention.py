@@ -0,0 +1,143 @@
+"""
+Retention module for Belbin Test application.
+Archives expired test results to compressed files and compacts the database.
+"""
+
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from utils.data_processing import DatabaseManager
+
+
+@dataclass
+class RetentionPolicy:
+    """Which results to keep in the live database.
+    
+    A result expires when it is older than ``max_age_days`` or when its user
+    has more than ``max_per_user`` newer results. Unset limits do not apply.
+    """
+    max_age_days: Optional[float] = None
+    max_per_user: Optional[int] = None
+    
+    def expired_condition(self) -> Optional[str]:
+        """SQL condition selecting expired rows, or None if nothing expires."""
+        conditions = []
+        if self.max_age_days is not None:
+            conditions.append(f"timestamp < datetime('now', '-{float(self.max_age_days)} days')")
+        if self.max_per_user is not None:
+            conditions.append(f'''id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY username ORDER BY timestamp DESC, id DESC
+                    ) AS rank FROM test_results
+                ) WHERE rank > {int(self.max_per_user)}
+            )''')
+        return ' OR '.join(f'({c})' for c in conditions) if conditions else None
+
+
+class ResultArchive:
+    """Append-only archive of results stored as gzip-compressed JSON lines.
+    
+    Every archive run appends a new gzip member, so earlier data is never
+    rewritten. Reading supports the same filters as
+    ``DatabaseManager.iter_results``.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def append(self, rows: List[Dict]):
+        """Append rows as one compressed member and flush them to disk."""
+        if not rows:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'ab') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as archive:
+                for row in rows:
+                    archive.write(json.dumps(row, separators=(',', ':')).encode('utf-8') + b'\n')
+            raw.flush()
+            os.fsync(raw.fileno())
+    
+    def iter_results(self, username: Optional[str] = None, since: Optional[str] = None,
+                     until: Optional[str] = None) -> Iterator[Dict]:
+        """Iterate over archived results in archive order, optionally filtered."""
+        if not os.path.exists(self.path):
+            return
+        with gzip.open(self.path, 'rt', encoding='utf-8') as archive:
+            for line in archive:
+                row = json.loads(line)
+                if username is not None and row['username'] != username:
+                    continue
+                if since is not None and row['timestamp'] < since:
+                    continue
+                if until is not None and row['timestamp'] >= until:
+                    continue
+                yield row
+
+
+def archive_expired(db_manager: DatabaseManager, policy: RetentionPolicy, archive: ResultArchive,
+                    batch_size: int = 1000, vacuum_step_pages: int = 64) -> Dict[str, int]:
+    """Move expired results into the archive and reclaim the freed space.
+    
+    The expired ids are selected once into a temporary table, then rows
+    are handled in batches: each batch is written to the archive and
+    synced before it is deleted, so a crash can at worst archive a batch
+    twice but never lose it. Returns counts of archived rows and reclaimed
+    pages.
+    """
+    condition = policy.expired_condition()
+    if condition is None:
+        return {'archived': 0, 'pages_reclaimed': 0}
+    
+    archived = 0
+    with db_manager.connect() as conn:
+        # Rows never stop being expired, so the expired ids are computed once
+        # and the window over all rows runs a single time
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS retention_expired (id INTEGER PRIMARY KEY)')
+        try:
+            db_manager.run_with_retry(_select_expired, conn, condition)
+            last_id = 0
+            while True:
+                ids = [row[0] for row in conn.execute(
+                    'SELECT id FROM temp.retention_expired WHERE id > ? ORDER BY id LIMIT ?',
+                    (last_id, batch_size))]
+                if not ids:
+                    break
+                last_id = ids[-1]
+                # Rows deleted by someone else since the selection are skipped
+                batch = db_manager.run_with_retry(_select_ids, conn, ids)
+                if batch:
+                    archive.append(batch)
+                    db_manager.run_with_retry(_delete_ids, conn, [row['id'] for row in batch])
+                    archived += len(batch)
+        finally:
+            conn.execute('DROP TABLE IF EXISTS temp.retention_expired')
+    
+    if archived and db_manager.cache is not None:
+        db_manager.cache.invalidate()
+    
+    pages = db_manager.incremental_vacuum(vacuum_step_pages)
+    return {'archived': archived, 'pages_reclaimed': pages}
+
+
+def _select_expired(conn, condition: str):
+    conn.execute('DELETE FROM temp.retention_expired')
+    conn.execute(f'INSERT INTO temp.retention_expired SELECT id FROM test_results WHERE {condition}')
+    conn.commit()
+
+
+def _select_ids(conn, ids: List[int]) -> List[Dict]:
+    cursor = conn.execute(f'SELECT * FROM test_results WHERE id IN ({",".join("?" * len(ids))}) ORDER BY id',
+                          ids)
+    columns = [desc[0] for desc in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _delete_ids(conn, ids: List[int]):
+    conn.execute(f'DELETE FROM test_results WHERE id IN ({",".join("?" * len(ids))})', ids)
+    conn.commit()
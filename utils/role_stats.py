@@ -0,0 +1,186 @@
+"""
+Role statistics module for Belbin Test application.
+Streams role score means, covariances and correlations in constant memory.
+
+``RoleStatistics`` keeps the count, mean vector and 9 x 9 co-moment matrix
+of the scores seen so far. Chunks are folded in with the parallel form of
+Welford's algorithm, so accumulators built on different shards or processes
+can be merged exactly and the state can be saved and updated later.
+
+Usage:
+    python -m utils.role_stats data/role_stats.json --db data/results.db
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.data_processing import BelbinTest, DatabaseManager
+
+ROLE_CODES = list(BelbinTest.ROLES)
+
+
+class RoleStatistics:
+    """Mergeable streaming mean and covariance of role scores."""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = np.zeros(len(ROLE_CODES))
+        # Sum of outer products of deviations from the mean
+        self.comoment = np.zeros((len(ROLE_CODES), len(ROLE_CODES)))
+        # Highest result id consumed by refresh
+        self.last_id = 0
+    
+    def _combine(self, count: int, mean: np.ndarray, comoment: np.ndarray):
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.comoment += comoment + np.outer(delta, delta) * (self.count * count / total)
+        self.mean += delta * (count / total)
+        self.count = total
+    
+    def update(self, scores) -> 'RoleStatistics':
+        """Fold in an N x 9 score matrix (columns in ROLES order)."""
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1, len(ROLE_CODES))
+        if len(scores):
+            mean = scores.mean(axis=0)
+            centred = scores - mean
+            self._combine(len(scores), mean, centred.T @ centred)
+        return self
+    
+    def add_result(self, scores: Dict[str, int]) -> 'RoleStatistics':
+        """Fold in one result given as a role score dictionary."""
+        return self.update([[scores.get(role, 0) for role in ROLE_CODES]])
+    
+    def merge(self, other: 'RoleStatistics') -> 'RoleStatistics':
+        """Fold in another accumulator, e.g. one built on a different shard."""
+        self._combine(other.count, other.mean, other.comoment)
+        self.last_id = max(self.last_id, other.last_id)
+        return self
+    
+    def covariance(self, ddof: int = 1) -> np.ndarray:
+        """Return the 9 x 9 covariance matrix (NaN with too few results)."""
+        if self.count <= ddof:
+            return np.full_like(self.comoment, np.nan)
+        return self.comoment / (self.count - ddof)
+    
+    def std(self, ddof: int = 1) -> np.ndarray:
+        """Return the standard deviation of each role score."""
+        return np.sqrt(np.diag(self.covariance(ddof)))
+    
+    def correlation(self) -> np.ndarray:
+        """Return the 9 x 9 Pearson correlation matrix.
+        
+        Entries involving a role whose score never varies are NaN.
+        """
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = self.comoment / np.outer(scale, scale)
+        return np.clip(correlation, -1.0, 1.0)
+    
+    def top_pairs(self, count: int = 5, positive: bool = True) -> List[Tuple[str, str, float]]:
+        """Return the most positively (or negatively) correlated role pairs."""
+        correlation = self.correlation()
+        rows, columns = np.triu_indices(len(ROLE_CODES), k=1)
+        values = correlation[rows, columns]
+        valid = ~np.isnan(values)
+        order = np.argsort(values[valid], kind='stable')
+        if positive:
+            order = order[::-1]
+        rows, columns, values = rows[valid][order], columns[valid][order], values[valid][order]
+        return [(ROLE_CODES[r], ROLE_CODES[c], float(v)) for r, c, v in zip(rows[:count], columns[:count], values[:count])]
+    
+    def refresh(self, db_manager: DatabaseManager, batch_size: int = 100000) -> int:
+        """Fold in results newer than the last one consumed; returns the number added.
+        
+        Results deleted from the database afterwards stay in the statistics.
+        """
+        query = (f'SELECT id, {", ".join(DatabaseManager.SCORE_COLUMNS)} '
+                 f'FROM test_results WHERE id > ? ORDER BY id LIMIT ?')
+        added = 0
+        while True:
+            page = db_manager.run_with_retry(db_manager.fetch_all, query, (self.last_id, batch_size))
+            if not page:
+                break
+            rows = np.array(page, dtype=np.float64)
+            self.update(rows[:, 1:])
+            self.last_id = int(rows[-1, 0])
+            added += len(page)
+            if len(page) < batch_size:
+                break
+        return added
+    
+    def to_dict(self) -> Dict:
+        """Return the state as JSON-compatible data."""
+        return {
+            'roles': ROLE_CODES,
+            'count': self.count,
+            'last_id': self.last_id,
+            'mean': self.mean.tolist(),
+            'comoment': self.comoment.tolist(),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RoleStatistics':
+        """Restore an accumulator saved with ``to_dict``."""
+        if data['roles'] != ROLE_CODES:
+            raise ValueError("Saved statistics use different roles")
+        stats = cls()
+        stats.count = int(data['count'])
+        stats.last_id = int(data['last_id'])
+        stats.mean = np.array(data['mean'], dtype=np.float64)
+        stats.comoment = np.array(data['comoment'], dtype=np.float64)
+        return stats
+    
+    def save(self, path: str):
+        """Write the state atomically as JSON."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as output:
+            json.dump(self.to_dict(), output)
+        os.replace(path + '.tmp', path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'RoleStatistics':
+        """Load saved state, or return an empty accumulator if the file is missing."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as source:
+            return cls.from_dict(json.load(source))
+
+
+def format_matrix(matrix: np.ndarray) -> str:
+    """Format a 9 x 9 role matrix as a text table."""
+    lines = ['      ' + ''.join(f'{code:>7}' for code in ROLE_CODES)]
+    for code, row in zip(ROLE_CODES, matrix):
+        lines.append(f'{code:<6}' + ''.join(f'{value:7.2f}' for value in row))
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for updating and showing role statistics."""
+    parser = argparse.ArgumentParser(description="Streaming Belbin role correlation statistics")
+    parser.add_argument('state', help="statistics state file (JSON)")
+    parser.add_argument('--db', default='data/results.db', help="database path")
+    parser.add_argument('--rebuild', action='store_true', help="start again from all results")
+    args = parser.parse_args(argv)
+    
+    stats = RoleStatistics() if args.rebuild else RoleStatistics.load(args.state)
+    added = stats.refresh(DatabaseManager(args.db))
+    stats.save(args.state)
+    
+    print(f"Added {added} results; statistics cover {stats.count} results")
+    print(format_matrix(stats.correlation()))
+    for first, second, value in stats.top_pairs(3):
+        print(f"  {BelbinTest.ROLES[first]} / {BelbinTest.ROLES[second]}: {value:+.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Scoring schemes module for Belbin Test application.
+Compiles scoring variants to matrices and evaluates them together in one pass.
+
+Answers are encoded once as an N x K points matrix, with one column per
+(question, option) slot. Each ``ScoringScheme`` is a K x 9 matrix that maps
+option points to role scores, so question weights and alternative
+option-to-role mappings are just different matrices. Stacking S schemes
+gives an S x K x 9 tensor and a single matrix product yields S x N x 9
+scores.
+
+Usage:
+    from utils.scoring import ScoringScheme, SchemeSet, encode_answers
+    schemes = SchemeSet([ScoringScheme.raw(), ScoringScheme.raw(normalize=True)])
+    scores = schemes.evaluate(encode_answers(answer_sets))
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from utils.data_processing import BelbinTest
+
+# Points each respondent distributes within one question
+POINTS_PER_QUESTION = 10
+
+
+def option_slots(test: type = BelbinTest) -> List[Tuple[int, str]]:
+    """Return the (question index, option) pair of every answer column."""
+    return [(question_idx, option)
+            for question_idx, question in enumerate(test.QUESTIONS)
+            for option in question['options']]
+
+
+def encode_answers(answer_sets: Sequence[Dict[int, Dict[str, int]]], test: type = BelbinTest) -> np.ndarray:
+    """Encode answer dictionaries as an N x K points matrix.
+    
+    Options that are not part of the test are ignored, as in
+    ``BelbinTest.calculate_scores``.
+    """
+    slots = {slot: column for column, slot in enumerate(option_slots(test))}
+    points = np.zeros((len(answer_sets), len(slots)))
+    for row, answers in enumerate(answer_sets):
+        for question_idx, question_answers in answers.items():
+            for option, value in question_answers.items():
+                column = slots.get((question_idx, option))
+                if column is not None:
+                    points[row, column] = value
+    return points
+
+
+def normalize_points(points: np.ndarray, test: type = BelbinTest) -> np.ndarray:
+    """Rescale each answered question of a points matrix to sum to the question budget."""
+    question_of = np.array([question_idx for question_idx, _ in option_slots(test)])
+    membership = question_of[:, None] == np.arange(len(test.QUESTIONS))
+    # Each column's question total, via K x Q membership and back
+    totals = (points @ membership)[:, question_of]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(totals > 0, points * (POINTS_PER_QUESTION / totals), 0.0)
+
+
+@dataclass
+class ScoringScheme:
+    """A scoring variant compiled to a K x 9 option-to-role matrix.
+    
+    With ``normalize`` set, points are first rescaled so every answered
+    question carries the same weight regardless of how many points were
+    given in it.
+    """
+    name: str
+    matrix: np.ndarray
+    normalize: bool = False
+    
+    @classmethod
+    def from_mapping(cls, name: str, mapping: Dict[int, Dict[str, Union[str, Dict[str, float]]]],
+                     weights: Optional[Sequence[float]] = None, normalize: bool = False,
+                     test: type = BelbinTest) -> 'ScoringScheme':
+        """Compile an option-to-role mapping.
+        
+        ``mapping`` gives, for each question index, the role of each option,
+        either as a role code or as a dictionary splitting the option's
+        points across several roles. Options that are missing score nothing.
+        ``weights`` multiplies every question's contribution.
+        """
+        role_index = {role: i for i, role in enumerate(test.ROLES)}
+        weights = np.ones(len(test.QUESTIONS)) if weights is None else np.asarray(weights, dtype=float)
+        if len(weights) != len(test.QUESTIONS):
+            raise ValueError(f"Expected {len(test.QUESTIONS)} question weights, got {len(weights)}")
+        
+        matrix = np.zeros((len(option_slots(test)), len(role_index)))
+        for column, (question_idx, option) in enumerate(option_slots(test)):
+            target = mapping.get(question_idx, {}).get(option)
+            if target is None:
+                continue
+            for role, share in ({target: 1.0} if isinstance(target, str) else target).items():
+                if role not in role_index:
+                    raise ValueError(f"Unknown role {role!r} for question {question_idx} option {option!r}")
+                matrix[column, role_index[role]] += share * weights[question_idx]
+        return cls(name, matrix, normalize)
+    
+    @classmethod
+    def raw(cls, name: str = 'raw', weights: Optional[Sequence[float]] = None,
+            normalize: bool = False, test: type = BelbinTest) -> 'ScoringScheme':
+        """Compile the test's own option-to-role mapping."""
+        mapping = {question_idx: {option: role for option, (_, role) in question['options'].items()}
+                   for question_idx, question in enumerate(test.QUESTIONS)}
+        return cls.from_mapping(name, mapping, weights, normalize, test)
+
+
+class SchemeSet:
+    """Several scoring schemes stacked into one S x K x 9 tensor."""
+    
+    def __init__(self, schemes: Sequence[ScoringScheme], test: type = BelbinTest):
+        if not schemes:
+            raise ValueError("At least one scoring scheme is required")
+        names = [scheme.name for scheme in schemes]
+        if len(set(names)) != len(names):
+            raise ValueError("Scoring scheme names must be unique")
+        self.test = test
+        self.names = names
+        self.tensor = np.stack([scheme.matrix for scheme in schemes])
+        expected = (len(option_slots(test)), len(test.ROLES))
+        if self.tensor.shape[1:] != expected:
+            raise ValueError(f"Expected {expected[0]} x {expected[1]} scheme matrices, got {self.tensor.shape[1:]}")
+        self._normalized = np.array([scheme.normalize for scheme in schemes])
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def evaluate(self, points: np.ndarray) -> np.ndarray:
+        """Score an N x K points matrix with every scheme, giving S x N x 9."""
+        points = np.asarray(points, dtype=np.float64)
+        scores = np.empty((len(self), len(points), len(self.test.ROLES)))
+        for normalized in (False, True):
+            selected = self._normalized == normalized
+            if selected.any():
+                inputs = normalize_points(points, self.test) if normalized else points
+                scores[selected] = np.matmul(inputs, self.tensor[selected])
+        return scores
+    
+    def score_answers(self, answer_sets: Sequence[Dict[int, Dict[str, int]]]) -> np.ndarray:
+        """Encode answer dictionaries once and score them with every scheme."""
+        return self.evaluate(encode_answers(answer_sets, self.test))
+    
+    def dominant_agreement(self, scores: np.ndarray, baseline: int = 0) -> Dict[str, float]:
+        """Return the fraction of respondents whose top role matches the baseline scheme's."""
+        top = np.stack([self.test.rank_dominant_roles(scheme_scores, 1)[0][:, 0] for scheme_scores in scores])
+        return {name: float((top[i] == top[baseline]).mean()) if top.shape[1] else float('nan')
+                for i, name in enumerate(self.names)}
@@ -0,0 +1,456 @@
+"""
+Scoring service module for Belbin Test application.
+Accepts test submissions from browsers over HTTP, using only the standard library.
+
+An asyncio server parses HTTP/1.1 requests (with keep-alive) and puts each
+submission on a bounded queue. A single batching task takes everything that
+is queued, up to ``max_batch`` submissions, scores the whole batch with one
+matrix product and saves it with one ``DatabaseManager.save_many``
+transaction on a worker thread. Submissions arriving meanwhile form the next
+batch, so batches grow with load without delaying a lone request. When the
+queue is full, new submissions are refused at once with ``503`` and a
+``Retry-After`` header instead of queueing without limit. A list larger
+than the whole queue could never fit, so it gets ``413`` instead.
+
+Endpoints:
+    GET  /questions  the test questions and roles
+    POST /score      one submission, or a list of them
+    GET  /health     queue depth and batch counters
+
+A submission is ``{"username": "...", "answers": {"0": {"a": 6, "c": 4}, ...}}``
+with exactly 10 points in every question.
+
+Usage:
+    python -m utils.service serve --port 8080 --db data/results.db
+    python -m utils.service load http://127.0.0.1:8080 --concurrency 1 8 32 128
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from utils.data_processing import BelbinTest, DatabaseManager
+from utils.scoring import POINTS_PER_QUESTION, SchemeSet, ScoringScheme, encode_answers
+
+MAX_USERNAME = 100
+REASONS = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           408: 'Request Timeout', 411: 'Length Required', 413: 'Payload Too Large',
+           431: 'Request Header Fields Too Large', 500: 'Internal Server Error', 501: 'Not Implemented',
+           503: 'Service Unavailable'}
+
+
+class HttpError(Exception):
+    """An error answered with an HTTP status and a JSON message."""
+    
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+@dataclass
+class Submission:
+    """One validated set of answers to score and save."""
+    username: str
+    answers: Dict[int, Dict[str, int]]
+
+
+def parse_submission(data, test: type = BelbinTest) -> Submission:
+    """Validate a decoded submission, raising HttpError 400 on the first problem.
+    
+    Every question must be answered with exactly 10 points, as in the GUI.
+    """
+    if not isinstance(data, dict):
+        raise HttpError(400, "A submission must be a JSON object")
+    username = data.get('username')
+    if not isinstance(username, str) or not username.strip() or len(username) > MAX_USERNAME:
+        raise HttpError(400, f"'username' must be a non-empty string of at most {MAX_USERNAME} characters")
+    answers = data.get('answers')
+    if not isinstance(answers, dict):
+        raise HttpError(400, "'answers' must map question numbers to option points")
+    
+    parsed = {}
+    for key, question_answers in answers.items():
+        question_idx = int(key) if isinstance(key, str) and key.isdigit() else -1
+        if not 0 <= question_idx < len(test.QUESTIONS):
+            raise HttpError(400, f"Unknown question {key!r}")
+        options = test.QUESTIONS[question_idx]['options']
+        if not isinstance(question_answers, dict) or not all(
+                option in options and type(points) is int and points >= 0
+                for option, points in question_answers.items()):
+            raise HttpError(400, f"Question {key}: expected points for options {', '.join(options)}")
+        if sum(question_answers.values()) != POINTS_PER_QUESTION:
+            raise HttpError(400, f"Question {key}: distribute exactly {POINTS_PER_QUESTION} points")
+        parsed[question_idx] = question_answers
+    if len(parsed) != len(test.QUESTIONS):
+        raise HttpError(400, f"Answer all {len(test.QUESTIONS)} questions")
+    return Submission(username.strip(), parsed)
+
+
+class ScoringService:
+    """HTTP front end that scores and saves submissions in micro-batches."""
+    
+    def __init__(self, db_manager: DatabaseManager, max_batch: int = 256, max_queue: int = 1024,
+                 max_body: int = 1 << 20, idle_timeout: float = 30.0, allow_origin: Optional[str] = '*',
+                 test: type = BelbinTest):
+        self.db_manager = db_manager
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.max_body = max_body
+        self.idle_timeout = idle_timeout
+        self.allow_origin = allow_origin
+        self.test = test
+        self.schemes = SchemeSet([ScoringScheme.raw(test=test)], test)
+        self.roles = list(test.ROLES)
+        self.batches = 0
+        self.scored = 0
+        self.rejected = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.batch_task: Optional[asyncio.Task] = None
+        self.connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+    
+    async def start(self, host: str = '127.0.0.1', port: int = 8080, backlog: int = 1024) -> Tuple[str, int]:
+        """Start listening and return the bound (host, port); port 0 picks a free one.
+        
+        The default listen backlog of 100 makes the rest of a burst of new
+        connections wait a full second to retry, so it is raised here.
+        """
+        self.queue = asyncio.Queue(self.max_queue)
+        self.batch_task = asyncio.create_task(self._batch_loop())
+        self.server = await asyncio.start_server(self._handle, host, port, backlog=backlog)
+        return self.server.sockets[0].getsockname()[:2]
+    
+    async def close(self):
+        """Stop accepting connections, finish queued submissions and stop batching."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.queue is not None:
+            await self.queue.join()
+        # Closing the transports ends idle keep-alive connections; cancelling
+        # their handlers instead would log them as failed
+        for writer in list(self.connections.values()):
+            writer.close()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        if self.batch_task is not None:
+            self.batch_task.cancel()
+            try:
+                await self.batch_task
+            except asyncio.CancelledError:
+                pass
+    
+    async def serve_forever(self, host: str = '127.0.0.1', port: int = 8080):
+        """Run until cancelled, e.g. by Ctrl+C."""
+        host, port = await self.start(host, port)
+        print(f"Serving on http://{host}:{port}")
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+    
+    async def submit(self, submissions: Sequence[Submission]) -> List[Dict]:
+        """Queue submissions for the next batch and wait for their results.
+        
+        Raises HttpError 413 if there are more than the queue can ever hold,
+        and 503 if the queue has no room for all of them now.
+        """
+        if len(submissions) > self.max_queue:
+            raise HttpError(413, f"At most {self.max_queue} submissions per request")
+        if self.queue.qsize() + len(submissions) > self.max_queue:
+            self.rejected += len(submissions)
+            raise HttpError(503, "Too many submissions queued, try again shortly", {'Retry-After': '1'})
+        loop = asyncio.get_running_loop()
+        futures = []
+        for submission in submissions:
+            future = loop.create_future()
+            self.queue.put_nowait((submission, future))
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+    
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                results = await loop.run_in_executor(None, self._process, [item[0] for item in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+                self.batches += 1
+                self.scored += len(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+    
+    def _process(self, batch: List[Submission]) -> List[Dict]:
+        """Score a batch with one matrix product and save it in one transaction."""
+        scores = np.rint(self.schemes.evaluate(encode_answers([s.answers for s in batch], self.test))[0])
+        scores = scores.astype(int)
+        top_indexes, _ = self.test.rank_dominant_roles(scores, 3)
+        score_dicts = [dict(zip(self.roles, row)) for row in scores.tolist()]
+        ids = self.db_manager.save_many([(s.username, row) for s, row in zip(batch, score_dicts)])
+        return [{'id': result_id, 'username': submission.username, 'scores': row,
+                 'dominant_roles': [self.roles[i] for i in top]}
+                for result_id, submission, row, top in zip(ids, batch, score_dicts, top_indexes.tolist())]
+    
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, object]:
+        path = urlsplit(path).path
+        if path == '/score':
+            if method != 'POST':
+                raise HttpError(405, "Use POST")
+            try:
+                data = json.loads(body)
+            except ValueError:
+                raise HttpError(400, "Body must be JSON")
+            single = not isinstance(data, list)
+            submissions = [parse_submission(item, self.test) for item in ([data] if single else data)]
+            if not submissions:
+                raise HttpError(400, "No submissions")
+            results = await self.submit(submissions)
+            return 200, results[0] if single else results
+        if method != 'GET':
+            raise HttpError(405, "Use GET")
+        if path == '/questions':
+            return 200, {'roles': self.test.ROLES, 'points_per_question': POINTS_PER_QUESTION,
+                         'questions': [{'question': q['question'],
+                                        'options': {k: text for k, (text, _) in q['options'].items()}}
+                                       for q in self.test.QUESTIONS]}
+        if path == '/health':
+            return 200, {'status': 'ok', 'queued': self.queue.qsize(), 'batches': self.batches,
+                         'scored': self.scored, 'rejected': self.rejected}
+        raise HttpError(404, f"No such endpoint: {path}")
+    
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """Return (method, path, headers, body), or None when the client has gone."""
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+        except asyncio.TimeoutError:
+            return None
+        except ValueError:
+            raise HttpError(431, "Request line too long")
+        if not line:
+            return None
+        parts = line.decode('latin-1').split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/1.'):
+            raise HttpError(400, "Malformed request line")
+        method, path, version = parts
+        
+        headers = {}
+        while True:
+            try:
+                line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+            except asyncio.TimeoutError:
+                raise HttpError(408, "Headers not received in time")
+            except ValueError:
+                raise HttpError(431, "Header line too long")
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= 100:
+                raise HttpError(431, "Too many headers")
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if version == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive':
+            headers['connection'] = 'close'
+        
+        if 'transfer-encoding' in headers:
+            raise HttpError(501, "Chunked bodies are not supported; send Content-Length")
+        length = headers.get('content-length', '0')
+        if not length.isdigit():
+            raise HttpError(411 if method == 'POST' else 400, "Invalid Content-Length")
+        if int(length) > self.max_body:
+            raise HttpError(413, f"Body larger than {self.max_body} bytes")
+        try:
+            body = await asyncio.wait_for(reader.readexactly(int(length)), self.idle_timeout)
+        except asyncio.TimeoutError:
+            raise HttpError(408, "Body not received in time")
+        return method, path, headers, body
+    
+    def _response(self, status: int, payload, keep_alive: bool, headers: Optional[Dict[str, str]] = None) -> bytes:
+        body = b'' if payload is None else json.dumps(payload, separators=(',', ':')).encode()
+        lines = [f'HTTP/1.1 {status} {REASONS.get(status, "")}',
+                 f'Content-Length: {len(body)}',
+                 f'Connection: {"keep-alive" if keep_alive else "close"}']
+        if body:
+            lines.append('Content-Type: application/json')
+        if self.allow_origin:
+            lines.append(f'Access-Control-Allow-Origin: {self.allow_origin}')
+        lines.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self.connections[task] = writer
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                    if method == 'OPTIONS':
+                        # CORS preflight from browser forms on other origins
+                        writer.write(self._response(204, None, keep_alive, {
+                            'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+                            'Access-Control-Allow-Headers': 'Content-Type',
+                        }))
+                    else:
+                        status, payload = await self._route(method, path, body)
+                        writer.write(self._response(status, payload, keep_alive))
+                except HttpError as e:
+                    # The body of a rejected request may not have been read
+                    keep_alive = keep_alive and e.status in (400, 404, 405, 503)
+                    writer.write(self._response(e.status, {'error': str(e)}, keep_alive, e.headers))
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    keep_alive = False
+                    writer.write(self._response(500, {'error': f"Internal error: {e}"}, False))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            del self.connections[task]
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+@dataclass
+class LoadReport:
+    """Latency and throughput of one load generator run."""
+    concurrency: int
+    requests: int
+    errors: int
+    rejected: int
+    seconds: float
+    p50_ms: float
+    p99_ms: float
+    
+    @property
+    def requests_per_second(self) -> float:
+        """Completed requests per second, including rejected ones."""
+        return self.requests / self.seconds if self.seconds else 0.0
+
+
+def random_submission(rng: random.Random, username: str, test: type = BelbinTest) -> Dict:
+    """Return a valid submission spreading each question's points over two options."""
+    answers = {}
+    for question_idx, question in enumerate(test.QUESTIONS):
+        first, second = rng.sample(list(question['options']), 2)
+        points = rng.randint(0, POINTS_PER_QUESTION)
+        answers[str(question_idx)] = {first: points, second: POINTS_PER_QUESTION - points}
+    return {'username': username, 'answers': answers}
+
+
+async def _client(host: str, port: int, path: str, bodies: List[bytes], latencies: List[float],
+                  statuses: Dict[int, int]):
+    """Send requests one after another over one keep-alive connection."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            request = (f'POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n'
+                       f'Content-Length: {len(body)}\r\n\r\n').encode() + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length, close = 0, False
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+                elif name.lower() == 'connection':
+                    close = value.strip().lower() == 'close'
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            if close:
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_load(url: str, concurrency: int, requests: int, seed: int = 0) -> LoadReport:
+    """Send ``requests`` single submissions from ``concurrency`` keep-alive clients."""
+    parts = urlsplit(url)
+    host, port = parts.hostname or '127.0.0.1', parts.port or 80
+    rng = random.Random(seed)
+    bodies = [json.dumps(random_submission(rng, f"load{seed}-{i}")).encode() for i in range(requests)]
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, '/score', bodies[i::concurrency], latencies, statuses)
+                           for i in range(concurrency)))
+    seconds = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000 if latencies else (float('nan'),) * 2
+    return LoadReport(concurrency, len(latencies), sum(n for s, n in statuses.items() if s not in (200, 503)),
+                      statuses.get(503, 0), seconds, float(p50), float(p99))
+
+
+def format_report(report: LoadReport) -> str:
+    """Format one load run as a table row."""
+    return (f"{report.concurrency:>11} {report.requests_per_second:>10,.0f} {report.p50_ms:>9.1f} "
+            f"{report.p99_ms:>9.1f} {report.rejected:>9} {report.errors:>7}")
+
+
+REPORT_HEADER = f"{'Concurrency':>11} {'Req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'Rejected':>9} {'Errors':>7}"
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for the service and its load generator."""
+    parser = argparse.ArgumentParser(description="Belbin test scoring service")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help="run the HTTP scoring service")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8080)
+    serve_parser.add_argument('--db', default='data/results.db', help="database path")
+    serve_parser.add_argument('--max-batch', type=int, default=256, help="most submissions per batch")
+    serve_parser.add_argument('--max-queue', type=int, default=1024, help="queued submissions before refusing")
+    load_parser = commands.add_parser('load', help="measure a running service")
+    load_parser.add_argument('url', help="service address, e.g. http://127.0.0.1:8080")
+    load_parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128])
+    load_parser.add_argument('--requests', type=int, default=2000, help="requests per concurrency level")
+    args = parser.parse_args(argv)
+    
+    if args.command == 'serve':
+        service = ScoringService(DatabaseManager(args.db, multi_writer=True), args.max_batch, args.max_queue)
+        try:
+            asyncio.run(service.serve_forever(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    
+    print(REPORT_HEADER)
+    for seed, concurrency in enumerate(args.concurrency):
+        print(format_report(asyncio.run(run_load(args.url, concurrency, args.requests, seed))))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
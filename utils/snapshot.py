@@ -0,0 +1,244 @@
+"""
+Snapshot module for Belbin Test application.
+Writes role scores to a memory-mapped columnar snapshot for analytics.
+
+A snapshot is a directory of raw little-endian column files plus a JSON
+metadata file. Readers map the columns with ``numpy.memmap``, so opening a
+snapshot costs nothing and the pages are shared between processes.
+
+A per-user row index is kept alongside: every row position grouped by user
+code, plus each user's offset into that list, so one user's rows are
+found without scanning ``user_codes``. A refresh merges its new rows into
+the index rather than sorting every row again.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.data_processing import BelbinTest, DatabaseManager
+
+METADATA_FILE = 'snapshot.json'
+USERNAMES_FILE = 'usernames.txt'
+# int64 values: user count U, U + 1 offsets, then row positions grouped by user
+USER_INDEX_FILE = 'user_index.bin'
+
+# Column files and their on-disk dtypes; scores hold one row of 9 values per result
+COLUMNS = {
+    'ids': np.dtype('<i8'),
+    'timestamps': np.dtype('<i8'),
+    'user_codes': np.dtype('<i4'),
+    'scores': np.dtype('<i4'),
+}
+
+
+def _read_metadata(directory: str) -> Dict:
+    path = os.path.join(directory, METADATA_FILE)
+    if not os.path.exists(path):
+        return {'rows': 0, 'last_id': 0, 'usernames': 0, 'roles': list(BelbinTest.ROLES)}
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
+
+
+def _write_metadata(directory: str, metadata: Dict):
+    # Replacing the file atomically publishes the appended rows to readers
+    path = os.path.join(directory, METADATA_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as output:
+        json.dump(metadata, output)
+        output.flush()
+        os.fsync(output.fileno())
+    os.replace(path + '.tmp', path)
+
+
+def refresh_snapshot(db_manager: DatabaseManager, directory: str, batch_size: int = 100000,
+                     rebuild: bool = False) -> int:
+    """Append results newer than the snapshot's last row; returns rows added.
+    
+    The snapshot is append-only: rows deleted from the database afterwards
+    (for example by retention) stay in it until it is rebuilt.
+    """
+    os.makedirs(directory, exist_ok=True)
+    if rebuild:
+        for name in list(COLUMNS) + [USERNAMES_FILE, USER_INDEX_FILE, METADATA_FILE]:
+            path = os.path.join(directory, name if '.' in name else f'{name}.bin')
+            if os.path.exists(path):
+                os.remove(path)
+    
+    metadata = _read_metadata(directory)
+    if metadata['roles'] != list(BelbinTest.ROLES):
+        raise ValueError("Snapshot role columns do not match BelbinTest.ROLES; rebuild it")
+    
+    # Truncate anything past the published row count left by an interrupted refresh
+    for name, dtype in COLUMNS.items():
+        width = len(BelbinTest.ROLES) if name == 'scores' else 1
+        path = os.path.join(directory, f'{name}.bin')
+        with open(path, 'ab') as column:
+            column.truncate(metadata['rows'] * width * dtype.itemsize)
+    usernames = _load_usernames(directory)
+    if len(usernames) > metadata['usernames']:
+        usernames = usernames[:metadata['usernames']]
+        with open(os.path.join(directory, USERNAMES_FILE), 'w', encoding='utf-8') as names:
+            names.writelines(json.dumps(name) + '\n' for name in usernames)
+    codes = {name: code for code, name in enumerate(usernames)}
+    
+    query = (f'SELECT id, username, timestamp, {", ".join(DatabaseManager.SCORE_COLUMNS)} '
+             f'FROM test_results WHERE id > ? ORDER BY id LIMIT ?')
+    added = 0
+    while True:
+        page = db_manager.run_with_retry(db_manager.fetch_all, query, (metadata['last_id'], batch_size))
+        if not page:
+            break
+        new_names = []
+        for _, username, *_ in page:
+            if username not in codes:
+                codes[username] = len(codes)
+                new_names.append(username)
+        
+        columns = {
+            'ids': np.fromiter((row[0] for row in page), dtype=np.int64, count=len(page)),
+            'timestamps': np.array([row[2] for row in page], dtype='datetime64[s]').astype(np.int64),
+            'user_codes': np.fromiter((codes[row[1]] for row in page), dtype=np.int32, count=len(page)),
+            'scores': np.array([row[3:] for row in page], dtype=np.int32),
+        }
+        for name, values in columns.items():
+            with open(os.path.join(directory, f'{name}.bin'), 'ab') as column:
+                column.write(values.astype(COLUMNS[name], copy=False).tobytes())
+        if new_names:
+            with open(os.path.join(directory, USERNAMES_FILE), 'a', encoding='utf-8') as names:
+                names.writelines(json.dumps(name) + '\n' for name in new_names)
+        
+        metadata['rows'] += len(page)
+        metadata['last_id'] = int(page[-1][0])
+        metadata['usernames'] = len(codes)
+        _write_metadata(directory, metadata)
+        added += len(page)
+        if len(page) < batch_size:
+            break
+    
+    _update_user_index(directory, metadata['rows'], metadata['usernames'])
+    return added
+
+
+def _read_user_index(path: str):
+    """Return (offsets, row positions) from an index file, or None if there is none."""
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return None
+    index = np.memmap(path, dtype='<i8', mode='r')
+    users = int(index[0])
+    return index[1:users + 2], index[users + 2:]
+
+
+def _update_user_index(directory: str, rows: int, users: int):
+    """Bring the per-user row index up to ``rows`` rows.
+    
+    Rows are only ever appended, so each user's new positions come after
+    their old ones: old entries move up by the number of new rows of users
+    with smaller codes, and only the new rows are sorted.
+    """
+    path = os.path.join(directory, USER_INDEX_FILE)
+    existing = _read_user_index(path)
+    if existing is None or existing[0][-1] > rows:
+        old_offsets, old_positions = np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64)
+    else:
+        old_offsets, old_positions = np.array(existing[0]), np.array(existing[1])
+    indexed = int(old_offsets[-1])
+    if indexed == rows and len(old_offsets) == users + 1:
+        return
+    
+    with open(os.path.join(directory, 'user_codes.bin'), 'rb') as source:
+        source.seek(indexed * COLUMNS['user_codes'].itemsize)
+        new_codes = np.fromfile(source, dtype=COLUMNS['user_codes'], count=rows - indexed)
+    old_counts = np.zeros(users, dtype=np.int64)
+    old_counts[:len(old_offsets) - 1] = np.diff(old_offsets)
+    new_counts = np.bincount(new_codes, minlength=users)
+    offsets = np.zeros(users + 1, dtype=np.int64)
+    np.cumsum(old_counts + new_counts, out=offsets[1:])
+    
+    positions = np.empty(rows, dtype=np.int64)
+    new_before = np.concatenate(([0], np.cumsum(new_counts)[:-1]))
+    positions[np.arange(indexed) + np.repeat(new_before, old_counts)] = old_positions
+    order = np.argsort(new_codes, kind='stable')
+    new_codes = new_codes[order]
+    rank = np.arange(len(order)) - np.repeat(np.concatenate(([0], np.cumsum(new_counts)))[:-1], new_counts)
+    positions[offsets[new_codes] + old_counts[new_codes] + rank] = indexed + order
+    
+    # One file replaced atomically, so readers never pair offsets with other positions
+    with open(path + '.tmp', 'wb') as output:
+        output.write(np.concatenate(([users], offsets, positions)).astype('<i8').tobytes())
+    os.replace(path + '.tmp', path)
+
+
+def _load_usernames(directory: str) -> List[str]:
+    path = os.path.join(directory, USERNAMES_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as names:
+        return [json.loads(line) for line in names]
+
+
+class ResultSnapshot:
+    """Read-only, memory-mapped view of a snapshot.
+    
+    ``ids``, ``timestamps`` (seconds since the epoch, UTC), ``user_codes``
+    and ``scores`` (rows x 9, columns in ``BelbinTest.ROLES`` order) are
+    ``numpy.memmap`` arrays; nothing is read until it is used.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        metadata = _read_metadata(directory)
+        self.rows = metadata['rows']
+        self.last_id = metadata['last_id']
+        self.roles = metadata['roles']
+        self._username_count = metadata['usernames']
+        self._usernames = None
+        self._codes = None
+        self._user_index = None
+        
+        self.ids = self._map('ids', (self.rows,))
+        self.timestamps = self._map('timestamps', (self.rows,))
+        self.user_codes = self._map('user_codes', (self.rows,))
+        self.scores = self._map('scores', (self.rows, len(self.roles)))
+    
+    def _map(self, name: str, shape) -> np.ndarray:
+        if not self.rows:
+            return np.empty(shape, dtype=COLUMNS[name])
+        return np.memmap(os.path.join(self.directory, f'{name}.bin'), dtype=COLUMNS[name],
+                         mode='r', shape=shape)
+    
+    @property
+    def usernames(self) -> List[str]:
+        """Usernames indexed by user code."""
+        if self._usernames is None:
+            self._usernames = _load_usernames(self.directory)[:self._username_count]
+        return self._usernames
+    
+    def user_code(self, username: str) -> Optional[int]:
+        """Return the code for a username, or None if it is not in the snapshot."""
+        if self._codes is None:
+            self._codes = {name: code for code, name in enumerate(self.usernames)}
+        return self._codes.get(username)
+    
+    def user_rows(self, username: str) -> np.ndarray:
+        """Return the row positions of one user's results, in row order."""
+        code = self.user_code(username)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        if self._user_index is None:
+            index = _read_user_index(os.path.join(self.directory, USER_INDEX_FILE))
+            # An index from a later refresh covers rows this view does not have
+            self._user_index = index if index is not None and index[0][-1] <= self.rows else ()
+        if not self._user_index:
+            return np.flatnonzero(self.user_codes == code)
+        
+        offsets, positions = self._user_index
+        indexed = int(offsets[-1])
+        found = positions[offsets[code]:offsets[code + 1]] if code + 1 < len(offsets) else positions[:0]
+        # Rows published after the index was written are scanned directly
+        tail = indexed + np.flatnonzero(self.user_codes[indexed:] == code)
+        return np.concatenate((found, tail)).astype(np.intp)
+    
+    def __len__(self) -> int:
+        return self.rows
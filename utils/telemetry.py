@@ -0,0 +1,308 @@
+"""
+Telemetry module for Belbin Test application.
+Records how long participants spend on each question and how often they edit it.
+
+A ``SessionTimer`` accumulates per-question dwell time, edit counts and
+visits in fixed-width arrays while a test is taken, including time spent
+after navigating back. Finished sessions are handed to a ``TelemetryWriter``,
+which inserts them in batches on a background thread. Each session is one
+``question_timings`` row holding the arrays as little-endian BLOBs, so a
+session costs a few bytes per question. Rows record the question bank the
+session was asked from ('builtin' for the built-in questions), since banks
+in other languages can have the same number of questions. ``question_stats``
+reads one bank's sessions back in keyset-paged chunks and reports
+per-question latency distributions.
+
+Usage:
+    python -m utils.telemetry --db data/results.db
+    python -m utils.telemetry --db data/results.db --bank de-2
+"""
+
+import argparse
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from utils.data_processing import BelbinTest, DatabaseManager
+
+# Stored array types: milliseconds, edits and visits per question
+DWELL_DTYPE = np.dtype('<u4')
+EDITS_DTYPE = np.dtype('<u2')
+VISITS_DTYPE = np.dtype('<u1')
+# Bank key of sessions asked from BelbinTest.QUESTIONS
+BUILTIN_BANK = 'builtin'
+
+
+def ensure_table(db_manager: DatabaseManager):
+    """Create the timing table if it does not exist."""
+    def create():
+        with db_manager.connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS question_timings (
+                    id INTEGER PRIMARY KEY,
+                    recorded DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    questions INTEGER NOT NULL,
+                    completed INTEGER NOT NULL,
+                    dwell_ms BLOB NOT NULL,
+                    edits BLOB NOT NULL,
+                    visits BLOB NOT NULL,
+                    bank TEXT NOT NULL DEFAULT 'builtin'
+                )
+            ''')
+            # Tables from before banks were recorded only held built-in sessions
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(question_timings)')}
+            if 'bank' not in columns:
+                conn.execute("ALTER TABLE question_timings ADD COLUMN bank TEXT NOT NULL DEFAULT 'builtin'")
+            conn.commit()
+    
+    db_manager.run_with_retry(create)
+
+
+@dataclass
+class SessionTiming:
+    """Per-question timing arrays for one test session."""
+    dwell_ms: np.ndarray
+    edits: np.ndarray
+    visits: np.ndarray
+    completed: bool
+    bank: str = BUILTIN_BANK
+    
+    def to_row(self) -> Tuple:
+        """Return the values of a ``question_timings`` row."""
+        return (len(self.dwell_ms), int(self.completed), self.dwell_ms.astype(DWELL_DTYPE).tobytes(),
+                self.edits.astype(EDITS_DTYPE).tobytes(), self.visits.astype(VISITS_DTYPE).tobytes(),
+                self.bank)
+
+
+class SessionTimer:
+    """Accumulates dwell time, edits and visits for each question of one session."""
+    
+    def __init__(self, question_count: int, clock: Callable[[], float] = time.monotonic,
+                 bank: str = BUILTIN_BANK):
+        self.clock = clock
+        self.bank = bank
+        self.dwell_ms = np.zeros(question_count, dtype=DWELL_DTYPE)
+        self.edits = np.zeros(question_count, dtype=EDITS_DTYPE)
+        self.visits = np.zeros(question_count, dtype=VISITS_DTYPE)
+        self.current: Optional[int] = None
+        self.entered = 0.0
+    
+    def enter(self, question_idx: int):
+        """Start timing a question, ending the time on the previous one."""
+        if question_idx == self.current:
+            return
+        self.leave()
+        self.current = question_idx
+        self.entered = self.clock()
+        self.visits[question_idx] = min(int(self.visits[question_idx]) + 1, np.iinfo(VISITS_DTYPE).max)
+    
+    def leave(self):
+        """Stop timing the current question."""
+        if self.current is None:
+            return
+        elapsed = int(round((self.clock() - self.entered) * 1000))
+        total = int(self.dwell_ms[self.current]) + max(elapsed, 0)
+        self.dwell_ms[self.current] = min(total, np.iinfo(DWELL_DTYPE).max)
+        self.current = None
+    
+    def edit(self):
+        """Count one change to the current question's answer."""
+        if self.current is not None:
+            self.edits[self.current] = min(int(self.edits[self.current]) + 1, np.iinfo(EDITS_DTYPE).max)
+    
+    def finish(self, completed: bool) -> SessionTiming:
+        """Stop timing and return the session's arrays."""
+        self.leave()
+        return SessionTiming(self.dwell_ms.copy(), self.edits.copy(), self.visits.copy(), completed, self.bank)
+
+
+class TelemetryWriter:
+    """Inserts session timings in batches on a background thread.
+    
+    Sessions are written once ``batch_size`` are queued, or after
+    ``flush_interval`` seconds without a new one. A failed write is kept and
+    retried with the next batch.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager, batch_size: int = 50, flush_interval: float = 5.0):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        ensure_table(db_manager)
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def record(self, timing: SessionTiming):
+        """Queue a finished session for writing."""
+        self.queue.put(timing)
+    
+    def flush(self):
+        """Write every queued session before returning."""
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+    
+    def close(self):
+        """Write queued sessions and stop the writer thread."""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+    
+    def _run(self):
+        pending: List[SessionTiming] = []
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = 'timeout'
+            if isinstance(item, SessionTiming):
+                pending.append(item)
+                if len(pending) < self.batch_size:
+                    continue
+            self._write(pending)
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                return
+    
+    def _write(self, pending: List[SessionTiming]):
+        if not pending:
+            return
+        
+        def insert():
+            with self.db_manager.connect() as conn:
+                conn.executemany(
+                    'INSERT INTO question_timings (questions, completed, dwell_ms, edits, visits, bank) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [timing.to_row() for timing in pending]
+                )
+                conn.commit()
+        
+        try:
+            self.db_manager.run_with_retry(insert)
+        except Exception as e:
+            print(f"Error saving {len(pending)} session timings, will retry: {e}")
+            return
+        self.written += len(pending)
+        pending.clear()
+
+
+@dataclass
+class QuestionStats:
+    """Latency distribution and edit behaviour for one question."""
+    question: int
+    sessions: int
+    mean_seconds: float
+    median_seconds: float
+    p90_seconds: float
+    p99_seconds: float
+    mean_edits: float
+    revisit_rate: float
+
+
+def load_timings(db_manager: DatabaseManager, questions: Optional[int] = None, completed_only: bool = True,
+                 since: Optional[str] = None, batch_size: int = 50000,
+                 bank: str = BUILTIN_BANK) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Load one bank's stored sessions as (dwell ms, edits, visits) matrices of shape N x questions.
+    
+    Only sessions asked from ``bank`` with ``questions`` questions are
+    included, so the same index always means the same question. The
+    default count is that of the built-in test, or for another bank that
+    of its latest recorded session.
+    """
+    ensure_table(db_manager)
+    if questions is None and bank == BUILTIN_BANK:
+        questions = len(BelbinTest.QUESTIONS)
+    elif questions is None:
+        latest = db_manager.run_with_retry(
+            db_manager.fetch_all, 'SELECT questions FROM question_timings WHERE bank = ? ORDER BY id DESC LIMIT 1',
+            (bank,))
+        questions = latest[0][0] if latest else 0
+    conditions, params = ['bank = ?', 'questions = ?'], [bank, questions]
+    if completed_only:
+        conditions.append('completed = 1')
+    if since is not None:
+        conditions.append('recorded >= ?')
+        params.append(since)
+    
+    columns = ([], [], [])
+    last_id = 0
+    while True:
+        page = db_manager.run_with_retry(
+            db_manager.fetch_all,
+            f'SELECT id, dwell_ms, edits, visits FROM question_timings '
+            f'WHERE id > ? AND {" AND ".join(conditions)} ORDER BY id LIMIT ?',
+            (last_id, *params, batch_size)
+        )
+        for index, column in enumerate(columns, start=1):
+            column.append(b''.join(row[index] for row in page))
+        if len(page) < batch_size:
+            break
+        last_id = page[-1][0]
+    
+    # A bank with no sessions yet has no known question count
+    return tuple(np.frombuffer(b''.join(blobs), dtype=dtype).reshape(-1, questions) if questions
+                 else np.zeros((0, 0), dtype=dtype)
+                 for blobs, dtype in zip(columns, (DWELL_DTYPE, EDITS_DTYPE, VISITS_DTYPE)))
+
+
+def question_stats(db_manager: DatabaseManager, questions: Optional[int] = None, completed_only: bool = True,
+                   since: Optional[str] = None, bank: str = BUILTIN_BANK) -> List[QuestionStats]:
+    """Return per-question latency percentiles, mean edits and revisit rates.
+    
+    Questions a session never reached are left out of that question's figures.
+    """
+    dwell, edits, visits = load_timings(db_manager, questions, completed_only, since, bank=bank)
+    stats = []
+    for question in range(dwell.shape[1]):
+        seen = visits[:, question] > 0
+        seconds = dwell[seen, question] / 1000.0
+        if not len(seconds):
+            stats.append(QuestionStats(question, 0, *[float('nan')] * 6))
+            continue
+        median, p90, p99 = np.percentile(seconds, [50, 90, 99])
+        stats.append(QuestionStats(question, len(seconds), float(seconds.mean()), float(median), float(p90),
+                                   float(p99), float(edits[seen, question].mean()),
+                                   float((visits[seen, question] > 1).mean())))
+    return stats
+
+
+def latency_histogram(db_manager: DatabaseManager, question: int, bins=None,
+                      **filters) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (counts, bin edges in seconds) of one question's dwell times.
+    
+    The default bins are log-spaced from 1 second to 30 minutes.
+    """
+    dwell, _, visits = load_timings(db_manager, **filters)
+    bins = np.geomspace(1, 1800, 25) if bins is None else bins
+    seen = visits[:, question] > 0
+    return np.histogram(dwell[seen, question] / 1000.0, bins=bins)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for the per-question timing report."""
+    parser = argparse.ArgumentParser(description="Per-question response time report")
+    parser.add_argument('--db', default='data/results.db', help="database path")
+    parser.add_argument('--since', help="only sessions recorded on or after this date")
+    parser.add_argument('--include-abandoned', action='store_true', help="include unfinished sessions")
+    parser.add_argument('--bank', default=BUILTIN_BANK, help="question bank key, e.g. 'de-2'")
+    args = parser.parse_args(argv)
+    
+    stats = question_stats(DatabaseManager(args.db), completed_only=not args.include_abandoned, since=args.since,
+                           bank=args.bank)
+    print(f"{'Question':<10}{'Sessions':>10}{'Median':>9}{'p90':>9}{'p99':>9}{'Edits':>8}{'Revisit':>9}")
+    for row in stats:
+        print(f"{row.question + 1:<10}{row.sessions:>10}{row.median_seconds:>8.1f}s{row.p90_seconds:>8.1f}s"
+              f"{row.p99_seconds:>8.1f}s{row.mean_edits:>8.1f}{row.revisit_rate:>9.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Transfer module for Belbin Test application.
+Streams test results to and from CSV and JSON lines files.
+
+Usage:
+    python -m utils.transfer export results.csv --user "Alice" --since 2024-01-01
+    python -m utils.transfer import results.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.data_processing import DatabaseManager
+
+FIELDS = ('id', 'username', 'timestamp') + DatabaseManager.SCORE_COLUMNS
+FORMATS = ('csv', 'jsonl')
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    """Return the file format, inferring it from the extension if not given."""
+    if fmt is None:
+        fmt = os.path.splitext(path)[1].lstrip('.').lower()
+        fmt = 'jsonl' if fmt in ('json', 'ndjson') else fmt
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt!r} (expected one of {', '.join(FORMATS)})")
+    return fmt
+
+
+def export_results(db_manager: DatabaseManager, path: str, fmt: Optional[str] = None,
+                   username: Optional[str] = None, since: Optional[str] = None,
+                   until: Optional[str] = None, batch_size: int = 10000) -> int:
+    """Stream results to a CSV or JSON lines file in constant memory.
+    
+    Filters match ``DatabaseManager.iter_results``. Returns the number of rows written.
+    """
+    fmt = detect_format(path, fmt)
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as output:
+        if fmt == 'csv':
+            writer = csv.writer(output)
+            writer.writerow(FIELDS)
+            for page in _iter_pages(db_manager, username, since, until, batch_size):
+                writer.writerows(page)
+                count += len(page)
+        else:
+            encode = json.JSONEncoder(separators=(',', ':')).encode
+            for page in _iter_pages(db_manager, username, since, until, batch_size):
+                output.writelines(encode(dict(zip(FIELDS, row))) + '\n' for row in page)
+                count += len(page)
+    return count
+
+
+def _iter_pages(db_manager: DatabaseManager, username: Optional[str], since: Optional[str],
+                until: Optional[str], batch_size: int) -> Iterator[List[Tuple]]:
+    """Yield pages of FIELDS tuples using keyset queries on id."""
+    conditions, params = db_manager.result_filters(username, since, until)
+    where = ' AND '.join(['id > ?'] + conditions)
+    query = f'SELECT {", ".join(FIELDS)} FROM test_results WHERE {where} ORDER BY id LIMIT ?'
+    last_id = 0
+    while True:
+        page = db_manager.run_with_retry(db_manager.fetch_all, query, (last_id, *params, batch_size))
+        if page:
+            yield page
+        if len(page) < batch_size:
+            return
+        last_id = page[-1][0]
+
+
+def read_results(path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """Stream result rows from an exported CSV or JSON lines file."""
+    for row in _read_tuples(path, detect_format(path, fmt), FIELDS):
+        yield dict(zip(FIELDS, row))
+
+
+def _read_tuples(path: str, fmt: str, columns: Tuple[str, ...]) -> Iterator[Tuple]:
+    """Stream rows as tuples of ``columns``; missing values are None.
+    
+    CSV values stay strings: SQLite's INTEGER affinity converts them on insert.
+    """
+    with open(path, newline='', encoding='utf-8') as source:
+        if fmt == 'csv':
+            reader = csv.reader(source)
+            header = next(reader, [])
+            positions = [header.index(column) if column in header else None for column in columns]
+            for row in reader:
+                yield tuple(row[i] if i is not None and row[i] != '' else None for i in positions)
+        else:
+            decode = json.JSONDecoder().decode
+            for line in source:
+                if line.strip():
+                    row = decode(line)
+                    yield tuple(row.get(column) for column in columns)
+
+
+def import_results(db_manager: DatabaseManager, path: str, fmt: Optional[str] = None,
+                   keep_ids: bool = False, chunk_size: int = 50000) -> int:
+    """Bulk-load an exported file into the database.
+    
+    Rows are inserted in chunked transactions, and the secondary indexes
+    ``init_database`` creates are dropped for the load and rebuilt once at
+    the end. A chunk that fails is rolled back whole.
+    With ``keep_ids`` the exported ids are preserved (the target must not
+    already contain them); otherwise new ids are assigned. Returns the
+    number of rows imported.
+    """
+    columns = FIELDS if keep_ids else FIELDS[1:]
+    return _load_tuples(db_manager, _read_tuples(path, detect_format(path, fmt), columns),
+                        columns, chunk_size)
+
+
+def load_rows(db_manager: DatabaseManager, rows: Iterable[Dict], keep_ids: bool = False,
+              chunk_size: int = 50000) -> int:
+    """Insert result dictionaries in chunked transactions with indexes deferred."""
+    columns = FIELDS if keep_ids else FIELDS[1:]
+    return _load_tuples(db_manager, (tuple(row.get(column) for column in columns) for row in rows),
+                        columns, chunk_size)
+
+
+def load_scores(db_manager: DatabaseManager, usernames: Sequence[str], scores: np.ndarray,
+                chunk_size: int = 50000) -> int:
+    """Insert an N x 9 score matrix as new results, one row per username.
+    
+    Scores are converted a chunk at a time, and the timestamp column is
+    left to its default.
+    """
+    if len(usernames) != len(scores):
+        raise ValueError(f"Got {len(usernames)} usernames for {len(scores)} score rows")
+    
+    def rows():
+        for start in range(0, len(scores), chunk_size):
+            names = usernames[start:start + chunk_size]
+            for username, row in zip(names, scores[start:start + chunk_size].tolist()):
+                yield (username, *row)
+    
+    return _load_tuples(db_manager, rows(), ('username',) + DatabaseManager.SCORE_COLUMNS, chunk_size)
+
+
+def _load_tuples(db_manager: DatabaseManager, rows: Iterator[Tuple], columns: Tuple[str, ...],
+                 chunk_size: int) -> int:
+    # Missing values get the column defaults; the timestamp is the load time
+    now = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    defaults = tuple(now if column == 'timestamp' else 0 if column.endswith('_score') else None
+                     for column in columns)
+    insert = (f'INSERT INTO test_results ({", ".join(columns)}) '
+              f'VALUES ({", ".join("?" * len(columns))})')
+    rows = iter(rows)
+    count = 0
+    
+    with db_manager.connect() as conn:
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.execute('PRAGMA cache_size=-65536')
+        # Other indexes on the table are left alone: if the load is killed,
+        # only the ones init_database recreates are missing
+        existing = {name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'test_results'")}
+        indexes = [sql for name, sql in DatabaseManager.RESULT_INDEXES.items() if name in existing]
+        for name in DatabaseManager.RESULT_INDEXES:
+            conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+        # Triggers (e.g. the name search index) may update FTS tables, which
+        # flush on every statement; stage each chunk and insert it in one
+        staged = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'test_results'"
+        ).fetchone() is not None
+        if staged:
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS load_staging AS SELECT * FROM test_results WHERE 0')
+        conn.commit()
+        
+        try:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                if any(None in row for row in chunk):
+                    chunk = [tuple(default if value is None else value
+                                   for value, default in zip(row, defaults)) for row in chunk]
+                if staged:
+                    conn.executemany(insert.replace('INTO test_results', 'INTO temp.load_staging'), chunk)
+                    conn.execute(f'INSERT INTO test_results ({", ".join(columns)}) '
+                                 f'SELECT {", ".join(columns)} FROM temp.load_staging ORDER BY rowid')
+                    conn.execute('DELETE FROM temp.load_staging')
+                else:
+                    conn.executemany(insert, chunk)
+                conn.commit()
+                count += len(chunk)
+        except BaseException:
+            # A failed chunk is discarded whole, not committed with the indexes
+            conn.rollback()
+            raise
+        finally:
+            if staged:
+                conn.execute('DROP TABLE IF EXISTS temp.load_staging')
+            for sql in indexes:
+                conn.execute(sql)
+            conn.commit()
+    
+    if count and db_manager.cache is not None:
+        db_manager.cache.invalidate()
+    return count
+
+
+def main(argv=None):
+    """Command line entry point for exporting and importing results."""
+    parser = argparse.ArgumentParser(description="Export or import Belbin test results")
+    parser.add_argument('--db', default='data/results.db', help="database path")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    export_parser = commands.add_parser('export', help="export results to CSV or JSON lines")
+    export_parser.add_argument('path')
+    export_parser.add_argument('--format', choices=FORMATS)
+    export_parser.add_argument('--user', help="only this username")
+    export_parser.add_argument('--since', help="only results at or after this timestamp")
+    export_parser.add_argument('--until', help="only results before this timestamp")
+    
+    import_parser = commands.add_parser('import', help="import results from CSV or JSON lines")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--format', choices=FORMATS)
+    import_parser.add_argument('--keep-ids', action='store_true', help="preserve exported ids")
+    
+    args = parser.parse_args(argv)
+    db_manager = DatabaseManager(args.db)
+    if args.command == 'export':
+        count = export_results(db_manager, args.path, args.format, args.user, args.since, args.until)
+        print(f"Exported {count} results to {args.path}")
+    else:
+        count = import_results(db_manager, args.path, args.format, args.keep_ids)
+        print(f"Imported {count} results from {args.path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""
+Trends module for Belbin Test application.
+Analyses how each user's role profile changes between retests.
+
+For every user the cache keeps running sums over their results in
+timestamp order (id breaking ties, as for imported results), so the trend of a whole team is updated in one vectorized step per new
+result instead of being recomputed from the full history:
+
+- drift: least-squares slope of each role score per retest
+- volatility: root mean square change of each role score between retests
+- stability: mean correlation between consecutive role profiles (-1 to 1)
+- change points: results whose largest role shift from the mean of the
+  current run of results reaches ``shift_threshold``; a change point starts
+  a new run
+
+Usage:
+    python -m utils.trends data/trends.npz --db data/results.db --csv trends.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.data_processing import BelbinTest, DatabaseManager
+
+ROLE_CODES = list(BelbinTest.ROLES)
+
+# Per-user state arrays and the number of columns each one has (1 = vector)
+STATE_COLUMNS = {
+    'ids': 1,            # last result id applied
+    'n': 1,              # results seen
+    'sum_y': 9,          # sum of scores
+    'sum_ty': 9,         # sum of result index * score
+    'sum_sq_diff': 9,    # sum of squared changes between consecutive results
+    'sum_corr': 1,       # sum of correlations between consecutive profiles
+    'last': 9,           # latest scores
+    'run_n': 1,          # results in the current run since the last change point
+    'run_sum': 9,        # sum of scores in the current run
+    'change_points': 1,  # change points seen
+    'last_change': 1,    # index of the latest change point, -1 if none
+}
+
+
+@dataclass
+class UserTrend:
+    """Trend summary for one user's results."""
+    username: str
+    results: int
+    drift: Dict[str, float]
+    volatility: Dict[str, float]
+    stability: Optional[float]
+    change_points: int
+    last_change: Optional[int]
+
+
+def profile_correlation(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise Pearson correlation of two profile matrices; 0 for flat profiles."""
+    a = a - a.mean(axis=1, keepdims=True)
+    b = b - b.mean(axis=1, keepdims=True)
+    denominator = np.sqrt((a * a).sum(axis=1) * (b * b).sum(axis=1))
+    numerator = (a * b).sum(axis=1)
+    return np.divide(numerator, denominator, out=np.zeros(len(a)), where=denominator > 0)
+
+
+class TrendCache:
+    """Incrementally maintained trend state for every user.
+    
+    ``refresh`` applies results newer than the last one seen, so a nightly
+    run only touches new rows. A user whose new result is older than one
+    already applied (an imported result keeps its timestamp but gets a new
+    id) has their history replayed in timestamp order. Results deleted from the database afterwards
+    (for example by retention) stay in the state until ``rebuild=True``.
+    """
+    
+    def __init__(self, path: Optional[str] = None, shift_threshold: float = 8.0, min_run: int = 2):
+        self.path = path
+        self.shift_threshold = float(shift_threshold)
+        self.min_run = int(min_run)
+        self._reset()
+        if path is not None and os.path.exists(path):
+            self._load(path)
+    
+    def _reset(self):
+        self.last_id = 0
+        self.usernames: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._state = {name: self._empty(name, 0) for name in STATE_COLUMNS}
+    
+    @staticmethod
+    def _empty(name: str, rows: int) -> np.ndarray:
+        width = STATE_COLUMNS[name]
+        dtype = np.int64 if name in ('ids', 'n', 'run_n', 'change_points', 'last_change') else np.float64
+        array = np.zeros((rows, width) if width > 1 else rows, dtype=dtype)
+        if name == 'last_change':
+            array.fill(-1)
+        return array
+    
+    def _load(self, path: str):
+        with np.load(path, allow_pickle=False) as data:
+            if (float(data['shift_threshold']) != self.shift_threshold
+                    or int(data['min_run']) != self.min_run
+                    or data['roles'].tolist() != ROLE_CODES):
+                raise ValueError("Trend cache was built with other settings or roles; rebuild it")
+            self.last_id = int(data['last_id'])
+            self.usernames = data['usernames'].tolist()
+            self._state = {name: data[name] for name in STATE_COLUMNS}
+        self._codes = {name: code for code, name in enumerate(self.usernames)}
+    
+    def save(self, path: Optional[str] = None):
+        """Write the cache atomically to ``path`` (default: the path it was opened with)."""
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the trend cache to")
+        with open(path + '.tmp', 'wb') as output:
+            np.savez(output, last_id=self.last_id, usernames=np.array(self.usernames, dtype=str),
+                     shift_threshold=self.shift_threshold, min_run=self.min_run,
+                     roles=np.array(ROLE_CODES), **{name: array[:len(self.usernames)]
+                                                     for name, array in self._state.items()})
+        os.replace(path + '.tmp', path)
+    
+    def __len__(self) -> int:
+        return len(self.usernames)
+    
+    def _user_codes(self, usernames: Sequence[str]) -> np.ndarray:
+        codes = np.empty(len(usernames), dtype=np.int64)
+        for i, username in enumerate(usernames):
+            code = self._codes.get(username)
+            if code is None:
+                code = self._codes[username] = len(self.usernames)
+                self.usernames.append(username)
+            codes[i] = code
+        
+        # Grow the state arrays geometrically so appends stay cheap
+        capacity = len(self._state['n'])
+        if len(self.usernames) > capacity:
+            capacity = max(len(self.usernames), capacity * 2, 1024)
+            for name, array in self._state.items():
+                grown = self._empty(name, capacity)
+                grown[:len(array)] = array
+                self._state[name] = grown
+        return codes
+    
+    def add_results(self, usernames: Sequence[str], scores, ids: Optional[Sequence[int]] = None,
+                    timestamps: Optional[Sequence[str]] = None):
+        """Apply results after any already applied; ``scores`` is an N x 9 matrix in ROLES order.
+        
+        Each user's rows are applied in the given order, or in (timestamp, id)
+        order when ``timestamps`` are given.
+        """
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1, len(ROLE_CODES))
+        ids = np.zeros(len(scores), dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        if timestamps is not None:
+            order = np.lexsort((ids, np.array(['' if t is None else str(t) for t in timestamps])))
+            usernames, scores, ids = [usernames[i] for i in order], scores[order], ids[order]
+        codes = self._user_codes(usernames)
+        
+        # Rank each row among the same user's rows in this batch; rows of equal
+        # rank belong to distinct users and are applied in one vectorized step
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        ranks = np.empty(len(codes), dtype=np.int64)
+        ranks[order] = np.arange(len(codes)) - np.repeat(starts, np.diff(np.r_[starts, len(codes)]))
+        for rank in range(int(ranks.max()) + 1 if len(ranks) else 0):
+            selected = ranks == rank
+            self._apply(codes[selected], scores[selected], ids[selected])
+        if len(ids):
+            self.last_id = max(self.last_id, int(ids.max()))
+    
+    def _apply(self, users: np.ndarray, y: np.ndarray, ids: np.ndarray):
+        state = self._state
+        index = state['n'][users].astype(np.float64)
+        state['sum_y'][users] += y
+        state['sum_ty'][users] += index[:, None] * y
+        
+        has_previous = state['n'][users] > 0
+        previous_users = users[has_previous]
+        previous = state['last'][previous_users]
+        state['sum_sq_diff'][previous_users] += (y[has_previous] - previous) ** 2
+        state['sum_corr'][previous_users] += profile_correlation(previous, y[has_previous])
+        
+        run_n = state['run_n'][users]
+        run_mean = state['run_sum'][users] / np.maximum(run_n, 1)[:, None]
+        shift = np.abs(y - run_mean).max(axis=1)
+        is_change = (run_n >= self.min_run) & (shift >= self.shift_threshold)
+        state['change_points'][users[is_change]] += 1
+        state['last_change'][users[is_change]] = state['n'][users[is_change]]
+        state['run_n'][users] = np.where(is_change, 1, run_n + 1)
+        state['run_sum'][users] = np.where(is_change[:, None], y, state['run_sum'][users] + y)
+        
+        state['last'][users] = y
+        state['ids'][users] = ids
+        state['n'][users] += 1
+    
+    def _clear(self, usernames: Sequence[str]):
+        """Reset the state of known users so their history can be replayed."""
+        codes = np.array([self._codes[name] for name in usernames if name in self._codes], dtype=np.int64)
+        for name, array in self._state.items():
+            array[codes] = self._empty(name, len(codes))
+    
+    def refresh(self, db_manager: DatabaseManager, batch_size: int = 100000, rebuild: bool = False) -> int:
+        """Apply results newer than the last one seen; returns the number of new results."""
+        if rebuild:
+            self._reset()
+        
+        columns = f'id, username, {", ".join(DatabaseManager.SCORE_COLUMNS)}'
+        start_id = self.last_id
+        applied = 0
+        with db_manager.connect() as conn:
+            end_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM test_results').fetchone()[0]
+            if end_id <= start_id:
+                return 0
+            
+            # Users with a new result older than one already applied are replayed whole
+            conn.execute('DROP TABLE IF EXISTS temp.trend_replay')
+            conn.execute(
+                'CREATE TEMP TABLE trend_replay AS SELECT DISTINCT new.username AS username '
+                'FROM test_results new WHERE new.id > ? AND new.id <= ? AND EXISTS ('
+                'SELECT 1 FROM test_results old WHERE old.username = new.username '
+                'AND old.id <= ? AND old.timestamp > new.timestamp)',
+                (start_id, end_id, start_id))
+            try:
+                self._clear([row[0] for row in conn.execute('SELECT username FROM temp.trend_replay')])
+                
+                # Rows come sorted by user, so a user's history may span pages in order
+                cursor = conn.execute(
+                    f'SELECT {columns}, timestamp FROM test_results WHERE id > ? AND id <= ? '
+                    f'UNION ALL SELECT {columns}, timestamp FROM test_results WHERE id <= ? '
+                    f'AND username IN (SELECT username FROM temp.trend_replay) '
+                    f'ORDER BY username, timestamp, id',
+                    (start_id, end_id, start_id))
+                while True:
+                    page = cursor.fetchmany(batch_size)
+                    if not page:
+                        break
+                    self.add_results([row[1] for row in page], [row[2:-1] for row in page],
+                                     [row[0] for row in page])
+                    applied += sum(row[0] > start_id for row in page)
+            finally:
+                conn.execute('DROP TABLE IF EXISTS temp.trend_replay')
+        return applied
+    
+    def report(self) -> Dict[str, np.ndarray]:
+        """Return trend arrays for every user, indexed like ``usernames``.
+        
+        ``drift`` and ``volatility`` are U x 9; ``stability`` is NaN for
+        users with a single result.
+        """
+        count = len(self.usernames)
+        report = _derive({name: array[:count] for name, array in self._state.items()})
+        report['usernames'] = np.array(self.usernames, dtype=object)
+        return report
+    
+    def trend(self, username: str) -> Optional[UserTrend]:
+        """Return one user's trend, or None if they have no results."""
+        code = self._codes.get(username)
+        if code is None:
+            return None
+        row = {name: values[0] for name, values in
+               _derive({name: array[code:code + 1] for name, array in self._state.items()}).items()}
+        return UserTrend(
+            username=username,
+            results=int(row['results']),
+            drift=dict(zip(ROLE_CODES, row['drift'].tolist())),
+            volatility=dict(zip(ROLE_CODES, row['volatility'].tolist())),
+            stability=None if np.isnan(row['stability']) else float(row['stability']),
+            change_points=int(row['change_points']),
+            last_change=None if row['last_change'] < 0 else int(row['last_change']),
+        )
+
+
+def _derive(state: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Turn per-user running sums into trend measures."""
+    n = state['n'].astype(np.float64)
+    
+    # Result indexes are 0..n-1, so their sums have closed forms
+    sum_t = n * (n - 1) / 2
+    sum_tt = (n - 1) * n * (2 * n - 1) / 6
+    denominator = (n * sum_tt - sum_t ** 2)[:, None]
+    numerator = n[:, None] * state['sum_ty'] - sum_t[:, None] * state['sum_y']
+    drift = np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+    
+    pairs = np.maximum(n - 1, 1)
+    return {
+        'results': state['n'].copy(),
+        'drift': drift,
+        'volatility': np.sqrt(state['sum_sq_diff'] / pairs[:, None]),
+        'stability': np.where(n > 1, state['sum_corr'] / pairs, np.nan),
+        'change_points': state['change_points'].copy(),
+        'last_change': state['last_change'].copy(),
+    }
+
+
+def write_report(cache: TrendCache, path: str) -> int:
+    """Write the per-user trend report as CSV; returns the number of users."""
+    report = cache.report()
+    with open(path, 'w', newline='', encoding='utf-8') as output:
+        writer = csv.writer(output)
+        writer.writerow(['username', 'results', 'stability', 'change_points', 'last_change']
+                        + [f'{code.lower()}_drift' for code in ROLE_CODES]
+                        + [f'{code.lower()}_volatility' for code in ROLE_CODES])
+        for i, username in enumerate(report['usernames']):
+            stability = report['stability'][i]
+            writer.writerow([username, report['results'][i], '' if np.isnan(stability) else f'{stability:.3f}',
+                             report['change_points'][i], report['last_change'][i]]
+                            + [f'{value:.3f}' for value in report['drift'][i]]
+                            + [f'{value:.3f}' for value in report['volatility'][i]])
+    return len(report['usernames'])
+
+
+def main(argv=None):
+    """Command line entry point for refreshing the trend cache."""
+    parser = argparse.ArgumentParser(description="Update per-user Belbin role trends")
+    parser.add_argument('cache', help="trend cache file (.npz)")
+    parser.add_argument('--db', default='data/results.db', help="database path")
+    parser.add_argument('--rebuild', action='store_true', help="recompute from all results")
+    parser.add_argument('--csv', help="also write a per-user report to this CSV file")
+    args = parser.parse_args(argv)
+    
+    cache = TrendCache(args.cache)
+    applied = cache.refresh(DatabaseManager(args.db), rebuild=args.rebuild)
+    cache.save()
+    report = cache.report()
+    latest_changes = int(np.sum((report['last_change'] >= 0) & (report['last_change'] == report['results'] - 1)))
+    print(f"Applied {applied} new results; {len(cache)} users, "
+          f"{latest_changes} with a change point in their latest result")
+    if args.csv:
+        write_report(cache, args.csv)
+        print(f"Report written to {args.csv}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())